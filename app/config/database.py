@@ -1,24 +1,170 @@
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional
+
 import psycopg2
-from typing import Optional
+from psycopg2 import extensions, pool
+
+logger = logging.getLogger(__name__)
+
+
+class ConexaoPmmt(extensions.connection):
+    """Conexão do pool que registra os prepared statements já criados na sessão."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.preparadas = set()
+
 
 class DatabaseConfig:
+    _pool: Optional[pool.ThreadedConnectionPool] = None
+    _pool_lock = threading.Lock()
+    # O ThreadedConnectionPool falha quando esgotado; o semáforo faz as
+    # requisições excedentes aguardarem uma conexão livre.
+    _semaforo: Optional[threading.BoundedSemaphore] = None
+    # Momento da devolução de cada conexão ao pool, usado no health check.
+    _ultimo_uso: Dict[int, float] = {}
+
     def __init__(self):
-        self.host = "172.16.74.235"
-        self.database = "PMMT"
-        self.user = "user_dashboard"
-        self.password = "69-boa#bd#5e"
+        self.host = os.getenv("DB_HOST", "172.16.74.235")
+        self.database = os.getenv("DB_NAME", "PMMT")
+        self.user = os.getenv("DB_USER", "user_dashboard")
+        self.password = os.getenv("DB_PASSWORD", "69-boa#bd#5e")
+        self.port = int(os.getenv("DB_PORT") or 5432)
+        self.pool_max = self._calcular_pool_max()
+        self.pool_min = min(int(os.getenv("DB_POOL_MIN", "2")), self.pool_max)
+        self.pool_timeout = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+        self.connect_timeout = int(os.getenv("DB_CONNECT_TIMEOUT", "5"))
+        # Conexões ociosas há mais que isso (em segundos) recebem um SELECT 1 antes do uso
+        self.ping_apos = float(os.getenv("DB_POOL_PING_APOS", "30"))
+
+    @staticmethod
+    def _calcular_pool_max() -> int:
+        """
+        Tamanho máximo do pool deste processo. DB_POOL_MAX fixa o valor; sem ele,
+        DB_CONEXOES_MAX (conexões que a API pode abrir no total, dentro do
+        max_connections do PostgreSQL) é dividido entre os API_WORKERS workers.
+        """
+        if os.getenv("DB_POOL_MAX"):
+            return int(os.environ["DB_POOL_MAX"])
+        orcamento = os.getenv("DB_CONEXOES_MAX")
+        if not orcamento:
+            return 20
+        workers = max(int(os.getenv("API_WORKERS") or 1), 1)
+        return max(int(orcamento) // workers, 1)
+
+    def _parametros_conexao(self) -> dict:
+        return {
+            "host": self.host,
+            "database": self.database,
+            "user": self.user,
+            "password": self.password,
+            "port": self.port,
+            "connect_timeout": self.connect_timeout,
+            "connection_factory": ConexaoPmmt,
+        }
 
     def get_connection(self) -> Optional[psycopg2.extensions.connection]:
-        """Cria e retorna uma conexão com o banco PostgreSQL."""
+        """Cria e retorna uma conexão avulsa (fora do pool) com o banco PostgreSQL."""
         try:
-            connection = psycopg2.connect(
-                host=self.host,
-                database=self.database,
-                user=self.user,
-                password=self.password
-            )
-            print("Conexão com o banco de dados realizada com sucesso!")
+            connection = psycopg2.connect(**self._parametros_conexao())
+            logger.info("Conexão com o banco de dados realizada com sucesso")
             return connection
         except psycopg2.OperationalError as error:
-            print(f"Erro ao conectar-se ao PostgreSQL: {error}")
-            return None 
\ No newline at end of file
+            logger.error("Erro ao conectar-se ao PostgreSQL: %s", error)
+            return None
+
+    def get_pool(self) -> pool.ThreadedConnectionPool:
+        """Retorna o pool de conexões compartilhado, criando-o na primeira chamada."""
+        cls = type(self)
+        if cls._pool is None or cls._pool.closed:
+            with cls._pool_lock:
+                if cls._pool is None or cls._pool.closed:
+                    cls._pool = pool.ThreadedConnectionPool(
+                        self.pool_min, self.pool_max, **self._parametros_conexao()
+                    )
+                    cls._semaforo = threading.BoundedSemaphore(self.pool_max)
+                    logger.info("Pool de conexões criado (min=%d, max=%d)", self.pool_min, self.pool_max)
+        return cls._pool
+
+    def init_pool(self) -> bool:
+        """Abre o pool de conexões. Retorna False se o banco estiver indisponível."""
+        try:
+            self.get_pool()
+            return True
+        except psycopg2.OperationalError as error:
+            logger.error("Erro ao criar o pool de conexões: %s", error)
+            return False
+
+    @classmethod
+    def close_pool(cls) -> None:
+        """Fecha todas as conexões do pool (usado no encerramento da aplicação)."""
+        with cls._pool_lock:
+            if cls._pool is not None and not cls._pool.closed:
+                cls._pool.closeall()
+                logger.info("Pool de conexões encerrado")
+            cls._pool = None
+            cls._ultimo_uso.clear()
+
+    def _conexao_saudavel(self, conn: extensions.connection) -> bool:
+        """Verifica se a conexão emprestada do pool ainda está utilizável."""
+        if conn.closed:
+            return False
+        if conn.info.transaction_status == extensions.TRANSACTION_STATUS_UNKNOWN:
+            return False
+        ocioso_desde = type(self)._ultimo_uso.get(id(conn))
+        if ocioso_desde is not None and time.monotonic() - ocioso_desde < self.ping_apos:
+            return True
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute("SELECT 1")
+            conn.rollback()
+            return True
+        except psycopg2.Error:
+            return False
+
+    def _obter_conexao(self) -> extensions.connection:
+        """Empresta uma conexão saudável do pool, descartando as quebradas."""
+        pool_conexoes = self.get_pool()
+        for _ in range(self.pool_max + 1):
+            conn = pool_conexoes.getconn()
+            if self._conexao_saudavel(conn):
+                return conn
+            type(self)._ultimo_uso.pop(id(conn), None)
+            pool_conexoes.putconn(conn, close=True)
+        raise psycopg2.OperationalError("Nenhuma conexão saudável disponível no pool")
+
+    @contextmanager
+    def connection(self) -> Iterator[extensions.connection]:
+        """Empresta uma conexão do pool e a devolve ao final do bloco."""
+        pool_conexoes = self.get_pool()
+        semaforo = type(self)._semaforo
+        if not semaforo.acquire(timeout=self.pool_timeout):
+            raise psycopg2.OperationalError("Tempo esgotado aguardando conexão do pool")
+        try:
+            conn = self._obter_conexao()
+        except Exception:
+            semaforo.release()
+            raise
+        descartar = False
+        try:
+            yield conn
+            conn.commit()
+        except Exception:
+            descartar = conn.closed != 0
+            if not descartar:
+                try:
+                    conn.rollback()
+                except psycopg2.Error:
+                    descartar = True
+            raise
+        finally:
+            if descartar:
+                type(self)._ultimo_uso.pop(id(conn), None)
+            else:
+                type(self)._ultimo_uso[id(conn)] = time.monotonic()
+            pool_conexoes.putconn(conn, close=descartar)
+            semaforo.release()
@@ -1,82 +1,126 @@
-from typing import List, Dict
-from fastapi import HTTPException
+import asyncio
+import json
+from typing import AsyncIterator, List, Dict
+from fastapi import HTTPException, Request
 from app.models.coneq_model import ConeqModel
+from app.models.estoque_monitor import estoque_monitor
 from app.utils.string_utils import remover_caracteres_especiais
 
 class ConeqController:
     def __init__(self):
         self.model = ConeqModel()
 
-    def get_estoque(self) -> List[Dict]:
+    async def get_estoque(self) -> List[Dict]:
         """Retorna os dados de estoque."""
-        dados = self.model.get_estoque_quantidade()
+        dados = await self.model.get_estoque_quantidade()
         if not dados:
             raise HTTPException(status_code=500, detail="Erro ao buscar os dados do estoque")
         return dados
 
-    def get_estoque_geral(self) -> Dict:
+    async def eventos_estoque(self, request: Request) -> AsyncIterator[str]:
+        """
+        Fluxo Server-Sent Events com o estoque: um evento "snapshot" com o estado
+        completo ao conectar e eventos "diff" com as partes que mudaram.
+        """
+        fila = await estoque_monitor.assinar()
+        try:
+            while not await request.is_disconnected():
+                try:
+                    evento, versao, dados = await asyncio.wait_for(fila.get(), timeout=15)
+                except asyncio.TimeoutError:
+                    # Comentário SSE mantém a conexão viva através de proxies
+                    yield ": ping\n\n"
+                    continue
+                yield f"id: {versao}\nevent: {evento}\ndata: {json.dumps(dados)}\n\n"
+        finally:
+            estoque_monitor.cancelar(fila)
+
+    async def get_estoque_geral(self) -> Dict:
         """Retorna os dados gerais de estoque."""
-        dados = self.model.get_estoque_geral()
+        dados = await self.model.get_estoque_geral()
         if not dados["estoque"]:
             raise HTTPException(status_code=404, detail="Nenhum dado encontrado no estoque")
         return dados
 
-    def get_estoque_por_tipo(self, tipo_equipamento_id: int) -> Dict:
+    async def get_estoque_por_tipo(self, tipo_equipamento_id: int) -> Dict:
         """Retorna os dados de estoque por tipo de equipamento."""
-        dados = self.model.get_estoque_por_tipo(tipo_equipamento_id)
+        dados = await self.model.get_estoque_por_tipo(tipo_equipamento_id)
         if not dados["estoque"]:
             raise HTTPException(status_code=404, detail="Nenhum dado encontrado para o tipo de equipamento especificado")
         return dados
 
-    def get_cautela_por_tipo(self, tipo_equipamento_id: int, status: str = "todos") -> Dict:
+    async def get_resumo_estoque(self) -> Dict:
+        """Retorna o estoque geral e o de todos os tipos de equipamento."""
+        dados = await self.model.get_resumo_estoque()
+        if not dados["geral"]:
+            raise HTTPException(status_code=404, detail="Nenhum dado encontrado no estoque")
+        return dados
+
+    async def get_resumo_tipos_equipamento(self) -> Dict:
+        """Retorna estoque e cautelas por status de todos os tipos de equipamento."""
+        estoque, cautelas = await asyncio.gather(
+            self.model.get_resumo_estoque(), self.model.get_resumo_cautelas()
+        )
+        if not estoque["geral"] or not cautelas:
+            raise HTTPException(status_code=500, detail="Erro ao buscar o resumo dos tipos de equipamento")
+
+        cautela_vazia = [{"status": item["status"], "quantidade": 0} for item in cautelas["geral"]]
+        estoque_vazio = {"estoque": [], "cautelas": estoque["geral"]["cautelas"]}
+        tipos = set(estoque["por_tipo"]) | set(cautelas["por_tipo"])
+        return {
+            "geral": {**estoque["geral"], "cautela": cautelas["geral"]},
+            "por_tipo": {
+                tipo_id: {
+                    **estoque["por_tipo"].get(tipo_id, estoque_vazio),
+                    "cautela": cautelas["por_tipo"].get(tipo_id, cautela_vazia),
+                }
+                for tipo_id in tipos
+            },
+        }
+
+    async def get_cautela_por_tipo(self, tipo_equipamento_id: int, status: str = "todos") -> Dict:
         """Retorna os dados de cautela por tipo de equipamento."""
-        dados = self.model.get_cautela_por_tipo(tipo_equipamento_id, status)
+        dados = await self.model.get_cautela_por_tipo(tipo_equipamento_id, status)
         if not dados["cautela"]:
             raise HTTPException(status_code=404, detail="Nenhum dado de cautela encontrado")
         return dados
 
-    def get_estoque_status(self) -> Dict:
+    async def get_estoque_status(self) -> Dict:
         """Retorna os dados de estoque com status."""
-        return self.model.get_estoque_status()
+        return await self.model.get_estoque_status()
 
-    def get_tipos_equipamento(self) -> List[Dict]:
+    async def get_tipos_equipamento(self) -> List[Dict]:
         """Retorna os tipos de equipamento."""
-        tipos = self.model.get_tipos_equipamento()
+        tipos = await self.model.get_tipos_equipamento()
         if not tipos:
             raise HTTPException(status_code=500, detail="Erro ao buscar os tipos de equipamentos")
         return tipos
 
-    def get_cautelas_por_cidade(self, cidades: str) -> List[Dict]:
-        """Retorna as cautelas por cidade."""
+    async def get_cautelas_entregas_por_cidade(self, cidades: str) -> List[Dict]:
+        """Retorna as cautelas e as entregas por cidade."""
         try:
             # Processando a string de cidades
             cidades_lista = [cidade.strip() for cidade in cidades.split(",")]
             cidades_processadas = [remover_caracteres_especiais(cidade) for cidade in cidades_lista]
             
-            dados = self.model.get_cautelas_por_cidade(cidades_processadas)
-            if not dados:
-                raise HTTPException(
-                    status_code=404,
-                    detail="Nenhuma cautela encontrada para as cidades selecionadas"
-                )
-            return dados
+            return await self.model.get_cautelas_entregas_por_cidade(cidades_processadas)
         except Exception as e:
             raise HTTPException(
                 status_code=500,
-                detail=f"Erro ao buscar dados de cautelas: {str(e)}"
+                detail=f"Erro ao buscar dados de cautelas e entregas: {str(e)}"
             )
 
-    def get_entregas_por_cidade(self, cidades: str) -> List[Dict]:
-        """Retorna as entregas por cidade."""
-        try:
-            # Processando a string de cidades
-            cidades_lista = [cidade.strip() for cidade in cidades.split(",")]
-            cidades_processadas = [remover_caracteres_especiais(cidade) for cidade in cidades_lista]
-            
-            dados = self.model.get_entregas_por_cidade(cidades_processadas)
-            return dados
-        except Exception as e:
+    async def get_cautelas_por_cidade(self, cidades: str) -> List[Dict]:
+        """Retorna as cautelas por cidade."""
+        dados = await self.get_cautelas_entregas_por_cidade(cidades)
+        if not dados:
             raise HTTPException(
-                status_code=500,
-                detail=f"Erro ao buscar dados de entregas: {str(e)}"
-            ) 
\ No newline at end of file
+                status_code=404,
+                detail="Nenhuma cautela encontrada para as cidades selecionadas"
+            )
+        return [{"nome_cidade": item["nome_cidade"], "qtd_cautelas": item["qtd_cautelas"]} for item in dados]
+
+    async def get_entregas_por_cidade(self, cidades: str) -> List[Dict]:
+        """Retorna as entregas por cidade."""
+        dados = await self.get_cautelas_entregas_por_cidade(cidades)
+        return [{"nome_cidade": item["nome_cidade"], "qtd_entregas": item["qtd_entregas"]} for item in dados]
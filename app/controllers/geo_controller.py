@@ -0,0 +1,85 @@
+import asyncio
+import hashlib
+from typing import Dict, List, Optional
+from fastapi import HTTPException, Response
+from app.middleware.compressao import escolher_codificacao
+from app.middleware.etag import etag_corresponde
+from app.models.coneq_model import ConeqModel
+from app.models.geo_model import NivelGeo, geo_model
+from app.models.sgpm_model import SgpmModel
+from app.utils.respostas import RespostaJSONRapida
+
+FONTES_CONTAGEM = ("sgpm", "coneq")
+
+class GeoController:
+    def __init__(self):
+        self.sgpm_model = SgpmModel()
+        self.coneq_model = ConeqModel()
+
+    async def get_municipios(
+        self,
+        zoom: Optional[int],
+        contagens: Optional[str],
+        accept_encoding: str,
+        if_none_match: str
+    ) -> Response:
+        """Retorna a malha municipal simplificada para o zoom, opcionalmente com as contagens por cidade."""
+        fontes = [fonte.strip().lower() for fonte in (contagens or "").split(",") if fonte.strip()]
+        invalidas = [fonte for fonte in fontes if fonte not in FONTES_CONTAGEM]
+        if invalidas:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Contagens inválidas: {', '.join(invalidas)} (use {', '.join(FONTES_CONTAGEM)})"
+            )
+
+        if not geo_model.carregado and not await geo_model.carregar():
+            raise HTTPException(status_code=503, detail="Malha municipal indisponível")
+
+        nivel = geo_model.nivel(zoom)
+        if not fontes:
+            return self._resposta_pre_comprimida(nivel, accept_encoding, if_none_match)
+        return await self._resposta_com_contagens(nivel, fontes, if_none_match)
+
+    @staticmethod
+    def _resposta_pre_comprimida(nivel: NivelGeo, accept_encoding: str, if_none_match: str) -> Response:
+        disponiveis = [codificacao for codificacao in ("br", "gzip") if codificacao in nivel.corpos]
+        codificacao = escolher_codificacao(accept_encoding, disponiveis) or "identity"
+        headers = {
+            "ETag": nivel.etags[codificacao],
+            # A malha só muda com um novo deploy
+            "Cache-Control": "public, max-age=86400",
+            "Vary": "Accept-Encoding",
+        }
+        if any(etag_corresponde(if_none_match, etag) for etag in nivel.etags.values()):
+            return Response(status_code=304, headers=headers)
+        if codificacao != "identity":
+            headers["Content-Encoding"] = codificacao
+        return Response(nivel.corpos[codificacao], media_type="application/geo+json", headers=headers)
+
+    async def _resposta_com_contagens(self, nivel: NivelGeo, fontes: List[str], if_none_match: str) -> Response:
+        nomes = [feature["properties"].get("name", "") for feature in nivel.features]
+        consultas = {
+            "sgpm": lambda: self.sgpm_model.get_dados_por_cidades([nome.upper() for nome in nomes]),
+            "coneq": lambda: self.coneq_model.get_cautelas_entregas_por_cidade(nomes),
+        }
+        resultados = await asyncio.gather(*(consultas[fonte]() for fonte in fontes))
+
+        features = []
+        for posicao, feature in enumerate(nivel.features):
+            propriedades: Dict = dict(feature["properties"])
+            for fonte, linhas in zip(fontes, resultados):
+                linha = dict(linhas[posicao]) if linhas and posicao < len(linhas) else {}
+                linha.pop("nome_cidade", None)
+                propriedades[fonte] = linha
+            features.append({**feature, "properties": propriedades})
+
+        resposta = RespostaJSONRapida(
+            {"type": "FeatureCollection", "features": features},
+            media_type="application/geo+json",
+        )
+        etag = f'"{hashlib.blake2b(resposta.body, digest_size=16).hexdigest()}"'
+        headers = {"ETag": etag, "Cache-Control": "private, max-age=60"}
+        if etag_corresponde(if_none_match, etag):
+            return Response(status_code=304, headers=headers)
+        resposta.headers.update(headers)
+        return resposta
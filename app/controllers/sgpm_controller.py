@@ -1,15 +1,18 @@
-from typing import List, Dict
+import logging
+from typing import AsyncIterator, List, Dict
 from fastapi import HTTPException
 from app.models.sgpm_model import SgpmModel
 
+logger = logging.getLogger(__name__)
+
 class SgpmController:
     def __init__(self):
         self.model = SgpmModel()
 
-    def get_dados_gerais(self) -> Dict:
+    async def get_dados_gerais(self) -> Dict:
         """Retorna os dados gerais do SGPM."""
         try:
-            dados = self.model.get_dados_gerais()
+            dados = await self.model.get_dados_gerais()
             if not dados:
                 raise HTTPException(status_code=404, detail="Nenhum dado encontrado")
             return dados
@@ -19,10 +22,10 @@ class SgpmController:
                 detail=f"Erro ao buscar dados gerais: {str(e)}"
             )
 
-    def get_dados_por_periodo(self, data_inicio: str, data_fim: str) -> Dict:
+    async def get_dados_por_periodo(self, data_inicio: str, data_fim: str) -> Dict:
         """Retorna os dados do SGPM por período."""
         try:
-            dados = self.model.get_dados_por_periodo(data_inicio, data_fim)
+            dados = await self.model.get_dados_por_periodo(data_inicio, data_fim)
             if not dados:
                 raise HTTPException(status_code=404, detail="Nenhum dado encontrado para o período especificado")
             return dados
@@ -32,10 +35,10 @@ class SgpmController:
                 detail=f"Erro ao buscar dados por período: {str(e)}"
             )
 
-    def get_dados_por_cidade(self, cidade: str) -> Dict:
+    async def get_dados_por_cidade(self, cidade: str) -> Dict:
         """Retorna os dados do SGPM por cidade."""
         try:
-            dados = self.model.get_dados_por_cidade(cidade)
+            dados = await self.model.get_dados_por_cidade(cidade)
             if not dados:
                 raise HTTPException(status_code=404, detail=f"Nenhum dado encontrado para a cidade {cidade}")
             return dados
@@ -45,10 +48,10 @@ class SgpmController:
                 detail=f"Erro ao buscar dados por cidade: {str(e)}"
             )
 
-    def get_policiais_por_sexo(self) -> List[Dict]:
+    async def get_policiais_por_sexo(self) -> List[Dict]:
         """Retorna a quantidade de policiais por sexo."""
         try:
-            dados = self.model.get_policiais_por_sexo()
+            dados = await self.model.get_policiais_por_sexo()
             if not dados:
                 raise HTTPException(status_code=404, detail="Nenhum dado encontrado")
             return dados
@@ -58,40 +61,40 @@ class SgpmController:
                 detail=f"Erro ao buscar dados por sexo: {str(e)}"
             )
         
-    def get_policiais_por_posto_grad(self, posto_grad: str = None) -> List[Dict]:
+    async def get_policiais_por_posto_grad(self, posto_grad: str = None) -> List[Dict]:
         """Retorna a quantidade de policiais por posto/graduação."""
         try:
-            dados = self.model.get_policiais_por_posto_grad(posto_grad)
+            dados = await self.model.get_policiais_por_posto_grad(posto_grad)
             if not dados:
                 raise HTTPException(status_code=404, detail="Nenhum dado encontrado")
             return dados
         except Exception as e:
             raise HTTPException(status_code=500, detail=f"Erro ao buscar dados por posto/graduação: {str(e)}")
 
-    def get_policiais_por_unidade(self, unidade: str = None) -> List[Dict]:
+    async def get_policiais_por_unidade(self, unidade: str = None) -> List[Dict]:
         """Retorna a quantidade de policiais por unidade (OPM)."""
         try:
-            dados = self.model.get_policiais_por_unidade(unidade)
+            dados = await self.model.get_policiais_por_unidade(unidade)
             if not dados:
                 raise HTTPException(status_code=404, detail="Nenhum dado encontrado")
             return dados
         except Exception as e:
             raise HTTPException(status_code=500, detail=f"Erro ao buscar dados por unidade: {str(e)}")
 
-    def get_policiais_por_comando_regional(self, comando_regional: str = None) -> List[Dict]:
+    async def get_policiais_por_comando_regional(self, comando_regional: str = None) -> List[Dict]:
         """Retorna a quantidade de policiais por comando regional."""
         try:
-            dados = self.model.get_policiais_por_comando_regional(comando_regional)
+            dados = await self.model.get_policiais_por_comando_regional(comando_regional)
             if not dados:
                 raise HTTPException(status_code=404, detail="Nenhum dado encontrado")
             return dados
         except Exception as e:
             raise HTTPException(status_code=500, detail=f"Erro ao buscar dados por comando regional: {str(e)}")
 
-    def get_policiais_por_situacao(self) -> List[Dict]:
+    async def get_policiais_por_situacao(self) -> List[Dict]:
         """Retorna a quantidade de policiais por situação."""
         try:
-            dados = self.model.get_policiais_por_situacao()
+            dados = await self.model.get_policiais_por_situacao()
             if not dados:
                 raise HTTPException(status_code=404, detail="Nenhum dado encontrado")
             return dados
@@ -101,10 +104,10 @@ class SgpmController:
                 detail=f"Erro ao buscar dados por situação: {str(e)}"
             )
 
-    def get_policiais_por_tipo(self) -> List[Dict]:
+    async def get_policiais_por_tipo(self) -> List[Dict]:
         """Retorna a quantidade de policiais por tipo."""
         try:
-            dados = self.model.get_policiais_por_tipo()
+            dados = await self.model.get_policiais_por_tipo()
             if not dados:
                 raise HTTPException(status_code=404, detail="Nenhum dado encontrado")
             return dados
@@ -114,10 +117,23 @@ class SgpmController:
                 detail=f"Erro ao buscar dados por tipo: {str(e)}"
             )
 
-    def get_policiais_por_posto_grad_sexo(self, sexo: str = None, situacao: str = None, tipo: str = None) -> Dict:
+    async def get_resumo_sgpm(self) -> Dict:
+        """Retorna todas as agregações da página do SGPM em uma única consulta."""
+        try:
+            dados = await self.model.get_resumo_sgpm()
+            if not dados:
+                raise HTTPException(status_code=404, detail="Nenhum dado encontrado")
+            return dados
+        except Exception as e:
+            raise HTTPException(
+                status_code=500,
+                detail=f"Erro ao buscar resumo do SGPM: {str(e)}"
+            )
+
+    async def get_policiais_por_posto_grad_sexo(self, sexo: str = None, situacao: str = None, tipo: str = None) -> Dict:
         """Retorna os dados de policiais por posto/graduação e sexo, incluindo totais."""
         try:
-            dados = self.model.get_policiais_por_posto_grad_sexo(sexo, situacao, tipo)
+            dados = await self.model.get_policiais_por_posto_grad_sexo(sexo, situacao, tipo)
             if not dados:
                 return {
                     "feminino": [],
@@ -131,7 +147,7 @@ class SgpmController:
                 detail=f"Erro ao buscar dados por posto/graduação: {str(e)}"
             )
 
-    def filtrar_policiais(
+    async def filtrar_policiais(
         self,
         sexo: str = None,
         situacao: str = None,
@@ -141,8 +157,13 @@ class SgpmController:
         comando_regional: str = None
     ) -> Dict:
         """Filtra policiais com base em qualquer combinação de filtros."""
+        if comando_regional and not all(cod.strip().isdigit() for cod in comando_regional.split(",") if cod.strip()):
+            raise HTTPException(
+                status_code=400,
+                detail="comando_regional deve ser uma lista de códigos numéricos separados por vírgula"
+            )
         try:
-            dados = self.model.filtrar_policiais(
+            dados = await self.model.filtrar_policiais(
                 sexo=sexo,
                 situacao=situacao,
                 tipo=tipo,
@@ -160,10 +181,10 @@ class SgpmController:
         )
 
     # Novos métodos para os filtros
-    def get_postos_graduacao(self) -> List[Dict]:
+    async def get_postos_graduacao(self) -> List[Dict]:
         """Retorna todos os postos/graduações disponíveis."""
         try:
-            dados = self.model.get_postos_graduacao()
+            dados = await self.model.get_postos_graduacao()
             if not dados:
                 raise HTTPException(status_code=404, detail="Nenhum posto/graduação encontrado")
             return dados
@@ -173,10 +194,10 @@ class SgpmController:
                 detail=f"Erro ao buscar postos/graduação: {str(e)}"
             )
 
-    def get_unidades(self) -> List[Dict]:
+    async def get_unidades(self) -> List[Dict]:
         """Retorna todas as unidades disponíveis."""
         try:
-            dados = self.model.get_unidades()
+            dados = await self.model.get_unidades()
             if not dados:
                 raise HTTPException(status_code=404, detail="Nenhuma unidade encontrada")
             return dados
@@ -186,10 +207,10 @@ class SgpmController:
                 detail=f"Erro ao buscar unidades: {str(e)}"
             )
 
-    def get_comandos_regionais(self) -> List[Dict]:
+    async def get_comandos_regionais(self) -> List[Dict]:
         """Retorna todos os comandos regionais disponíveis."""
         try:
-            dados = self.model.get_comandos_regionais()
+            dados = await self.model.get_comandos_regionais()
             if not dados:
                 raise HTTPException(status_code=404, detail="Nenhum comando regional encontrado")
             return dados
@@ -199,10 +220,10 @@ class SgpmController:
                 detail=f"Erro ao buscar comandos regionais: {str(e)}"
             )
 
-    def get_unidades_por_comando(self, comando_id: int) -> List[Dict]:
+    async def get_unidades_por_comando(self, comando_id: int) -> List[Dict]:
         """Retorna todas as unidades subordinadas a um comando regional específico."""
         try:
-            dados = self.model.get_unidades_por_comando(comando_id)
+            dados = await self.model.get_unidades_por_comando(comando_id)
             if not dados:
                 return []  # Retorna lista vazia se não houver unidades subordinadas
             return dados
@@ -212,7 +233,7 @@ class SgpmController:
                 detail=f"Erro ao buscar unidades por comando: {str(e)}"
             )
 
-    def filtrar_policiais_avancado(
+    async def filtrar_policiais_avancado(
         self,
         sexo: str = None,
         situacao: str = None,
@@ -223,16 +244,11 @@ class SgpmController:
     ) -> Dict:
         """Filtra policiais com base em todos os filtros disponíveis."""
         try:
-            print(f"=== CONTROLLER - Parâmetros recebidos ===")
-            print(f"sexo: {sexo} (tipo: {type(sexo)})")
-            print(f"situacao: {situacao} (tipo: {type(situacao)})")
-            print(f"tipo: {tipo} (tipo: {type(tipo)})")
-            print(f"comando_regional: {comando_regional} (tipo: {type(comando_regional)})")
-            print(f"unidade: {unidade} (tipo: {type(unidade)})")
-            print(f"posto_grad: {posto_grad} (tipo: {type(posto_grad)})")
-            print(f"=== FIM CONTROLLER ===")
-            
-            dados = self.model.filtrar_policiais_avancado(
+            logger.debug(
+                "Filtro avançado: sexo=%r situacao=%r tipo=%r comando_regional=%r unidade=%r posto_grad=%r",
+                sexo, situacao, tipo, comando_regional, unidade, posto_grad
+            )
+            dados = await self.model.filtrar_policiais_avancado(
                 sexo=sexo,
                 situacao=situacao,
                 tipo=tipo,
@@ -249,10 +265,45 @@ class SgpmController:
                 detail=f"Erro ao filtrar policiais: {str(e)}"
             )
 
-    def get_totais_por_cr(self) -> Dict[str, int]:
+    async def listar_policiais_avancado(self, limite: int = 100, apos: int = None, **filtros) -> Dict:
+        """Retorna uma página das linhas do filtro avançado (paginação por cod_policial)."""
+        pagina = await self.model.listar_policiais_avancado(limite=limite, apos=apos, **filtros)
+        if pagina is None:
+            raise HTTPException(status_code=500, detail="Erro ao listar policiais")
+        return pagina
+
+    async def exportar_policiais_avancado(self, **filtros) -> AsyncIterator[List[Dict]]:
+        """
+        Lotes com todas as linhas do filtro avançado. O primeiro lote é lido
+        antes de a resposta começar, para que uma falha no banco ainda vire 500.
+        """
+        lotes = self.model.exportar_policiais_avancado(**filtros)
+        try:
+            primeiro = await lotes.__anext__()
+        except StopAsyncIteration:
+            primeiro = []
+        except Exception as e:
+            await lotes.aclose()
+            raise HTTPException(
+                status_code=500,
+                detail=f"Erro ao exportar policiais: {str(e)}"
+            )
+
+        async def continuar() -> AsyncIterator[List[Dict]]:
+            try:
+                if primeiro:
+                    yield primeiro
+                    async for lote in lotes:
+                        yield lote
+            finally:
+                await lotes.aclose()
+
+        return continuar()
+
+    async def get_totais_por_cr(self) -> Dict[str, int]:
         """Retorna o total de policiais por CR."""
         try:
-            dados = self.model.get_totais_por_cr()
+            dados = await self.model.get_totais_por_cr()
             if not dados:
                 raise HTTPException(status_code=404, detail="Nenhum dado encontrado")
             return dados
@@ -263,7 +314,7 @@ class SgpmController:
             ) 
         
 
-    def get_policiais_por_cidade(self, cidades: List[str]) -> List[Dict]:
+    async def get_policiais_por_cidade(self, cidades: List[str]) -> List[Dict]:
         """Retorna a contagem de policiais por sexo e cidade."""
         if not cidades:
             raise HTTPException(status_code=400, detail="Lista de cidades não pode estar vazia")
@@ -271,49 +322,37 @@ class SgpmController:
         try:
             # Normaliza os nomes das cidades para maiúsculas
             cidades_maiusculas = [cidade.upper() for cidade in cidades]
-            print(f"Cidades recebidas no controller: {cidades_maiusculas}")
-
-            resultado = []
-            for cidade in cidades_maiusculas:
-                print(f"Processando cidade: {cidade}")
-                dados = self.model.get_dados_por_cidade(cidade)
-                print(f"Dados retornados para {cidade}: {dados}")
-                if dados:
-                    resultado.append(dados)
-                else:
-                    print(f"Nenhum dado encontrado para {cidade}")
-
-            print(f"Resultado final: {resultado}")
+            logger.debug("Cidades recebidas: %s", cidades_maiusculas)
+
+            resultado = await self.model.get_dados_por_cidades(cidades_maiusculas)
+
             if not resultado:
                 raise HTTPException(status_code=404, detail="Nenhum dado encontrado para as cidades informadas")
 
             return resultado
 
         except Exception as e:
-            print(f"Erro no controller: {str(e)}")
+            logger.exception("Erro ao buscar dados por cidades")
             raise HTTPException(
                 status_code=500,
                 detail=f"Erro ao buscar dados por cidades: {str(e)}"
             )
 
-    def get_policiais_por_unidade(self, cidade: str) -> List[Dict]:
+    async def get_policiais_por_unidade(self, cidade: str) -> List[Dict]:
         """Retorna a contagem de policiais por sexo e unidade em uma cidade específica."""
         if not cidade:
             raise HTTPException(status_code=400, detail="Nome da cidade não pode estar vazio")
 
         try:
-            print(f"Buscando dados por unidade para cidade: {cidade}")
-            dados = self.model.get_policiais_por_unidade(cidade)
-            print(f"Dados por unidade retornados: {dados}")
-            
+            dados = await self.model.get_policiais_por_unidade(cidade)
             if not dados:
-                print(f"Nenhum dado encontrado para cidade: {cidade}")
+                logger.debug("Nenhum dado por unidade para a cidade %s", cidade)
                 return []
             
             return dados
 
         except Exception as e:
-            print(f"Erro ao buscar dados por unidade: {str(e)}")
+            logger.exception("Erro ao buscar dados por unidade da cidade %s", cidade)
             raise HTTPException(
                 status_code=500,
                 detail=f"Erro ao buscar dados por unidade: {str(e)}"
@@ -1,8 +1,118 @@
+import asyncio
+import logging
+import os
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from app.routes import coneq_routes, sgpm_routes
+from app.config.database import DatabaseConfig
+from app.middleware.compressao import CompressaoMiddleware
+from app.middleware.etag import ETagMiddleware
+from app.middleware.orcamento_queries import ContagemQueriesMiddleware
+from app.models.aquecimento import aquecer, estado_aquecimento, recarregar_referencias
+from app.models.base_model import BaseModel
+from app.models.estoque_monitor import estoque_monitor
+from app.models.invalidacao_cache import invalidacao_cache
+from app.models.lider_tarefas import lider_tarefas
+from app.models.opm_arvore import opm_arvore
+from app.models.sgpm_resumo_model import sgpm_resumo
+from app.models.sgpm_snapshot import policial_snapshot
+from app.routes import admin_routes, coneq_routes, geo_routes, metricas_routes, saude_routes, sgpm_routes
+from app.utils.agendador import Agendador
+from app.utils.logs import configurar_logs, encerrar_logs
+from app.utils.metricas import metricas_queries
+
+configurar_logs()
+logger = logging.getLogger(__name__)
+
+agendador = Agendador()
+
+
+# Verdadeiro quando os índices vieram do processo mestre do gunicorn (preload_app)
+_aquecido_no_mestre = False
+
+
+def aquecer_antes_do_fork() -> None:
+    """
+    Aquece os índices uma única vez no processo mestre do gunicorn, antes de
+    criar os workers, que os herdam prontos pelo fork (copy-on-write). O pool
+    e as threads do banco são fechados em seguida: conexões não podem ser
+    compartilhadas entre processos e cada worker abre as suas.
+    """
+    global _aquecido_no_mestre
+    DatabaseConfig().init_pool()
+    try:
+        asyncio.run(aquecer())
+        _aquecido_no_mestre = True
+    finally:
+        BaseModel.shutdown_executor()
+        DatabaseConfig.close_pool()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Abre o pool e carrega os índices em memória na inicialização; libera tudo no encerramento
+    DatabaseConfig().init_pool()
+    await aquecer()
+    estado = estado_aquecimento()
+    if not all(estado.values()):
+        logger.warning("Aquecimento incompleto %s; /ready responde 503 até concluir", estado)
+    # Enquanto faltar algo (ex.: banco fora do ar na partida), tenta de novo; depois disso não faz nada
+    agendador.agendar("aquecimento", float(os.getenv("AQUECIMENTO_RETENTATIVA_SEGUNDOS", "10")), aquecer)
+    # Cada worker escuta as invalidações de cache feitas pelos outros (LISTEN/NOTIFY)
+    if invalidacao_cache.ativo:
+        agendador.agendar(
+            "invalidacao_cache", invalidacao_cache.intervalo_verificacao, invalidacao_cache.verificar,
+            imediato=True
+        )
+    # Workers reciclados herdam o que o mestre carregou na partida: atualiza logo em segundo plano
+    agendador.agendar(
+        "opm_arvore", float(os.getenv("OPM_REFRESH_SEGUNDOS", "900")), opm_arvore.carregar,
+        imediato=_aquecido_no_mestre
+    )
+    agendador.agendar(
+        "tabelas_referencia", float(os.getenv("REFERENCIAS_REFRESH_SEGUNDOS", "600")), recarregar_referencias,
+        imediato=_aquecido_no_mestre
+    )
+    if await sgpm_resumo.verificar():
+        # Com vários workers, o REFRESH periódico roda só no líder; as demais tarefas são por worker
+        agendador.agendar(
+            "lider_tarefas", lider_tarefas.intervalo_verificacao, lider_tarefas.verificar, imediato=True
+        )
+        agendador.agendar("sgpm_resumo", sgpm_resumo.intervalo_refresh, sgpm_resumo.atualizar_agendado)
+    agendador.agendar("estoque_monitor", estoque_monitor.intervalo, estoque_monitor.verificar)
+    # No gunicorn, cada worker grava as suas métricas para o /metrics somar as de todos
+    if metricas_queries.ativo and metricas_queries.diretorio:
+        agendador.agendar(
+            "metricas", metricas_queries.intervalo_gravacao, lambda: asyncio.to_thread(metricas_queries.gravar)
+        )
+    if policial_snapshot.ativo:
+        agendador.agendar(
+            "policial_snapshot", policial_snapshot.intervalo_refresh, policial_snapshot.carregar,
+            imediato=_aquecido_no_mestre
+        )
+    yield
+    await agendador.parar_todas()
+    invalidacao_cache.parar()
+    lider_tarefas.parar()
+    metricas_queries.gravar()
+    BaseModel.shutdown_executor()
+    DatabaseConfig.close_pool()
+    encerrar_logs()
+
+
+app = FastAPI(title="PMMT API", description="API para o sistema da PMMT", lifespan=lifespan)
+
+# Contagem de queries por requisição e orçamento por rota (testes e benchmarks); fica por dentro do ETag
+if os.getenv("DB_CONTAR_QUERIES", "false").lower() == "true":
+    app.add_middleware(ContagemQueriesMiddleware, rotas=app.router)
+
+# ETag e Cache-Control nas respostas JSON; adicionado antes do CORS para que o 304 também receba os cabeçalhos CORS
+app.add_middleware(ETagMiddleware, rotas=app.router)
 
-app = FastAPI(title="PMMT API", description="API para o sistema da PMMT")
+# Compressão Brotli/GZip acima de COMPRESSAO_MINIMO_BYTES; fica por fora do ETag, que é calculado sobre o corpo original
+if os.getenv("COMPRESSAO_ATIVA", "true").lower() == "true":
+    app.add_middleware(CompressaoMiddleware)
 
 # Configuração do CORS
 origins = [
@@ -25,7 +135,11 @@ app.add_middleware(
 # Incluindo as rotas
 app.include_router(coneq_routes.router)
 app.include_router(sgpm_routes.router)
+app.include_router(geo_routes.router)
+app.include_router(admin_routes.router)
+app.include_router(metricas_routes.router)
+app.include_router(saude_routes.router)
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=True) 
\ No newline at end of file
+    uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=True)
@@ -0,0 +1,4 @@
+"""
+Pacote de middlewares ASGI para a API da PMMT.
+Contém o tratamento de requisições condicionais (ETag) e de compressão das respostas.
+"""
@@ -0,0 +1,138 @@
+import asyncio
+import gzip
+import os
+from typing import List, Optional, Tuple
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError:  # brotli é opcional: sem ele só gzip é oferecido
+    brotli = None
+
+# Corpos maiores que isso são comprimidos fora do event loop
+LIMITE_EXECUTOR = 256 * 1024
+
+
+def escolher_codificacao(accept_encoding: str, disponiveis: List[str]) -> Optional[str]:
+    """Primeira codificação disponível que o cliente aceita (q=0 conta como recusa)."""
+    aceitos = set()
+    for item in accept_encoding.lower().split(","):
+        nome, _, parametros = item.strip().partition(";")
+        if parametros.replace(" ", "") in ("q=0", "q=0.0", "q=0.00", "q=0.000"):
+            continue
+        aceitos.add(nome.strip())
+    for codificacao in disponiveis:
+        if codificacao in aceitos or "*" in aceitos:
+            return codificacao
+    return None
+
+
+class CompressaoMiddleware:
+    """
+    Comprime as respostas com Brotli ou GZip conforme o Accept-Encoding do
+    cliente, a partir de um tamanho mínimo. Respostas em fluxo (eventos,
+    exportações) e respostas já codificadas passam sem alteração. Um ETag forte vira fraco
+    (W/) na versão comprimida, que continua válida para If-None-Match.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimo: Optional[int] = None,
+        algoritmos: Optional[str] = None,
+        nivel_gzip: Optional[int] = None,
+        nivel_brotli: Optional[int] = None,
+    ):
+        self.app = app
+        self.minimo = minimo if minimo is not None else int(os.getenv("COMPRESSAO_MINIMO_BYTES", "1024"))
+        nomes = algoritmos if algoritmos is not None else os.getenv("COMPRESSAO_ALGORITMOS", "br,gzip")
+        self.algoritmos = [
+            nome.strip() for nome in nomes.split(",")
+            if nome.strip() == "gzip" or (nome.strip() == "br" and brotli is not None)
+        ]
+        self.nivel_gzip = nivel_gzip if nivel_gzip is not None else int(os.getenv("COMPRESSAO_NIVEL_GZIP", "6"))
+        self.nivel_brotli = nivel_brotli if nivel_brotli is not None else int(os.getenv("COMPRESSAO_NIVEL_BROTLI", "4"))
+
+    def _escolher(self, accept_encoding: str) -> Optional[str]:
+        return escolher_codificacao(accept_encoding, self.algoritmos)
+
+    def comprimir(self, corpo: bytes, algoritmo: str) -> bytes:
+        if algoritmo == "br":
+            return brotli.compress(corpo, quality=self.nivel_brotli)
+        return gzip.compress(corpo, compresslevel=self.nivel_gzip, mtime=0)
+
+    @staticmethod
+    def _cabecalhos(inicio: Message, algoritmo: str, tamanho: int) -> List[Tuple[bytes, bytes]]:
+        headers = []
+        for chave, valor in inicio.get("headers", []):
+            if chave == b"content-length":
+                continue
+            if chave == b"etag" and valor.startswith(b'"'):
+                valor = b"W/" + valor
+            if chave == b"vary":
+                continue
+            headers.append((chave, valor))
+        vary = [valor for chave, valor in inicio.get("headers", []) if chave == b"vary"]
+        headers += [
+            (b"content-encoding", algoritmo.encode()),
+            (b"content-length", str(tamanho).encode()),
+            (b"vary", b", ".join(vary + [b"Accept-Encoding"])),
+        ]
+        return headers
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not self.algoritmos:
+            await self.app(scope, receive, send)
+            return
+
+        accept_encoding = dict(scope["headers"]).get(b"accept-encoding", b"").decode("latin-1")
+        algoritmo = self._escolher(accept_encoding)
+        if algoritmo is None:
+            await self.app(scope, receive, send)
+            return
+
+        inicio: Optional[Message] = None
+        repassar = False
+
+        async def enviar(message: Message) -> None:
+            nonlocal inicio, repassar
+            if repassar:
+                await send(message)
+                return
+
+            if message["type"] == "http.response.start":
+                headers = dict(message.get("headers", []))
+                if (
+                    b"content-encoding" in headers
+                    or headers.get(b"content-type", b"").startswith(b"text/event-stream")
+                    or message["status"] in (204, 304)
+                ):
+                    repassar = True
+                    await send(message)
+                    return
+                inicio = message
+                return
+
+            if message.get("more_body", False):
+                # Resposta em fluxo: segue sem compressão para não acumular o corpo
+                repassar = True
+                await send(inicio)
+                await send(message)
+                return
+
+            corpo = message.get("body", b"")
+            if len(corpo) < self.minimo:
+                await send(inicio)
+                await send({"type": "http.response.body", "body": corpo})
+                return
+
+            if len(corpo) > LIMITE_EXECUTOR:
+                loop = asyncio.get_running_loop()
+                comprimido = await loop.run_in_executor(None, self.comprimir, corpo, algoritmo)
+            else:
+                comprimido = self.comprimir(corpo, algoritmo)
+            await send({**inicio, "headers": self._cabecalhos(inicio, algoritmo, len(comprimido))})
+            await send({"type": "http.response.body", "body": comprimido})
+
+        await self.app(scope, receive, enviar)
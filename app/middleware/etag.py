@@ -0,0 +1,162 @@
+import hashlib
+import time
+from typing import Callable, Iterable, List, NamedTuple, Optional, Tuple
+
+from starlette.routing import Match, Router
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.utils.cache import CACHE_ATIVO, cache_resultados, expiracoes_requisicao
+
+
+class PoliticaCache(NamedTuple):
+    max_age: int
+    caches: Tuple[str, ...]
+
+
+def cache_http(max_age: int = 0, cache: Iterable[str] = ()) -> Callable:
+    """
+    Declara a política de cache HTTP de uma rota. max_age vira o Cache-Control
+    enviado ao navegador; cache lista os nomes de cache_resultado que alimentam
+    a rota. Enquanto os itens desses caches usados na resposta não expirarem nem
+    forem invalidados, um If-None-Match com o ETag vigente é respondido com 304
+    sem chamar a rota (e sem ir ao banco).
+    """
+    caches = (cache,) if isinstance(cache, str) else tuple(cache)
+
+    def decorador(endpoint: Callable) -> Callable:
+        endpoint.politica_cache = PoliticaCache(max_age, caches)
+        return endpoint
+
+    return decorador
+
+
+def etag_corresponde(if_none_match: str, etag: str) -> bool:
+    """Compara o ETag com a lista de um If-None-Match, ignorando o prefixo fraco W/."""
+    aceitos = [valor.strip().removeprefix("W/") for valor in if_none_match.split(",") if valor.strip()]
+    return "*" in aceitos or etag.removeprefix("W/") in aceitos
+
+
+class ETagMiddleware:
+    """
+    Acrescenta ETag (hash do corpo) e Cache-Control às respostas JSON de GET e
+    responde 304 quando o cliente já possui a versão atual. Respostas que não
+    são JSON (como o fluxo de eventos do estoque) passam sem buffer.
+    """
+
+    def __init__(self, app: ASGIApp, rotas: Router):
+        self.app = app
+        self.rotas = rotas
+
+    def _politica(self, scope: Scope) -> Optional[PoliticaCache]:
+        for rota in self.rotas.routes:
+            match, filho = rota.matches(scope)
+            if match == Match.FULL:
+                return getattr(filho.get("endpoint"), "politica_cache", None)
+        return None
+
+    @staticmethod
+    def _cache_control(politica: Optional[PoliticaCache]) -> bytes:
+        if politica is None or politica.max_age <= 0:
+            return b"no-cache"
+        return f"private, max-age={politica.max_age}".encode()
+
+    @staticmethod
+    def _chaves(politica: PoliticaCache, scope: Scope) -> List[tuple]:
+        # O primeiro elemento é o nome do cache: invalidar o cache invalida também o ETag
+        return [(nome, "etag", scope["path"], scope["query_string"]) for nome in politica.caches]
+
+    def _etag_vigente(self, politica: Optional[PoliticaCache], scope: Scope) -> Optional[str]:
+        if politica is None or not politica.caches or not CACHE_ATIVO:
+            return None
+        etags = set()
+        for chave in self._chaves(politica, scope):
+            encontrado, etag = cache_resultados.obter(chave)
+            if not encontrado:
+                return None
+            etags.add(etag)
+        return etags.pop() if len(etags) == 1 else None
+
+    def _registrar_etag(
+        self, politica: Optional[PoliticaCache], scope: Scope, etag: str, expiracoes: List[float]
+    ) -> None:
+        if politica is None or not politica.caches or not CACHE_ATIVO or not expiracoes:
+            return
+        # O ETag vale enquanto valerem os dados em cache que geraram o corpo
+        ttl = min(expiracoes) - time.monotonic()
+        if ttl <= 0:
+            return
+        for chave in self._chaves(politica, scope):
+            cache_resultados.definir(chave, etag, ttl)
+
+    async def _nao_modificado(self, send: Send, etag: str, politica: Optional[PoliticaCache]) -> None:
+        await send({
+            "type": "http.response.start",
+            "status": 304,
+            "headers": [(b"etag", etag.encode()), (b"cache-control", self._cache_control(politica))],
+        })
+        await send({"type": "http.response.body", "body": b""})
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] not in ("GET", "HEAD"):
+            await self.app(scope, receive, send)
+            return
+
+        cabecalhos = dict(scope["headers"])
+        if_none_match = cabecalhos.get(b"if-none-match", b"").decode("latin-1")
+        politica = self._politica(scope)
+
+        etag = self._etag_vigente(politica, scope)
+        if etag is not None and etag_corresponde(if_none_match, etag):
+            await self._nao_modificado(send, etag, politica)
+            return
+
+        inicio: Optional[Message] = None
+        partes: List[bytes] = []
+        repassar = False
+        expiracoes: List[float] = []
+        cabeca = scope["method"] == "HEAD"
+
+        async def enviar(message: Message) -> None:
+            nonlocal inicio, repassar
+            if repassar:
+                await send(message)
+                return
+
+            if message["type"] == "http.response.start":
+                tipo = dict(message.get("headers", [])).get(b"content-type", b"")
+                if message["status"] != 200 or not tipo.startswith(b"application/json"):
+                    repassar = True
+                    await send(message)
+                    return
+                inicio = message
+                return
+
+            partes.append(message.get("body", b""))
+            if message.get("more_body", False):
+                return
+
+            corpo = b"".join(partes)
+            headers = [(k, v) for k, v in inicio.get("headers", []) if k not in (b"etag", b"cache-control")]
+            headers.append((b"cache-control", self._cache_control(politica)))
+            if cabeca and not corpo:
+                # HEAD sem corpo: não há o que identificar com o hash
+                await send({**inicio, "headers": headers})
+                await send({"type": "http.response.body", "body": corpo})
+                return
+
+            etag_corpo = f'"{hashlib.blake2b(corpo, digest_size=16).hexdigest()}"'
+            if not cabeca:
+                self._registrar_etag(politica, scope, etag_corpo, expiracoes)
+            if etag_corresponde(if_none_match, etag_corpo):
+                await self._nao_modificado(send, etag_corpo, politica)
+                return
+
+            headers.append((b"etag", etag_corpo.encode()))
+            await send({**inicio, "headers": headers})
+            await send({"type": "http.response.body", "body": corpo})
+
+        token = expiracoes_requisicao.set(expiracoes)
+        try:
+            await self.app(scope, receive, enviar)
+        finally:
+            expiracoes_requisicao.reset(token)
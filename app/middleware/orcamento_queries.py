@@ -0,0 +1,103 @@
+import json
+import logging
+import os
+from typing import Callable, Optional
+
+from starlette.routing import Match, Router
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.utils.metricas import ContagemQueries, contagem_queries
+
+logger = logging.getLogger(__name__)
+
+
+def orcamento_queries(maximo: int) -> Callable:
+    """
+    Declara quantas idas ao banco uma requisição à rota pode fazer (com o cache
+    de resultados vazio). Verificado pelo ContagemQueriesMiddleware quando
+    DB_CONTAR_QUERIES está ativo, como nos benchmarks e testes.
+    """
+    def decorador(endpoint: Callable) -> Callable:
+        endpoint.orcamento_queries = maximo
+        return endpoint
+
+    return decorador
+
+
+class ContagemQueriesMiddleware:
+    """
+    Modo de teste: conta as queries de cada requisição HTTP e devolve o total no
+    cabeçalho X-DB-Queries (e o orçamento da rota em X-DB-Queries-Orcamento).
+    Rotas que passam do orçamento são registradas no log; com
+    DB_ORCAMENTO_ESTRITO=true a resposta vira um 500, para derrubar o teste.
+    """
+
+    def __init__(self, app: ASGIApp, rotas: Router, estrito: Optional[bool] = None):
+        self.app = app
+        self.rotas = rotas
+        if estrito is None:
+            estrito = os.getenv("DB_ORCAMENTO_ESTRITO", "false").lower() == "true"
+        self.estrito = estrito
+
+    def _orcamento(self, scope: Scope) -> Optional[int]:
+        for rota in self.rotas.routes:
+            match, filho = rota.matches(scope)
+            if match == Match.FULL:
+                return getattr(filho.get("endpoint"), "orcamento_queries", None)
+        return None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        orcamento = self._orcamento(scope)
+        contagem = ContagemQueries()
+        token = contagem_queries.set(contagem)
+        descartar = False
+
+        async def enviar(mensagem: Message) -> None:
+            nonlocal descartar
+            if descartar:
+                return
+            if mensagem["type"] != "http.response.start":
+                await send(mensagem)
+                return
+
+            cabecalhos = list(mensagem.get("headers", []))
+            cabecalhos.append((b"x-db-queries", str(contagem.total).encode()))
+            if orcamento is not None:
+                cabecalhos.append((b"x-db-queries-orcamento", str(orcamento).encode()))
+            if orcamento is not None and contagem.total > orcamento:
+                logger.error(
+                    "Orçamento de queries excedido em %s: %d de %d (%s)",
+                    scope["path"], contagem.total, orcamento, contagem.por_metodo
+                )
+                if self.estrito:
+                    descartar = True
+                    await self._excedido(send, scope, contagem, orcamento)
+                    return
+            await send(dict(mensagem, headers=cabecalhos))
+
+        try:
+            await self.app(scope, receive, enviar)
+        finally:
+            contagem_queries.reset(token)
+
+    @staticmethod
+    async def _excedido(send: Send, scope: Scope, contagem: ContagemQueries, orcamento: int) -> None:
+        corpo = json.dumps({
+            "detail": f"Orçamento de queries excedido em {scope['path']}: {contagem.total} de {orcamento}",
+            "queries": contagem.por_metodo,
+        }, ensure_ascii=False).encode()
+        await send({
+            "type": "http.response.start",
+            "status": 500,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(corpo)).encode()),
+                (b"x-db-queries", str(contagem.total).encode()),
+                (b"x-db-queries-orcamento", str(orcamento).encode()),
+            ],
+        })
+        await send({"type": "http.response.body", "body": corpo})
@@ -0,0 +1,44 @@
+import asyncio
+from typing import Dict
+from .cidade_index import cidades_geral, cidades_sgpm
+from .geo_model import geo_model
+from .opm_arvore import opm_arvore
+from .sgpm_snapshot import policial_snapshot
+from .tabelas_referencia import tabelas_referencia
+
+
+async def aquecer() -> None:
+    """Carrega os índices, tabelas de referência e snapshots que ainda não estiverem em memória."""
+    await asyncio.gather(
+        cidades_sgpm.garantir_carregado(),
+        cidades_geral.garantir_carregado(),
+        opm_arvore.garantir_carregado(),
+        tabelas_referencia.garantir_carregado(),
+    )
+    if not geo_model.carregado:
+        await geo_model.carregar()
+    if policial_snapshot.ativo and not policial_snapshot.disponivel:
+        await policial_snapshot.carregar()
+
+
+async def recarregar_referencias() -> None:
+    """Recarrega as tabelas de referência e as listas de cidades (tarefa periódica)."""
+    await asyncio.gather(
+        tabelas_referencia.carregar(),
+        cidades_sgpm.carregar(),
+        cidades_geral.carregar(),
+    )
+
+
+def estado_aquecimento() -> Dict[str, bool]:
+    """Indica, por componente, se os dados já estão em memória."""
+    estado = {
+        "cidades_sgpm": cidades_sgpm.carregado,
+        "cidades_geral": cidades_geral.carregado,
+        "opm_arvore": opm_arvore.carregado,
+        "tabelas_referencia": tabelas_referencia.carregado,
+        "geo": geo_model.carregado,
+    }
+    if policial_snapshot.ativo:
+        estado["policial_snapshot"] = policial_snapshot.disponivel
+    return estado
@@ -1,35 +1,342 @@
-from typing import Optional, Any
-from psycopg2.extensions import connection
+import asyncio
+import contextvars
+import functools
+import itertools
+import logging
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack
+from typing import Optional, Any, AsyncIterator, Callable, List, TypeVar
+from psycopg2 import errors
 from app.config.database import DatabaseConfig
+from app.utils import cache, single_flight
+from app.utils.metricas import contagem_queries, metricas_queries
+from app.utils.single_flight import SingleFlight, chave_hashable
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Método do model que disparou a query, propagado até as threads do banco
+_origem_query: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("origem_query", default=None)
+# Frames ignorados ao procurar o método de origem de uma query
+_ARQUIVOS_INTERNOS = {__file__, cache.__file__, single_flight.__file__, functools.__file__}
+# Linhas buscadas por ida ao banco nos cursores do servidor (stream_query_async)
+LOTE_CURSOR = int(os.getenv("DB_CURSOR_LOTE", "2000"))
+_nomes_cursor = itertools.count(1)
+
+class _CursorServidor:
+    """
+    Cursor nomeado do PostgreSQL (DECLARE ... CURSOR) preso a uma conexão do
+    pool até ser fechado. As linhas chegam em lotes com FETCH, então o
+    resultado nunca fica inteiro na memória da API. Os métodos rodam nas
+    threads do banco; o lock impede fechar a conexão no meio de um lote.
+    """
+
+    def __init__(self, db_config: DatabaseConfig, origem: str, lote: int):
+        self.db_config = db_config
+        self.origem = origem
+        self.lote = lote
+        self._pilha = ExitStack()
+        self._cursor = None
+        self._lock = threading.Lock()
+        self._espera = self._execucao = self._leitura = 0.0
+
+    def abrir(self, query: str, params: tuple = None) -> None:
+        with self._lock:
+            inicio = time.perf_counter()
+            try:
+                conn = self._pilha.enter_context(self.db_config.connection())
+                conectado = time.perf_counter()
+                self._cursor = self._pilha.enter_context(conn.cursor(name=f"pmmt_cursor_{next(_nomes_cursor)}"))
+                self._cursor.itersize = self.lote
+                self._cursor.execute(query, params)
+            except Exception:
+                self._pilha.__exit__(*sys.exc_info())
+                self._cursor = None
+                metricas_queries.registrar_erro(self.origem)
+                raise
+            self._espera = conectado - inicio
+            self._execucao = time.perf_counter() - conectado
+
+    def proximo_lote(self) -> list:
+        with self._lock:
+            if self._cursor is None:
+                return []
+            inicio = time.perf_counter()
+            try:
+                linhas = self._cursor.fetchmany(self.lote)
+            except Exception:
+                self._fechar(*sys.exc_info())
+                raise
+            self._leitura += time.perf_counter() - inicio
+            return linhas
+
+    def fechar(self) -> None:
+        with self._lock:
+            self._fechar(None, None, None)
+
+    def _fechar(self, *erro) -> None:
+        if self._cursor is None:
+            return
+        self._cursor = None
+        self._pilha.__exit__(*erro)
+        if erro[0] is not None:
+            metricas_queries.registrar_erro(self.origem)
+        elif metricas_queries.ativo:
+            # Só o tempo do banco: a espera pelo cliente entre um lote e outro fica de fora
+            metricas_queries.registrar(self.origem, self._espera, self._execucao, self._leitura)
 
 class BaseModel:
+    # Threads dedicadas ao psycopg2, dimensionadas pelo pool de conexões para
+    # que o event loop do uvicorn nunca fique bloqueado esperando o banco.
+    _executor: Optional[ThreadPoolExecutor] = None
+    _executor_lock = threading.Lock()
+    # Queries idênticas (texto + parâmetros) em andamento compartilham uma única execução
+    _single_flight = SingleFlight()
+
     def __init__(self):
         self.db_config = DatabaseConfig()
 
     def execute_query(self, query: str, params: tuple = None) -> Optional[list]:
-        """Executa uma query e retorna os resultados."""
-        conn = None
+        """Executa uma query usando uma conexão do pool e retorna os resultados."""
+        origem = self._origem_chamada()
+        self._contar(origem)
+        inicio = time.perf_counter()
         try:
-            conn = self.db_config.get_connection()
-            if not conn:
-                return None
+            with self.db_config.connection() as conn:
+                conectado = time.perf_counter()
+                with conn.cursor() as cursor:
+                    if params:
+                        cursor.execute(query, params)
+                    else:
+                        cursor.execute(query)
+                    executado = time.perf_counter()
+                    resultado = cursor.fetchall()
+                    self._medir(origem, conn, cursor, inicio, conectado, executado, query, params)
+                    return resultado
 
-            with conn.cursor() as cursor:
-                if params:
-                    cursor.execute(query, params)
-                else:
-                    cursor.execute(query)
-                
-                return cursor.fetchall()
+        except Exception as e:
+            metricas_queries.registrar_erro(origem)
+            logger.error("Erro ao executar query em %s: %s", origem, e)
+            return None
 
+    def execute_prepared(self, nome: str, query: str, params: tuple = ()) -> Optional[list]:
+        """
+        Executa uma query como prepared statement no servidor (PREPARE/EXECUTE).
+        A query usa marcadores $1, $2...; o PREPARE acontece uma única vez por
+        conexão do pool e as execuções seguintes reaproveitam o plano.
+        """
+        origem = self._origem_chamada()
+        self._contar(origem)
+        marcadores = ", ".join(["%s"] * len(params))
+        comando = f"EXECUTE {nome}({marcadores})" if params else f"EXECUTE {nome}"
+        inicio = time.perf_counter()
+        try:
+            with self.db_config.connection() as conn:
+                conectado = time.perf_counter()
+                preparadas = getattr(conn, "preparadas", set())
+                with conn.cursor() as cursor:
+                    if nome not in preparadas:
+                        self._preparar(conn, cursor, nome, query)
+                    try:
+                        cursor.execute(comando, params)
+                    except errors.InvalidSqlStatementName:
+                        # O statement sumiu da sessão (ex.: DISCARD ALL); prepara de novo
+                        conn.rollback()
+                        self._preparar(conn, cursor, nome, query)
+                        cursor.execute(comando, params)
+                    executado = time.perf_counter()
+                    resultado = cursor.fetchall()
+                    self._medir(origem, conn, cursor, inicio, conectado, executado, comando, params)
+                    return resultado
         except Exception as e:
-            print(f"Erro ao executar query: {e}")
+            metricas_queries.registrar_erro(origem)
+            logger.error("Erro ao executar prepared statement %s em %s: %s", nome, origem, e)
             return None
-        finally:
-            if conn:
-                conn.close()
+
+    @staticmethod
+    def _preparar(conn, cursor, nome: str, query: str) -> None:
+        try:
+            cursor.execute(f"PREPARE {nome} AS {query}")
+        except errors.DuplicatePreparedStatement:
+            conn.rollback()
+        if hasattr(conn, "preparadas"):
+            conn.preparadas.add(nome)
+
+    def execute_command(self, query: str, params: tuple = None) -> bool:
+        """Executa um comando sem retorno de linhas (DDL, REFRESH...) e confirma a transação."""
+        origem = self._origem_chamada()
+        self._contar(origem)
+        inicio = time.perf_counter()
+        try:
+            with self.db_config.connection() as conn:
+                conectado = time.perf_counter()
+                with conn.cursor() as cursor:
+                    cursor.execute(query, params)
+            if metricas_queries.ativo:
+                fim = time.perf_counter()
+                metricas_queries.registrar(origem, conectado - inicio, fim - conectado)
+            return True
+
+        except Exception as e:
+            metricas_queries.registrar_erro(origem)
+            logger.error("Erro ao executar comando em %s: %s", origem, e)
+            return False
+
+    @staticmethod
+    def _origem_chamada() -> str:
+        """
+        Método do model que originou a query ("Classe.metodo"). Nas chamadas
+        assíncronas vem do contexto preenchido antes de ir para as threads do
+        banco; nas síncronas, do primeiro frame fora da camada de acesso.
+        """
+        origem = _origem_query.get()
+        if origem is not None:
+            return origem
+        frame = sys._getframe(1)
+        while frame is not None and frame.f_code.co_filename in _ARQUIVOS_INTERNOS:
+            frame = frame.f_back
+        if frame is None:
+            return "desconhecido"
+        dono = frame.f_locals.get("self")
+        if dono is not None:
+            return f"{type(dono).__name__}.{frame.f_code.co_name}"
+        return frame.f_code.co_name
+
+    @staticmethod
+    def _contar(origem: str) -> None:
+        """Conta a ida ao banco na requisição em andamento (modo DB_CONTAR_QUERIES)."""
+        contagem = contagem_queries.get()
+        if contagem is not None:
+            contagem.incrementar(origem)
+
+    def _medir(self, origem: str, conn, cursor, inicio: float, conectado: float,
+               executado: float, query: str, params) -> None:
+        """Registra os tempos da query e, se ela foi lenta, envia o plano ao log."""
+        if not metricas_queries.ativo:
+            return
+        lido = time.perf_counter()
+        lenta = metricas_queries.registrar(origem, conectado - inicio, executado - conectado, lido - executado)
+        if not lenta:
+            return
+        duracao_ms = (lido - conectado) * 1000
+        if not metricas_queries.deve_explicar(origem):
+            logger.warning("Query lenta em %s: %.1f ms", origem, duracao_ms)
+            return
+        try:
+            cursor.execute(f"EXPLAIN {query}", params or None)
+            plano = "\n".join(linha[0] for linha in cursor.fetchall())
+        except Exception as e:
+            conn.rollback()
+            plano = f"(EXPLAIN indisponível: {e})"
+        logger.warning(
+            "Query lenta em %s: %.1f ms (espera pelo pool %.1f ms)\n%s",
+            origem, duracao_ms, (conectado - inicio) * 1000, plano,
+            extra={"metodo": origem, "duracao_ms": round(duracao_ms, 1)}
+        )
 
     def execute_query_single(self, query: str, params: tuple = None) -> Optional[Any]:
         """Executa uma query e retorna um único resultado."""
         results = self.execute_query(query, params)
-        return results[0] if results else None 
\ No newline at end of file
+        return results[0] if results else None
+
+    @classmethod
+    def _get_executor(cls) -> ThreadPoolExecutor:
+        if BaseModel._executor is None:
+            with BaseModel._executor_lock:
+                if BaseModel._executor is None:
+                    BaseModel._executor = ThreadPoolExecutor(
+                        max_workers=DatabaseConfig().pool_max,
+                        thread_name_prefix="pmmt-db",
+                    )
+        return BaseModel._executor
+
+    @classmethod
+    def shutdown_executor(cls) -> None:
+        """Encerra as threads de acesso ao banco (usado no encerramento da aplicação)."""
+        with BaseModel._executor_lock:
+            if BaseModel._executor is not None:
+                BaseModel._executor.shutdown(wait=True)
+                BaseModel._executor = None
+
+    async def run_async(self, func: Callable[..., T], *args, **kwargs) -> T:
+        """Executa uma função bloqueante nas threads do banco sem travar o event loop."""
+        loop = asyncio.get_running_loop()
+        contexto = contextvars.copy_context()
+        if contexto.get(_origem_query) is None:
+            # Sem método de origem no contexto: a própria função executada identifica a query
+            if getattr(func, "__self__", None) is self:
+                origem = f"{type(self).__name__}.{func.__name__}"
+            else:
+                origem = self._origem_chamada()
+            contexto.run(_origem_query.set, origem)
+        chamada = functools.partial(contexto.run, func, *args, **kwargs)
+        return await loop.run_in_executor(self._get_executor(), chamada)
+
+    async def execute_query_async(self, query: str, params: tuple = None) -> Optional[list]:
+        """
+        Versão assíncrona de execute_query, para uso nas rotas async.
+        Requisições concorrentes com a mesma query e os mesmos parâmetros
+        compartilham a mesma execução no banco e o mesmo resultado.
+        """
+        chave = chave_hashable((query, params))
+        token = _origem_query.set(self._origem_chamada())
+        try:
+            if chave is None:
+                return await self.run_async(self.execute_query, query, params)
+            return await BaseModel._single_flight.executar(
+                chave, lambda: self.run_async(self.execute_query, query, params)
+            )
+        finally:
+            _origem_query.reset(token)
+
+    async def execute_prepared_async(self, nome: str, query: str, params: tuple = ()) -> Optional[list]:
+        """Versão assíncrona de execute_prepared, com a mesma coalescência de execute_query_async."""
+        chave = chave_hashable(("prepared", nome, params))
+        token = _origem_query.set(self._origem_chamada())
+        try:
+            if chave is None:
+                return await self.run_async(self.execute_prepared, nome, query, params)
+            return await BaseModel._single_flight.executar(
+                chave, lambda: self.run_async(self.execute_prepared, nome, query, params)
+            )
+        finally:
+            _origem_query.reset(token)
+
+    async def execute_command_async(self, query: str, params: tuple = None) -> bool:
+        """Versão assíncrona de execute_command."""
+        return await self.run_async(self.execute_command, query, params)
+
+    async def execute_query_single_async(self, query: str, params: tuple = None) -> Optional[Any]:
+        """Versão assíncrona de execute_query_single."""
+        results = await self.execute_query_async(query, params)
+        return results[0] if results else None
+
+    async def stream_query_async(self, query: str, params: tuple = None,
+                                 lote: int = LOTE_CURSOR) -> AsyncIterator[List[tuple]]:
+        """
+        Executa a query em um cursor do servidor e entrega as linhas em lotes,
+        para resultados grandes demais para o fetchall() do execute_query.
+        A conexão fica emprestada até o fim da iteração; erros são propagados.
+        """
+        origem = self._origem_chamada()
+        self._contar(origem)
+        cursor = _CursorServidor(self.db_config, origem, lote)
+        try:
+            await self.run_async(cursor.abrir, query, params)
+            while True:
+                linhas = await self.run_async(cursor.proximo_lote)
+                if not linhas:
+                    break
+                yield linhas
+        except Exception as e:
+            logger.error("Erro ao ler cursor do servidor em %s: %s", origem, e)
+            raise
+        finally:
+            # Sem await: se o cliente desconectou, a tarefa já está cancelada.
+            # O lock do cursor faz o fechamento esperar um lote em andamento.
+            self._get_executor().submit(cursor.fechar)
@@ -0,0 +1,72 @@
+import asyncio
+import logging
+from typing import Dict, List, Optional, Tuple
+from .base_model import BaseModel
+from ..utils.string_utils import gerar_chave_cidade
+
+logger = logging.getLogger(__name__)
+
+class CidadeIndex(BaseModel):
+    """
+    Índice em memória que resolve nomes de cidades (com ou sem acento,
+    apóstrofo ou variações de D'OESTE) para os códigos da tabela de cidades.
+    """
+
+    def __init__(self, query: str):
+        super().__init__()
+        self.query = query
+        self._indice: Dict[str, Tuple[int, ...]] = {}
+        self._nomes: Dict[int, str] = {}
+        self._carregado = False
+        self._lock: Optional[asyncio.Lock] = None
+
+    @property
+    def carregado(self) -> bool:
+        return self._carregado
+
+    async def carregar(self) -> bool:
+        """Lê a tabela de cidades e reconstrói o índice. Retorna False em caso de falha."""
+        results = await self.execute_query_async(self.query)
+        if results is None:
+            return False
+
+        indice: Dict[str, List[int]] = {}
+        nomes: Dict[int, str] = {}
+        for cod_cidade, nome_cidade in results:
+            if not nome_cidade:
+                continue
+            nomes[cod_cidade] = nome_cidade
+            indice.setdefault(gerar_chave_cidade(nome_cidade), []).append(cod_cidade)
+
+        # Troca atômica: leitores nunca veem um índice pela metade
+        self._indice = {chave: tuple(cods) for chave, cods in indice.items()}
+        self._nomes = nomes
+        self._carregado = True
+        logger.info("Índice de cidades carregado: %d cidades", len(nomes))
+        return True
+
+    async def garantir_carregado(self) -> bool:
+        """Carrega o índice na primeira utilização, caso ainda não tenha sido carregado."""
+        if self._carregado:
+            return True
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            if not self._carregado:
+                await self.carregar()
+        return self._carregado
+
+    def resolver(self, cidade: str) -> Tuple[int, ...]:
+        """Retorna os códigos das cidades cujo nome corresponde ao informado."""
+        return self._indice.get(gerar_chave_cidade(cidade), ())
+
+    def nome(self, cod_cidade: int) -> Optional[str]:
+        """Retorna o nome cadastrado para o código de cidade."""
+        return self._nomes.get(cod_cidade)
+
+
+# Índice da tabela de cidades do SGPM, carregado na inicialização da aplicação
+cidades_sgpm = CidadeIndex("SELECT cod_cidade, nome_cidade FROM sgpm.cidade")
+
+# Índice da tabela geral de cidades, usado pelas contagens do CONEQ
+cidades_geral = CidadeIndex("SELECT cod_cidade, cidade FROM geral.tb_cidade")
@@ -1,8 +1,17 @@
-from typing import List, Dict, Optional
+import logging
+from typing import List, Dict, Optional, Tuple
 from .base_model import BaseModel
+from .cidade_index import cidades_geral
+from .tabelas_referencia import tabelas_referencia
+from ..utils.cache import cache_resultado
+
+logger = logging.getLogger(__name__)
+
+# Status de termo de cautela exibidos no painel (6 e 7 = ativas, 8 e 9 = descauteladas)
+STATUS_CAUTELA = (6, 7, 8, 9)
 
 class ConeqModel(BaseModel):
-    def get_estoque_quantidade(self) -> List[Dict]:
+    async def get_estoque_quantidade(self) -> List[Dict]:
         query = """
         SELECT 
             te.nome AS equipamento_nome, 
@@ -18,218 +27,211 @@ class ConeqModel(BaseModel):
         ORDER BY 
             te.nome;
         """
-        results = self.execute_query(query)
+        results = await self.execute_query_async(query)
         if not results:
             return []
         return [{"equipamento_nome": row[0], "quantidade_em_estoque": row[1]} for row in results]
 
-    def get_estoque_geral(self) -> Dict:
+    @cache_resultado("resumo_estoque", ttl=30)
+    async def get_resumo_estoque(self) -> Dict:
+        return await self._consultar_resumo_estoque()
+
+    async def _consultar_resumo_estoque(self) -> Dict:
+        """
+        Estoque por status de todos os tipos de equipamento, mais o total geral,
+        em uma única consulta. O saldo de cautelas (termos de cautela menos termos
+        de descautela) é global e calculado uma única vez, fora do agrupamento.
+        """
         query = """
+        WITH saldo AS (
+            SELECT
+                (SELECT COUNT(tc.cod_cautela) FROM coneq.termo_cautela tc) -
+                (SELECT COUNT(td.cod_descautela) FROM coneq.termo_descautela td) AS cautela_real
+        )
         SELECT 
+            e.tipo_equipamento_id,
             e.status AS status_estoque,
             COUNT(e.id) AS quantidade_estoque,
-            (SELECT COUNT(tc.cod_cautela) FROM coneq.termo_cautela tc) AS qtd_cautelas,
-            (SELECT COUNT(td.cod_descautela) FROM coneq.termo_descautela td) AS qtd_descautelas,
-            ((SELECT COUNT(tc.cod_cautela) FROM coneq.termo_cautela tc) - 
-             (SELECT COUNT(td.cod_descautela) FROM coneq.termo_descautela td)) AS cautela_real
+            GROUPING(e.tipo_equipamento_id) AS geral,
+            saldo.cautela_real
         FROM 
             coneq.equipamento e
+        CROSS JOIN 
+            saldo
         WHERE 
             e.status IN ('EM ESTOQUE', 'SEPARADO PARA ENTREGA', 'ENTREGUE')
         GROUP BY 
-            e.status;
+            GROUPING SETS ((e.tipo_equipamento_id, e.status), (e.status)), saldo.cautela_real;
         """
-        results = self.execute_query(query)
+        results = await self.execute_query_async(query)
         if not results:
-            return {"estoque": [], "cautelas": 0}
-        
-        estoque = [{"status": row[0], "quantidade": row[1]} for row in results]
-        cautela_real = results[0][4] if results else 0
-        
-        return {"estoque": estoque, "cautelas": cautela_real}
-
-    def get_estoque_por_tipo(self, tipo_equipamento_id: int) -> Dict:
+            return {"geral": {}, "por_tipo": {}}
+
+        cautela_real = results[0][4]
+        geral = []
+        por_tipo: Dict[int, List[Dict]] = {}
+        for tipo_id, status, quantidade, eh_geral, _ in results:
+            item = {"status": status, "quantidade": quantidade}
+            if eh_geral:
+                geral.append(item)
+            else:
+                por_tipo.setdefault(tipo_id, []).append(item)
+
+        return {
+            "geral": {"estoque": geral, "cautelas": cautela_real},
+            "por_tipo": {
+                tipo_id: {"estoque": estoque, "cautelas": cautela_real}
+                for tipo_id, estoque in por_tipo.items()
+            },
+        }
+
+    async def get_estoque_geral(self) -> Dict:
+        resumo = await self.get_resumo_estoque()
+        return resumo["geral"] or {"estoque": [], "cautelas": 0}
+
+    async def get_estoque_por_tipo(self, tipo_equipamento_id: int) -> Dict:
+        resumo = await self.get_resumo_estoque()
+        return resumo["por_tipo"].get(tipo_equipamento_id, {"estoque": [], "cautelas": 0})
+
+    @cache_resultado("resumo_cautelas", ttl=30)
+    async def get_resumo_cautelas(self) -> Dict:
+        """
+        Cautelas por status_id (6 a 9) de todos os tipos de equipamento, mais o
+        total geral, em uma única consulta agrupada.
+        """
         query = """
-        SELECT 
-            e.status AS status_estoque,
-            COUNT(e.id) AS quantidade_estoque,
-            (SELECT COUNT(tc.cod_cautela) FROM coneq.termo_cautela tc) AS qtd_cautelas,
-            (SELECT COUNT(td.cod_descautela) FROM coneq.termo_descautela td) AS qtd_descautelas,
-            ((SELECT COUNT(tc.cod_cautela) FROM coneq.termo_cautela tc) - 
-             (SELECT COUNT(td.cod_descautela) FROM coneq.termo_descautela td)) AS cautela_real
-        FROM 
-            coneq.equipamento e
-        WHERE 
-            e.tipo_equipamento_id = %s AND
-            e.status IN ('EM ESTOQUE', 'SEPARADO PARA ENTREGA', 'ENTREGUE')
-        GROUP BY 
-            e.status;
+        SELECT
+            te.id AS tipo_equipamento_id,
+            tc.status_id,
+            COUNT(*) AS quantidade,
+            GROUPING(te.id) AS geral
+        FROM
+            coneq.tipo_equipamento te
+        INNER JOIN
+            coneq.equipamento e ON e.tipo_equipamento_id = te.id
+        INNER JOIN
+            coneq.termo_cautela tc ON tc.cod_cautela = e.termo_cautela_cod_cautela
+        WHERE
+            tc.status_id IN (6, 7, 8, 9)
+        GROUP BY
+            GROUPING SETS ((te.id, tc.status_id), (tc.status_id));
         """
-        results = self.execute_query(query, (tipo_equipamento_id,))
-        if not results:
-            return {"estoque": [], "cautelas": 0}
-        
-        estoque = [{"status": row[0], "quantidade": row[1]} for row in results]
-        cautela_real = results[0][4] if results else 0
-        
-        return {"estoque": estoque, "cautelas": cautela_real}
-
-    def get_cautela_por_tipo(self, tipo_equipamento_id: int, status: str = "todos") -> Dict:
-        if status == "todos":
-            # Se tipo_equipamento_id for 0, busca todos os tipos
-            tipo_condition = "" if tipo_equipamento_id == 0 else "AND te.id = %s"
-            params = (tipo_equipamento_id,) if tipo_equipamento_id != 0 else ()
-            
-            query = f"""
-            SELECT
-                COUNT(CASE WHEN tc.status_id = 6 THEN 1 END) AS status_6,
-                COUNT(CASE WHEN tc.status_id = 7 THEN 1 END) AS status_7,
-                COUNT(CASE WHEN tc.status_id = 8 THEN 1 END) AS status_8,
-                COUNT(CASE WHEN tc.status_id = 9 THEN 1 END) AS status_9
-            FROM
-                coneq.tipo_equipamento te
-            INNER JOIN
-                coneq.equipamento e ON e.tipo_equipamento_id = te.id
-            INNER JOIN
-                coneq.termo_cautela tc ON tc.cod_cautela = e.termo_cautela_cod_cautela
-            WHERE
-                tc.status_id IN (6, 7, 8, 9)
-                {tipo_condition}
-            """
-            results = self.execute_query(query, params)
-            if not results:
-                return {"cautela": []}
+        results = await self.execute_query_async(query)
+        if results is None:
+            return {}
 
-            status_6, status_7, status_8, status_9 = results[0] if results else (0, 0, 0, 0)
-            return {
-                "cautela": [
-                    {"status": "6", "quantidade": status_6},
-                    {"status": "7", "quantidade": status_7},
-                    {"status": "8", "quantidade": status_8},
-                    {"status": "9", "quantidade": status_9}
-                ]
-            }
-        else:
-            query = """
-            SELECT
-                COUNT(CASE WHEN tc.status_id = %s THEN 1 END) AS status
-            FROM
-                coneq.tipo_equipamento te
-            INNER JOIN
-                coneq.equipamento e ON e.tipo_equipamento_id = te.id
-            INNER JOIN
-                coneq.termo_cautela tc ON tc.cod_cautela = e.termo_cautela_cod_cautela
-            WHERE
-                te.id = %s
-                AND tc.status_id = %s;
-            """
-            results = self.execute_query(query, (status, tipo_equipamento_id, status))
-            if not results:
+        geral = dict.fromkeys(STATUS_CAUTELA, 0)
+        por_tipo: Dict[int, Dict[int, int]] = {}
+        for tipo_id, status_id, quantidade, eh_geral in results:
+            if eh_geral:
+                geral[status_id] = quantidade
+            else:
+                por_tipo.setdefault(tipo_id, dict.fromkeys(STATUS_CAUTELA, 0))[status_id] = quantidade
+
+        def formatar(contagens: Dict[int, int]) -> List[Dict]:
+            return [{"status": str(status), "quantidade": contagens[status]} for status in STATUS_CAUTELA]
+
+        return {
+            "geral": formatar(geral),
+            "por_tipo": {tipo_id: formatar(contagens) for tipo_id, contagens in por_tipo.items()},
+        }
+
+    async def get_cautela_por_tipo(self, tipo_equipamento_id: int, status: str = "todos") -> Dict:
+        if status == "todos" or (status.isdigit() and int(status) in STATUS_CAUTELA):
+            resumo = await self.get_resumo_cautelas()
+            if not resumo:
                 return {"cautela": []}
 
-            return {
-                "cautela": [
-                    {"status": status, "quantidade": results[0][0] if results else 0}
-                ]
-            }
+            # Se tipo_equipamento_id for 0, usa o total de todos os tipos
+            if tipo_equipamento_id == 0:
+                cautela = resumo["geral"]
+            else:
+                cautela = resumo["por_tipo"].get(
+                    tipo_equipamento_id,
+                    [{"status": str(s), "quantidade": 0} for s in STATUS_CAUTELA]
+                )
+            if status != "todos":
+                quantidade = next(item["quantidade"] for item in cautela if item["status"] == str(int(status)))
+                cautela = [{"status": status, "quantidade": quantidade}]
+            return {"cautela": cautela}
 
-    def get_tipos_equipamento(self) -> List[Dict]:
         query = """
-        SELECT id, nome
-        FROM coneq.tipo_equipamento;
+        SELECT
+            COUNT(CASE WHEN tc.status_id = %s THEN 1 END) AS status
+        FROM
+            coneq.tipo_equipamento te
+        INNER JOIN
+            coneq.equipamento e ON e.tipo_equipamento_id = te.id
+        INNER JOIN
+            coneq.termo_cautela tc ON tc.cod_cautela = e.termo_cautela_cod_cautela
+        WHERE
+            te.id = %s
+            AND tc.status_id = %s;
         """
-        results = self.execute_query(query)
+        results = await self.execute_query_async(query, (status, tipo_equipamento_id, status))
         if not results:
-            return []
-        return [{"id": row[0], "nome": row[1]} for row in results]
+            return {"cautela": []}
 
-    def get_cautelas_por_cidade(self, cidades: List[str]) -> List[Dict]:
-        try:
-            cidades_upper = [cidade.upper() for cidade in cidades]
-            cidade_filtro = ",".join([f"'{cidade}'" for cidade in cidades_upper])
-            
-            query = f"""
-                SELECT 
-                    UPPER(c.cidade) AS nome_cidade, 
-                    COUNT(DISTINCT e.id) AS qtd_cautelas
-                FROM coneq.equipamento e
-                JOIN coneq.termo_cautela tc ON tc.cod_cautela = e.termo_cautela_cod_cautela
-                JOIN geral.tb_policial p ON p.cod_policial = tc.recebedor
-                JOIN geral.tb_upm up ON up.cod_upm = p.cod_upm
-                JOIN geral.tb_cidade c ON c.cod_cidade = up.cod_cidade
-                WHERE UPPER(c.cidade) IN ({cidade_filtro})
-                AND tc.status_id IN (6, 7)  -- Apenas cautelas ativas (Aguardando Assinatura e Assinado)
-                GROUP BY UPPER(c.cidade)
-            """
-            
-            print(f"Executando query de cautelas: {query}")  # Debug
-            results = self.execute_query(query)
-            print(f"Resultados da consulta de cautelas: {results}")  # Debug
-            
-            if not results:
-                print(f"Nenhum resultado encontrado para as cidades: {cidades_upper}")
-                return [{"nome_cidade": cidade, "qtd_cautelas": 0} for cidade in cidades]
-
-            resultados_dict = {row[0]: row[1] for row in results}
-            print(f"Dicionário de resultados de cautelas: {resultados_dict}")  # Debug
-            
-            retorno = []
-            for cidade in cidades:
-                cidade_upper = cidade.upper()
-                qtd = resultados_dict.get(cidade_upper, 0)
-                retorno.append({
-                    "nome_cidade": cidade,
-                    "qtd_cautelas": qtd
-                })
-            print(f"Retorno final de cautelas: {retorno}")  # Debug
-            return retorno
-            
-        except Exception as e:
-            print(f"Erro na consulta de cautelas por cidade: {str(e)}")
-            return [{"nome_cidade": cidade, "qtd_cautelas": 0} for cidade in cidades]
+        return {
+            "cautela": [
+                {"status": status, "quantidade": results[0][0] if results else 0}
+            ]
+        }
+
+    async def get_tipos_equipamento(self) -> List[Dict]:
+        """Retorna os tipos de equipamento, do snapshot em memória."""
+        await tabelas_referencia.garantir_carregado()
+        return list(tabelas_referencia.tipos_equipamento)
 
-    def get_entregas_por_cidade(self, cidades: List[str]) -> List[Dict]:
+    async def _contar_por_cidade(self, nome: str, query: str, cidades: List[str]) -> Dict[str, Tuple[int, ...]]:
+        """
+        Executa uma contagem por cidade preparada no servidor. As cidades são
+        resolvidas para códigos pelo índice em memória, então a query tem sempre
+        o mesmo formato ($1 = array de códigos) e o plano é reaproveitado.
+        A query retorna o código da cidade seguido das contagens.
+        """
+        await cidades_geral.garantir_carregado()
+        codigos_por_cidade = {cidade: cidades_geral.resolver(cidade) for cidade in cidades}
+        codigos = sorted({cod for cods in codigos_por_cidade.values() for cod in cods})
+        if not codigos:
+            return {cidade: () for cidade in cidades}
+
+        results = await self.execute_prepared_async(nome, query, (codigos,))
+        if results is None:
+            raise RuntimeError(f"falha ao executar {nome}")
+
+        por_codigo = {row[0]: row[1:] for row in results}
+        return {
+            cidade: tuple(map(sum, zip(*(por_codigo[cod] for cod in cods if cod in por_codigo))))
+            for cidade, cods in codigos_por_cidade.items()
+        }
+
+    async def get_cautelas_entregas_por_cidade(self, cidades: List[str]) -> List[Dict]:
+        """
+        Cautelas ativas e entregas por cidade em uma única passada pelo JOIN:
+        as entregas são o subconjunto das cautelas com equipamento ENTREGUE.
+        """
+        query = """
+            SELECT 
+                up.cod_cidade, 
+                COUNT(DISTINCT e.id) AS qtd_cautelas,
+                COUNT(DISTINCT e.id) FILTER (WHERE e.status = 'ENTREGUE') AS qtd_entregas
+            FROM coneq.equipamento e
+            JOIN coneq.termo_cautela tc ON tc.cod_cautela = e.termo_cautela_cod_cautela
+            JOIN geral.tb_policial p ON p.cod_policial = tc.recebedor
+            JOIN geral.tb_upm up ON up.cod_upm = p.cod_upm
+            WHERE up.cod_cidade = ANY($1::int[])
+            AND tc.status_id IN (6, 7)  -- Apenas cautelas ativas (Aguardando Assinatura e Assinado)
+            GROUP BY up.cod_cidade
+        """
         try:
-            cidades_upper = [cidade.upper() for cidade in cidades]
-            cidade_filtro = ",".join([f"'{cidade}'" for cidade in cidades_upper])
-            
-            query = f"""
-                SELECT 
-                    UPPER(c.cidade) AS nome_cidade, 
-                    COUNT(DISTINCT e.id) AS qtd_entregas
-                FROM coneq.equipamento e
-                JOIN coneq.termo_cautela tc ON tc.cod_cautela = e.termo_cautela_cod_cautela
-                JOIN geral.tb_policial p ON p.cod_policial = tc.recebedor
-                JOIN geral.tb_upm up ON up.cod_upm = p.cod_upm
-                JOIN geral.tb_cidade c ON c.cod_cidade = up.cod_cidade
-                WHERE UPPER(c.cidade) IN ({cidade_filtro})
-                AND e.status = 'ENTREGUE'
-                AND tc.status_id IN (6, 7)  -- Apenas cautelas ativas (Aguardando Assinatura e Assinado)
-                GROUP BY UPPER(c.cidade)
-            """
-            
-            print(f"Executando query de entregas: {query}")  # Debug
-            results = self.execute_query(query)
-            print(f"Resultados da consulta de entregas: {results}")  # Debug
-            
-            if not results:
-                print(f"Nenhum resultado encontrado para as cidades: {cidades_upper}")
-                return [{"nome_cidade": cidade, "qtd_entregas": 0} for cidade in cidades]
-
-            resultados_dict = {row[0]: row[1] for row in results}
-            print(f"Dicionário de resultados de entregas: {resultados_dict}")  # Debug
-            
-            retorno = []
-            for cidade in cidades:
-                cidade_upper = cidade.upper()
-                qtd = resultados_dict.get(cidade_upper, 0)
-                retorno.append({
-                    "nome_cidade": cidade,
-                    "qtd_entregas": qtd
-                })
-            print(f"Retorno final de entregas: {retorno}")  # Debug
-            return retorno
-            
+            contagens = await self._contar_por_cidade("coneq_cautelas_entregas_por_cidade", query, cidades)
         except Exception as e:
-            print(f"Erro na consulta de entregas por cidade: {str(e)}")
-            return [{"nome_cidade": cidade, "qtd_entregas": 0} for cidade in cidades] 
\ No newline at end of file
+            logger.error("Erro na consulta de cautelas e entregas por cidade: %s", e)
+            contagens = {}
+
+        retorno = []
+        for cidade in cidades:
+            qtd_cautelas, qtd_entregas = contagens.get(cidade) or (0, 0)
+            retorno.append({"nome_cidade": cidade, "qtd_cautelas": qtd_cautelas, "qtd_entregas": qtd_entregas})
+        return retorno
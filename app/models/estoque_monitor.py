@@ -0,0 +1,85 @@
+import asyncio
+import os
+from typing import Any, Dict, Optional, Set
+from .coneq_model import ConeqModel
+from ..utils.cache import cache_resultados
+
+class EstoqueMonitor(ConeqModel):
+    """
+    Acompanha o estoque do CONEQ para os painéis abertos via Server-Sent Events.
+    Uma única verificação periódica no servidor recalcula o estoque e, quando
+    algo muda, envia apenas as partes alteradas a todos os assinantes. O custo
+    no banco não depende de quantas telas estão abertas.
+    """
+
+    # Eventos pendentes por assinante; um assinante lento recebe o estado completo
+    MAX_PENDENTES = 16
+
+    def __init__(self):
+        super().__init__()
+        self.intervalo = float(os.getenv("CONEQ_ESTOQUE_POLL_SEGUNDOS", "5"))
+        self.estado: Dict[str, Any] = {}
+        self.versao = 0
+        self._assinantes: Set[asyncio.Queue] = set()
+        self._lock: Optional[asyncio.Lock] = None
+
+    @property
+    def assinantes(self) -> int:
+        return len(self._assinantes)
+
+    async def assinar(self) -> asyncio.Queue:
+        """Registra um assinante; o primeiro evento da fila é o estado completo."""
+        if not self.estado:
+            await self._atualizar()
+        fila: asyncio.Queue = asyncio.Queue(maxsize=self.MAX_PENDENTES)
+        self._assinantes.add(fila)
+        if self.estado:
+            fila.put_nowait(("snapshot", self.versao, self.estado))
+        return fila
+
+    def cancelar(self, fila: asyncio.Queue) -> None:
+        self._assinantes.discard(fila)
+
+    async def verificar(self) -> None:
+        """Recalcula o estoque (se houver assinantes) e distribui o que mudou."""
+        if self._assinantes:
+            await self._atualizar()
+
+    async def _atualizar(self) -> None:
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            # Lê o resumo direto do banco: o cache das rotas REST só é descartado se algo mudou
+            estoque, resumo = await asyncio.gather(
+                self.get_estoque_quantidade(), self._consultar_resumo_estoque()
+            )
+            estoque_geral = resumo["geral"] or {"estoque": [], "cautelas": 0}
+            if not estoque and not estoque_geral["estoque"]:
+                return
+
+            novo = {"estoque": estoque, "estoque_geral": estoque_geral}
+            diferenca = {chave: valor for chave, valor in novo.items() if self.estado.get(chave) != valor}
+            if not diferenca:
+                return
+
+            cache_resultados.invalidar("resumo_estoque")
+            if self.estado:
+                # Mudou o estoque: as cautelas em cache provavelmente também mudaram
+                cache_resultados.invalidar("resumo_cautelas")
+            self.estado = novo
+            self.versao += 1
+            self._publicar(("diff", self.versao, diferenca))
+
+    def _publicar(self, evento: tuple) -> None:
+        for fila in list(self._assinantes):
+            try:
+                fila.put_nowait(evento)
+            except asyncio.QueueFull:
+                # Descarta o acumulado e reenvia o estado completo
+                while not fila.empty():
+                    fila.get_nowait()
+                fila.put_nowait(("snapshot", self.versao, self.estado))
+
+
+# Instância compartilhada; a verificação periódica é agendada na inicialização
+estoque_monitor = EstoqueMonitor()
@@ -0,0 +1,131 @@
+import gzip
+import hashlib
+import json
+import logging
+import os
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional
+
+from .base_model import BaseModel
+from ..utils.simplificacao import SimplificadorTopologico
+
+logger = logging.getLogger(__name__)
+
+try:
+    import orjson
+except ImportError:  # orjson e brotli são opcionais, como no restante da API
+    orjson = None
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+ARQUIVO_PADRAO = Path(__file__).resolve().parents[2] / "src" / "data" / "geo-MT.json"
+
+
+class NivelGeo(NamedTuple):
+    """Geometrias de um nível de zoom, já serializadas e pré-comprimidas."""
+    zoom: int
+    tolerancia: float
+    features: List[Dict]
+    corpos: Dict[str, bytes]   # codificação ("identity", "gzip", "br") -> corpo
+    etags: Dict[str, str]      # codificação -> ETag forte da representação
+
+
+def _serializar(conteudo) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(conteudo)
+    return json.dumps(conteudo, ensure_ascii=False, separators=(",", ":")).encode()
+
+
+class GeoModel(BaseModel):
+    """
+    Malha municipal de MT (src/data/geo-MT.json) simplificada uma única vez, na
+    inicialização, para alguns níveis de zoom. Cada nível fica em memória já
+    serializado e comprimido (gzip e, se disponível, brotli), com ETags fortes.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.arquivo = Path(os.getenv("GEO_MT_ARQUIVO") or ARQUIVO_PADRAO)
+        self.zooms = sorted(int(z) for z in os.getenv("GEO_NIVEIS_ZOOM", "5,7,9").split(",") if z.strip())
+        self.niveis: Dict[int, NivelGeo] = {}
+
+    @property
+    def carregado(self) -> bool:
+        return bool(self.niveis)
+
+    async def carregar(self) -> bool:
+        """Lê o arquivo e prepara todos os níveis fora do event loop."""
+        try:
+            self.niveis = await self.run_async(self._preparar)
+        except Exception as e:
+            logger.error("Erro ao preparar a malha municipal %s: %s", self.arquivo, e)
+            return False
+        logger.info("Malha municipal carregada: %d níveis de zoom", len(self.niveis))
+        return True
+
+    @staticmethod
+    def tolerancia_para_zoom(zoom: int) -> float:
+        """Meio pixel, em graus, de um tile de 256px no zoom informado."""
+        return 180.0 / (256 * 2 ** zoom)
+
+    def _preparar(self) -> Dict[int, NivelGeo]:
+        with open(self.arquivo, encoding="utf-8") as arquivo:
+            colecao = json.load(arquivo)
+
+        originais = colecao["features"]
+        poligonos = []
+        for feature in originais:
+            geometria = feature["geometry"]
+            aneis = geometria["coordinates"] if geometria["type"] == "Polygon" else [
+                anel for poligono in geometria["coordinates"] for anel in poligono
+            ]
+            poligonos.append([[tuple(ponto) for ponto in anel[:-1]] for anel in aneis])
+
+        simplificador = SimplificadorTopologico(poligonos)
+        niveis = {}
+        for zoom in self.zooms:
+            tolerancia = self.tolerancia_para_zoom(zoom)
+            aneis_simplificados = simplificador.simplificar(tolerancia, casas=5)
+            features = []
+            for posicao, feature in enumerate(originais):
+                geometria = feature["geometry"]
+                if geometria["type"] == "Polygon":
+                    coordenadas = aneis_simplificados[posicao]
+                else:
+                    # MultiPolygon: os anéis foram achatados; reagrupa por polígono
+                    coordenadas, indice = [], 0
+                    for poligono in geometria["coordinates"]:
+                        coordenadas.append(aneis_simplificados[posicao][indice:indice + len(poligono)])
+                        indice += len(poligono)
+                features.append({
+                    "type": "Feature",
+                    "properties": feature.get("properties", {}),
+                    "geometry": {"type": geometria["type"], "coordinates": coordenadas},
+                })
+
+            corpo = _serializar({"type": "FeatureCollection", "features": features})
+            corpos = {"identity": corpo, "gzip": gzip.compress(corpo, compresslevel=9, mtime=0)}
+            if brotli is not None:
+                corpos["br"] = brotli.compress(corpo, quality=11)
+            hash_corpo = hashlib.blake2b(corpo, digest_size=16).hexdigest()
+            etags = {
+                codificacao: f'"{hash_corpo}"' if codificacao == "identity" else f'"{hash_corpo}-{codificacao}"'
+                for codificacao in corpos
+            }
+            niveis[zoom] = NivelGeo(zoom, tolerancia, features, corpos, etags)
+        return niveis
+
+    def nivel(self, zoom: Optional[int]) -> NivelGeo:
+        """Nível mais detalhado que não passa do zoom pedido (sem zoom, o mais simples)."""
+        if zoom is None:
+            return self.niveis[min(self.niveis)]
+        candidatos = [z for z in self.niveis if z <= zoom]
+        escolhido = max(candidatos) if candidatos else min(self.niveis)
+        return self.niveis[escolhido]
+
+
+# Instância compartilhada, preparada na inicialização da aplicação
+geo_model = GeoModel()
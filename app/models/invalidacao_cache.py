@@ -0,0 +1,122 @@
+import asyncio
+import logging
+import os
+from typing import Optional
+
+import psycopg2
+from psycopg2 import extensions
+
+from .base_model import BaseModel
+from ..utils.cache import cache_resultados
+
+logger = logging.getLogger(__name__)
+
+class InvalidacaoCache(BaseModel):
+    """
+    Propaga as invalidações do cache de resultados entre os workers do gunicorn,
+    cada um com o seu cache em memória. Quem invalida publica um NOTIFY no canal
+    pmmt_cache; cada worker mantém uma conexão avulsa (fora do pool) em LISTEN,
+    lida pelo event loop, e invalida o próprio cache ao receber o aviso.
+    """
+
+    CANAL = "pmmt_cache"
+    # Payload que invalida o cache inteiro (nenhum endpoint tem esse nome)
+    TODOS = "*"
+
+    def __init__(self):
+        super().__init__()
+        self.ativo = os.getenv("CACHE_INVALIDACAO_DISTRIBUIDA", "true").lower() == "true"
+        self.intervalo_verificacao = float(os.getenv("CACHE_INVALIDACAO_VERIFICAR_SEGUNDOS", "30"))
+        self._conexao: Optional[extensions.connection] = None
+        self._descritor: Optional[int] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._ja_escutou = False
+
+    @property
+    def escutando(self) -> bool:
+        return self._conexao is not None and not self._conexao.closed
+
+    async def publicar(self, prefixo: Optional[str] = None) -> bool:
+        """Avisa todos os workers para invalidar o endpoint informado (ou tudo). Retorna False se não publicou."""
+        if not self.ativo:
+            return False
+        return await self.execute_command_async(
+            "SELECT pg_notify(%s, %s)", (self.CANAL, prefixo or self.TODOS)
+        )
+
+    async def verificar(self) -> None:
+        """Confere a conexão em LISTEN e a reabre se caiu (tarefa periódica de cada worker)."""
+        if not self.ativo:
+            return
+        if self.escutando:
+            try:
+                await self.run_async(self._ping)
+                self._processar()
+                return
+            except psycopg2.Error as erro:
+                logger.warning("Conexão de invalidação do cache perdida: %s", erro)
+                self.parar()
+
+        conexao = await self.run_async(self._escutar)
+        if conexao is None:
+            return
+        self._conexao = conexao
+        self._descritor = conexao.fileno()
+        self._loop = asyncio.get_running_loop()
+        self._loop.add_reader(self._descritor, self._receber)
+        if self._ja_escutou:
+            # Avisos enviados enquanto a conexão estava fora foram perdidos
+            cache_resultados.invalidar()
+        self._ja_escutou = True
+
+    def parar(self) -> None:
+        """Para de escutar e fecha a conexão (encerramento da aplicação ou conexão perdida)."""
+        if self._loop is not None and self._descritor is not None:
+            self._loop.remove_reader(self._descritor)
+        if self._conexao is not None and not self._conexao.closed:
+            try:
+                self._conexao.close()
+            except psycopg2.Error:
+                pass
+        self._conexao = None
+        self._descritor = None
+
+    def _escutar(self) -> Optional[extensions.connection]:
+        conexao = self.db_config.get_connection()
+        if conexao is None:
+            return None
+        try:
+            conexao.set_isolation_level(extensions.ISOLATION_LEVEL_AUTOCOMMIT)
+            with conexao.cursor() as cursor:
+                cursor.execute(f"LISTEN {self.CANAL}")
+        except psycopg2.Error as erro:
+            logger.error("Erro ao escutar o canal %s: %s", self.CANAL, erro)
+            conexao.close()
+            return None
+        return conexao
+
+    def _ping(self) -> None:
+        with self._conexao.cursor() as cursor:
+            cursor.execute("SELECT 1")
+
+    def _receber(self) -> None:
+        try:
+            self._conexao.poll()
+        except psycopg2.Error as erro:
+            logger.warning("Conexão de invalidação do cache perdida: %s", erro)
+            self.parar()
+            return
+        self._processar()
+
+    def _processar(self) -> None:
+        if self._conexao is None:
+            return
+        while self._conexao.notifies:
+            aviso = self._conexao.notifies.pop(0)
+            prefixo = None if aviso.payload == self.TODOS else aviso.payload
+            removidos = cache_resultados.invalidar(prefixo)
+            logger.debug("Cache invalidado por aviso (%s): %d itens", aviso.payload, removidos)
+
+
+# Instância compartilhada; cada worker abre a sua conexão em LISTEN na inicialização
+invalidacao_cache = InvalidacaoCache()
@@ -0,0 +1,70 @@
+import logging
+import os
+from typing import Optional
+
+import psycopg2
+from psycopg2 import extensions
+
+from .base_model import BaseModel
+
+logger = logging.getLogger(__name__)
+
+class LiderTarefas(BaseModel):
+    """
+    Elege, entre os workers do gunicorn, um único responsável pelas tarefas
+    periódicas que valem para todos (como o REFRESH do resumo do SGPM). Líder é
+    o worker cuja conexão avulsa (fora do pool) detém o advisory lock de sessão
+    pmmt_lider; se ele cair, a conexão fecha, o lock é liberado e outro worker
+    assume na verificação seguinte.
+    """
+
+    CHAVE = "pmmt_lider"
+
+    def __init__(self):
+        super().__init__()
+        self.intervalo_verificacao = float(os.getenv("TAREFAS_LIDER_VERIFICAR_SEGUNDOS", "30"))
+        self.eh_lider = False
+        self._conexao: Optional[extensions.connection] = None
+
+    async def verificar(self) -> bool:
+        """Confirma a liderança ou tenta assumi-la (tarefa periódica de cada worker)."""
+        era_lider = self.eh_lider
+        try:
+            self.eh_lider = await self.run_async(self._tentar)
+        except psycopg2.Error as erro:
+            logger.warning("Conexão da eleição de líder perdida: %s", erro)
+            self.parar()
+        if self.eh_lider and not era_lider:
+            logger.info("Worker %d assumiu as tarefas periódicas únicas", os.getpid())
+        elif era_lider and not self.eh_lider:
+            logger.warning("Worker %d deixou de ser o líder das tarefas periódicas", os.getpid())
+        return self.eh_lider
+
+    def parar(self) -> None:
+        """Fecha a conexão, liberando a liderança (encerramento da aplicação ou conexão perdida)."""
+        self.eh_lider = False
+        if self._conexao is not None and not self._conexao.closed:
+            try:
+                self._conexao.close()
+            except psycopg2.Error:
+                pass
+        self._conexao = None
+
+    def _tentar(self) -> bool:
+        if self._conexao is None or self._conexao.closed:
+            # Conexão nova não detém o lock, mesmo que a anterior detivesse
+            self.eh_lider = False
+            self._conexao = self.db_config.get_connection()
+            if self._conexao is None:
+                return False
+            self._conexao.set_isolation_level(extensions.ISOLATION_LEVEL_AUTOCOMMIT)
+        with self._conexao.cursor() as cursor:
+            if self.eh_lider:
+                cursor.execute("SELECT 1")
+                return True
+            cursor.execute("SELECT pg_try_advisory_lock(hashtext(%s))", (self.CHAVE,))
+            return bool(cursor.fetchone()[0])
+
+
+# Instância compartilhada; cada worker disputa a liderança a partir da inicialização
+lider_tarefas = LiderTarefas()
@@ -0,0 +1,141 @@
+import asyncio
+import logging
+from typing import Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
+from .base_model import BaseModel
+
+logger = logging.getLogger(__name__)
+
+class NoOpm(NamedTuple):
+    cod_opm: int
+    opm: str
+    subordinacao: Optional[int]
+    grande_comando: bool
+    cod_cidade: Optional[int]
+
+class OpmArvore(BaseModel):
+    """
+    Árvore de subordinação do sgpm.opm mantida em memória.
+    As unidades são numeradas em um percurso em profundidade (Euler tour), de
+    forma que a subárvore de qualquer OPM é o intervalo [entrada, saida) da
+    ordem de visita, sem precisar de WITH RECURSIVE a cada requisição.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._nos: Dict[int, NoOpm] = {}
+        self._ordem: Tuple[int, ...] = ()
+        self._intervalos: Dict[int, Tuple[int, int]] = {}
+        self._descendentes_cr: Dict[int, Tuple[int, ...]] = {}
+        self._carregado = False
+        self._lock: Optional[asyncio.Lock] = None
+
+    @property
+    def carregado(self) -> bool:
+        return self._carregado
+
+    async def carregar(self) -> bool:
+        """Lê o sgpm.opm e reconstrói a árvore. Retorna False em caso de falha."""
+        query = """
+        SELECT cod_opm, opm, subordinacao, grande_comando, cod_cidade
+        FROM sgpm.opm;
+        """
+        results = await self.execute_query_async(query)
+        if results is None:
+            return False
+
+        nos = {
+            row[0]: NoOpm(row[0], row[1], row[2], row[3] == 'S', row[4])
+            for row in results
+        }
+        filhos: Dict[int, List[int]] = {}
+        raizes = []
+        for no in nos.values():
+            if no.subordinacao in nos and no.subordinacao != no.cod_opm:
+                filhos.setdefault(no.subordinacao, []).append(no.cod_opm)
+            else:
+                raizes.append(no.cod_opm)
+
+        ordem: List[int] = []
+        intervalos: Dict[int, Tuple[int, int]] = {}
+        visitados: Set[int] = set()
+
+        def percorrer(raiz: int) -> None:
+            # DFS iterativo: a hierarquia pode ser mais profunda que o limite de recursão
+            pilha = [(raiz, False)]
+            while pilha:
+                cod, saindo = pilha.pop()
+                if saindo:
+                    intervalos[cod] = (intervalos[cod][0], len(ordem))
+                    continue
+                if cod in visitados:
+                    continue
+                visitados.add(cod)
+                intervalos[cod] = (len(ordem), len(ordem))
+                ordem.append(cod)
+                pilha.append((cod, True))
+                for filho in reversed(filhos.get(cod, [])):
+                    pilha.append((filho, False))
+
+        for raiz in raizes:
+            percorrer(raiz)
+        # Unidades presas em ciclos de subordinação não têm raiz; entram isoladas
+        for cod in nos:
+            if cod not in visitados:
+                percorrer(cod)
+
+        ordem_tupla = tuple(ordem)
+        descendentes_cr = {
+            cod: ordem_tupla[intervalos[cod][0]:intervalos[cod][1]]
+            for cod, no in nos.items() if no.grande_comando
+        }
+
+        # Troca atômica: leitores nunca veem uma árvore pela metade
+        self._nos = nos
+        self._ordem = ordem_tupla
+        self._intervalos = intervalos
+        self._descendentes_cr = descendentes_cr
+        self._carregado = True
+        logger.info("Árvore de OPMs carregada: %d unidades, %d comandos", len(nos), len(descendentes_cr))
+        return True
+
+    async def garantir_carregado(self) -> bool:
+        """Carrega a árvore na primeira utilização, caso ainda não tenha sido carregada."""
+        if self._carregado:
+            return True
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            if not self._carregado:
+                await self.carregar()
+        return self._carregado
+
+    def no(self, cod_opm: int) -> Optional[NoOpm]:
+        return self._nos.get(cod_opm)
+
+    def descendentes(self, cod_opm: int) -> Tuple[int, ...]:
+        """Retorna o cod_opm informado e todas as unidades subordinadas a ele."""
+        if cod_opm in self._descendentes_cr:
+            return self._descendentes_cr[cod_opm]
+        intervalo = self._intervalos.get(cod_opm)
+        if intervalo is None:
+            return ()
+        return self._ordem[intervalo[0]:intervalo[1]]
+
+    def descendentes_de_varios(self, cods_opm: Iterable[int]) -> List[int]:
+        """Retorna a união das subárvores das OPMs informadas."""
+        resultado: Set[int] = set()
+        for cod in cods_opm:
+            resultado.update(self.descendentes(cod))
+        return sorted(resultado)
+
+    def subordinada(self, cod_opm: int, cod_ancestral: int) -> bool:
+        """Indica se cod_opm pertence à subárvore de cod_ancestral."""
+        intervalo = self._intervalos.get(cod_ancestral)
+        posicao = self._intervalos.get(cod_opm)
+        if intervalo is None or posicao is None:
+            return False
+        return intervalo[0] <= posicao[0] < intervalo[1]
+
+
+# Árvore compartilhada por todos os modelos, carregada na inicialização da aplicação
+opm_arvore = OpmArvore()
@@ -14,6 +14,10 @@ class EstoqueResponse(BaseModel):
     estoque: List[EstoqueItem]
     cautelas: int
 
+class EstoqueResumoResponse(BaseModel):
+    geral: EstoqueResponse
+    por_tipo: Dict[int, EstoqueResponse]
+
 class TipoEquipamentoResponse(BaseModel):
     id: int
     nome: str
@@ -25,6 +29,18 @@ class CautelaItem(BaseModel):
 class CautelaResponse(BaseModel):
     cautela: List[CautelaItem]
 
+class ResumoTipoEquipamento(EstoqueResponse):
+    cautela: List[CautelaItem]
+
+class ResumoTiposEquipamentoResponse(BaseModel):
+    geral: ResumoTipoEquipamento
+    por_tipo: Dict[int, ResumoTipoEquipamento]
+
+class CautelaEntregaCidade(BaseModel):
+    nome_cidade: str
+    qtd_cautelas: int
+    qtd_entregas: int
+
 # Schemas SGPM
 class SexoContagem(BaseModel):
     sexo: str
@@ -59,6 +75,13 @@ class PostoGradResponse(BaseModel):
     feminino: List[PostoGradItem]
     masculino: List[PostoGradItem]
 
+class ResumoSgpmResponse(BaseModel):
+    sexo: List[SexoContagem]
+    tipo: List[TipoContagem]
+    situacao: List[SituacaoContagem]
+    posto_grad: PostoGradResponse
+    totais_por_cr: Dict[str, int]
+
 # Novos schemas para os filtros
 class PostoGraduacaoInfo(BaseModel):
     cod_posto_grad: int
@@ -75,4 +98,20 @@ class Unidade(BaseModel):
 
 class FiltroAvancadoResponse(BaseModel):
     quantidade: int
-    dados: List[Dict] 
\ No newline at end of file
+    dados: List[Dict]
+
+
+class PolicialFiltrado(BaseModel):
+    cod_policial: int
+    sexo: Optional[str]
+    situacao: Optional[str]
+    tipo: Optional[str]
+    posto_grad: Optional[str]
+    cod_opm: int
+    opm: Optional[str]
+
+
+class PaginaPoliciaisResponse(BaseModel):
+    dados: List[PolicialFiltrado]
+    # cod_policial a enviar em "apos" para a próxima página; null na última
+    proximo: Optional[int]
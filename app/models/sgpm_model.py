@@ -1,48 +1,88 @@
-from typing import List, Dict, Optional
+import logging
+from typing import AsyncIterator, List, Dict, Optional, Tuple
 from .base_model import BaseModel
+from .cidade_index import cidades_sgpm
+from .opm_arvore import opm_arvore
+from .sgpm_resumo_model import sgpm_resumo
+from .sgpm_snapshot import policial_snapshot
+from .tabelas_referencia import tabelas_referencia
+from ..utils.cache import cache_resultado
 from ..utils.string_utils import gerar_padroes_busca_cidade
 
+logger = logging.getLogger(__name__)
+
 class SgpmModel(BaseModel):
-    def get_policiais_por_sexo(self) -> List[Dict]:
-        query = """
-        SELECT p.sexo, COUNT(*) 
+    # Junções comuns à contagem e às linhas do filtro avançado
+    JUNCOES_FILTRO_AVANCADO = """
+        JOIN sgpm.opm o ON p.cod_opm_lotacao = o.cod_opm
+        LEFT JOIN sgpm.policial_situacao ps ON p.cod_policial_situacao = ps.cod_policial_situacao
+        LEFT JOIN sgpm.policial_tipo pt ON p.cod_policial_tipo = pt.cod_policial_tipo
+        LEFT JOIN sgpm.posto_grad pg ON p.cod_posto_grad = pg.cod_posto_grad
+    """
+
+    # Colunas das linhas do filtro avançado; cod_policial é a chave estável da paginação
+    QUERY_LINHAS_FILTRO_AVANCADO = f"""
+        SELECT p.cod_policial, p.sexo, ps.situacao, pt.policial_tipo, pg.posto_grad, o.cod_opm, o.opm
         FROM sgpm.policial p
+        {JUNCOES_FILTRO_AVANCADO}
+    """
+
+    def _fonte_contagem(self) -> Tuple[str, str]:
+        """
+        Retorna a origem das contagens de policiais e a expressão de contagem:
+        o resumo materializado quando ativo, ou as linhas do sgpm.policial.
+        """
+        if sgpm_resumo.disponivel:
+            return "sgpm.mv_policial_resumo", "COALESCE(SUM(p.quantidade), 0)::bigint"
+        return "sgpm.policial", "COUNT(*)"
+
+    @cache_resultado("policiais_sexo", ttl=300)
+    async def get_policiais_por_sexo(self) -> List[Dict]:
+        fonte, contagem = self._fonte_contagem()
+        query = f"""
+        SELECT p.sexo, {contagem} 
+        FROM {fonte} p
         WHERE p.cod_policial_tipo = 1
         GROUP BY p.sexo;
         """
-        results = self.execute_query(query)
+        results = await self.execute_query_async(query)
         if not results:
             return []
         return [{"sexo": row[0], "quantidade": row[1]} for row in results]
 
-    def get_policiais_por_tipo(self) -> List[Dict]:
-        query = """
-        SELECT t.policial_tipo, count(*) 
-        FROM sgpm.policial p
+    @cache_resultado("policiais_tipo", ttl=300)
+    async def get_policiais_por_tipo(self) -> List[Dict]:
+        fonte, contagem = self._fonte_contagem()
+        query = f"""
+        SELECT t.policial_tipo, {contagem} 
+        FROM {fonte} p
         JOIN sgpm.policial_tipo t on t.cod_policial_tipo = p.cod_policial_tipo
         GROUP BY t.policial_tipo
         """
-        results = self.execute_query(query)
+        results = await self.execute_query_async(query)
         if not results:
             return []
         return [{"tipo": row[0], "quantidade": row[1]} for row in results]
 
-    def get_policiais_por_situacao(self) -> List[Dict]:
-        query = """
-        SELECT t.situacao, count(*) 
-        FROM sgpm.policial p
+    @cache_resultado("policiais_situacao", ttl=300)
+    async def get_policiais_por_situacao(self) -> List[Dict]:
+        fonte, contagem = self._fonte_contagem()
+        query = f"""
+        SELECT t.situacao, {contagem} 
+        FROM {fonte} p
         JOIN sgpm.policial_situacao t on t.cod_policial_situacao = p.cod_policial_situacao
         GROUP BY t.situacao
         """
-        results = self.execute_query(query)
+        results = await self.execute_query_async(query)
         if not results:
             return []
         return [{"situacao": row[0], "quantidade": row[1]} for row in results]
     
-    def get_policiais_por_posto_grad(self, posto_grad: Optional[str] = None) -> List[Dict]:
-        query = """
-        SELECT pg.posto_grad, COUNT(*)
-        FROM sgpm.policial p
+    async def get_policiais_por_posto_grad(self, posto_grad: Optional[str] = None) -> List[Dict]:
+        fonte, contagem = self._fonte_contagem()
+        query = f"""
+        SELECT pg.posto_grad, {contagem}
+        FROM {fonte} p
         JOIN sgpm.posto_grad pg ON pg.cod_posto_grad = p.cod_posto_grad
         WHERE 1=1
         """
@@ -52,11 +92,11 @@ class SgpmModel(BaseModel):
             params.append(posto_grad)
 
         query += " GROUP BY pg.posto_grad"
-        results = self.execute_query(query, tuple(params))
+        results = await self.execute_query_async(query, tuple(params))
         return [{"posto_grad": row[0], "quantidade": row[1]} for row in results] if results else []
 
 
-    def get_policiais_por_unidade(self, unidade: Optional[str] = None) -> List[Dict]:
+    async def get_policiais_por_unidade(self, unidade: Optional[str] = None) -> List[Dict]:
         query = """
         SELECT o.opm, COUNT(*)
         FROM sgpm.policial p
@@ -69,11 +109,11 @@ class SgpmModel(BaseModel):
             params.append(unidade)
 
         query += " GROUP BY o.opm"
-        results = self.execute_query(query, tuple(params))
+        results = await self.execute_query_async(query, tuple(params))
         return [{"unidade": row[0], "quantidade": row[1]} for row in results] if results else []
 
 
-    def get_policiais_por_comando_regional(self, comando_regional: Optional[str] = None) -> List[Dict]:
+    async def get_policiais_por_comando_regional(self, comando_regional: Optional[str] = None) -> List[Dict]:
         query = """
         SELECT gc.opm AS comando_regional, COUNT(*)
         FROM sgpm.policial p
@@ -87,114 +127,42 @@ class SgpmModel(BaseModel):
             params.append(comando_regional)
 
         query += " GROUP BY gc.opm"
-        results = self.execute_query(query, tuple(params))
+        results = await self.execute_query_async(query, tuple(params))
         return [{"comando_regional": row[0], "quantidade": row[1]} for row in results] if results else []
 
     # Novos métodos para os filtros
-    def get_postos_graduacao(self) -> List[Dict]:
-        """Retorna todos os postos/graduações disponíveis."""
-        query = """
-        SELECT cod_posto_grad, posto_grad, posto_grad_abrev 
-        FROM sgpm.posto_grad 
-        WHERE cod_posto_grad > 0
-        ORDER BY cod_posto_grad
-        LIMIT 50;
-        """
-        try:
-            results = self.execute_query(query)
-            if not results:
-                return []
-            return [
-                {
-                    "cod_posto_grad": row[0],
-                    "posto_grad": row[1],
-                    "posto_grad_abrev": row[2]
-                } 
-                for row in results
-            ]
-        except Exception as e:
-            print(f"Erro ao buscar postos de graduação: {str(e)}")
-            return []
-
-    def get_unidades(self) -> List[Dict]:
-        """Retorna todas as unidades disponíveis."""
-        query = """
-        SELECT cod_opm, opm
-        FROM sgpm.opm
-        WHERE cod_opm > 0
-        ORDER BY opm
-        LIMIT 200;
-        """
-        try:
-            results = self.execute_query(query)
-            if not results:
-                return []
-            return [
-                {
-                    "cod_opm": row[0],
-                    "opm": row[1]
-                } 
-                for row in results
-            ]
-        except Exception as e:
-            print(f"Erro ao buscar unidades: {str(e)}")
-            return []
-
-    def get_comandos_regionais(self) -> List[Dict]:
-        """Retorna todos os comandos regionais disponíveis."""
-        query = """
-        SELECT op.cod_opm, op.opm
-        FROM sgpm.opm op
-        WHERE op.grande_comando = 'S'
-        ORDER BY op.cod_opm;
-        """
-        results = self.execute_query(query)
-        if not results:
-            return []
-        return [
-            {
-                "cod_opm": row[0],
-                "opm": row[1]
-            } 
-            for row in results
-        ]
-
-    def get_unidades_por_comando(self, comando_id: int) -> List[Dict]:
+    async def get_postos_graduacao(self) -> List[Dict]:
+        """Retorna todos os postos/graduações disponíveis, do snapshot em memória."""
+        await tabelas_referencia.garantir_carregado()
+        return list(tabelas_referencia.postos_graduacao)
+
+    async def get_unidades(self) -> List[Dict]:
+        """Retorna todas as unidades disponíveis, do snapshot em memória."""
+        await tabelas_referencia.garantir_carregado()
+        return list(tabelas_referencia.unidades)
+
+    async def get_comandos_regionais(self) -> List[Dict]:
+        """Retorna todos os comandos regionais disponíveis, do snapshot em memória."""
+        await tabelas_referencia.garantir_carregado()
+        return list(tabelas_referencia.comandos_regionais)
+
+    async def get_unidades_por_comando(self, comando_id: int) -> List[Dict]:
         """Retorna todas as unidades subordinadas a um comando regional específico."""
-        query = """
-        WITH RECURSIVE t AS (
-            -- Pega o comando principal (cod_opm do comando regional)
-            SELECT cod_opm, opm, subordinacao
-            FROM sgpm.opm
-            WHERE cod_opm = %s
-            
-            UNION ALL
-            
-            -- Vai descendo e pegando todas as unidades subordinadas
-            SELECT op.cod_opm, op.opm, op.subordinacao
-            FROM sgpm.opm op
-            JOIN t ON op.subordinacao = t.cod_opm
-        )
-        SELECT DISTINCT t.cod_opm, t.opm
-        FROM t
-        ORDER BY t.opm;
-        """
         try:
-            results = self.execute_query(query, (comando_id,))
-            if not results:
-                return []
+            await opm_arvore.garantir_carregado()
+            unidades = [opm_arvore.no(cod) for cod in opm_arvore.descendentes(comando_id)]
             return [
                 {
-                    "cod_opm": row[0],
-                    "opm": row[1]
-                } 
-                for row in results
+                    "cod_opm": no.cod_opm,
+                    "opm": no.opm
+                }
+                for no in sorted(unidades, key=lambda no: no.opm or "")
             ]
         except Exception as e:
-            print(f"Erro ao buscar unidades por comando {comando_id}: {str(e)}")
+            logger.error("Erro ao buscar unidades por comando %s: %s", comando_id, e)
             return []
 
-    def filtrar_policiais_avancado(
+    async def filtrar_policiais_avancado(
         self,
         sexo: str = None,
         situacao: str = None,
@@ -204,99 +172,166 @@ class SgpmModel(BaseModel):
         posto_grad: int = None
     ) -> Dict:
         """Filtra policiais com base em todos os filtros disponíveis."""
-        # Query otimizada com CTE recursiva e estrutura correta das tabelas
-        if comando_regional:
-            query = """
-            WITH RECURSIVE unidades_cr AS (
-                SELECT cod_opm, opm, subordinacao
-                FROM sgpm.opm
-                WHERE cod_opm = %s
-                UNION ALL
-                SELECT op.cod_opm, op.opm, op.subordinacao
-                FROM sgpm.opm op
-                JOIN unidades_cr u ON op.subordinacao = u.cod_opm
+        if policial_snapshot.disponivel:
+            # Contagem vetorizada no snapshot em memória, sem ida ao banco
+            unidades_comando = None
+            if comando_regional:
+                await opm_arvore.garantir_carregado()
+                unidades_comando = opm_arvore.descendentes(comando_regional)
+            quantidade = policial_snapshot.contar(
+                sexo=sexo,
+                situacao=situacao,
+                tipo=tipo,
+                posto_grad=posto_grad,
+                unidade=unidade,
+                unidades_comando=unidades_comando
             )
-            SELECT COUNT(*) 
-            FROM sgpm.policial p
-            JOIN sgpm.opm o ON p.cod_opm_lotacao = o.cod_opm
-            LEFT JOIN sgpm.policial_situacao ps ON p.cod_policial_situacao = ps.cod_policial_situacao
-            LEFT JOIN sgpm.policial_tipo pt ON p.cod_policial_tipo = pt.cod_policial_tipo
-            LEFT JOIN sgpm.posto_grad pg ON p.cod_posto_grad = pg.cod_posto_grad
-            WHERE 1=1
-            """
-            params = [comando_regional]
-        else:
-            query = """
-            SELECT COUNT(*) 
-            FROM sgpm.policial p
-            JOIN sgpm.opm o ON p.cod_opm_lotacao = o.cod_opm
-            LEFT JOIN sgpm.policial_situacao ps ON p.cod_policial_situacao = ps.cod_policial_situacao
-            LEFT JOIN sgpm.policial_tipo pt ON p.cod_policial_tipo = pt.cod_policial_tipo
-            LEFT JOIN sgpm.posto_grad pg ON p.cod_posto_grad = pg.cod_posto_grad
-            WHERE 1=1
-            """
-            params = []
+            return {"quantidade": quantidade, "dados": []}
+
+        fonte, contagem = self._fonte_contagem()
+        filtros, params = await self._filtros_avancados(sexo, situacao, tipo, comando_regional, unidade, posto_grad)
+        query = f"""
+        SELECT {contagem} 
+        FROM {fonte} p
+        {self.JUNCOES_FILTRO_AVANCADO}
+        WHERE 1=1{filtros}
+        """
+
+        try:
+            logger.debug("Filtro avançado: query=%s params=%s", query, params)
+            results = await self.execute_query_async(query, tuple(params))
+            quantidade = results[0][0] if results else 0
+            logger.debug("Filtro avançado: %d policiais encontrados", quantidade)
+
+            return {
+                "quantidade": quantidade,
+                "dados": []  # As linhas vêm de listar_policiais_avancado / exportar_policiais_avancado
+            }
+        except Exception as e:
+            logger.error("Erro na query de filtro avançado: %s (query=%s params=%s)", e, query, params)
+            return {
+                "quantidade": 0,
+                "dados": []
+            }
+
+    async def _filtros_avancados(
+        self,
+        sexo: Optional[str],
+        situacao: Optional[str],
+        tipo: Optional[str],
+        comando_regional: Optional[int],
+        unidade: Optional[int],
+        posto_grad: Optional[int]
+    ) -> Tuple[str, list]:
+        """Condições (AND ...) e parâmetros do filtro avançado, sobre as junções de JUNCOES_FILTRO_AVANCADO."""
+        filtros = ""
+        params = []
 
-        # Aplicar filtros
         if sexo:
-            query += " AND p.sexo = %s"
+            filtros += " AND p.sexo = %s"
             params.append(sexo)
 
         if situacao:
-            query += " AND ps.situacao = %s"
+            filtros += " AND ps.situacao = %s"
             params.append(situacao)
 
         if tipo:
-            query += " AND pt.policial_tipo = %s"
+            filtros += " AND pt.policial_tipo = %s"
             params.append(tipo)
 
         if posto_grad:
-            query += " AND p.cod_posto_grad = %s"
+            filtros += " AND p.cod_posto_grad = %s"
             params.append(posto_grad)
-        
+
         if unidade:
-            query += " AND p.cod_opm_lotacao = %s"
+            filtros += " AND p.cod_opm_lotacao = %s"
             params.append(unidade)
 
         if comando_regional:
-            # Filtro por comando regional usando a CTE
-            query += " AND p.cod_opm_lotacao IN (SELECT cod_opm FROM unidades_cr)"
+            # A subárvore do comando regional vem da árvore de OPMs em memória
+            await opm_arvore.garantir_carregado()
+            filtros += " AND p.cod_opm_lotacao = ANY(%s)"
+            params.append(list(opm_arvore.descendentes(comando_regional)))
+
+        return filtros, params
 
+    @staticmethod
+    def _linha_filtro_avancado(row: tuple) -> Dict:
+        return {
+            "cod_policial": row[0],
+            "sexo": row[1],
+            "situacao": row[2],
+            "tipo": row[3],
+            "posto_grad": row[4],
+            "cod_opm": row[5],
+            "opm": row[6]
+        }
+
+    async def listar_policiais_avancado(
+        self,
+        sexo: str = None,
+        situacao: str = None,
+        tipo: str = None,
+        comando_regional: int = None,
+        unidade: int = None,
+        posto_grad: int = None,
+        limite: int = 100,
+        apos: int = None
+    ) -> Optional[Dict]:
+        """
+        Página de policiais do filtro avançado, paginada por chave (keyset): a
+        próxima página começa depois do último cod_policial recebido, com o
+        mesmo custo em qualquer ponto da lista (sem OFFSET). Retorna None em
+        caso de erro na query.
+        """
+        filtros, params = await self._filtros_avancados(sexo, situacao, tipo, comando_regional, unidade, posto_grad)
+        if apos is not None:
+            filtros += " AND p.cod_policial > %s"
+            params.append(apos)
+        # Uma linha a mais indica se existe próxima página
+        query = f"{self.QUERY_LINHAS_FILTRO_AVANCADO} WHERE 1=1{filtros} ORDER BY p.cod_policial LIMIT %s"
+        params.append(limite + 1)
+
+        results = await self.execute_query_async(query, tuple(params))
+        if results is None:
+            return None
+        dados = [self._linha_filtro_avancado(row) for row in results[:limite]]
+        proximo = dados[-1]["cod_policial"] if len(results) > limite else None
+        return {"dados": dados, "proximo": proximo}
+
+    async def exportar_policiais_avancado(
+        self,
+        sexo: str = None,
+        situacao: str = None,
+        tipo: str = None,
+        comando_regional: int = None,
+        unidade: int = None,
+        posto_grad: int = None
+    ) -> AsyncIterator[List[Dict]]:
+        """Todas as linhas do filtro avançado, em lotes lidos de um cursor do servidor."""
+        filtros, params = await self._filtros_avancados(sexo, situacao, tipo, comando_regional, unidade, posto_grad)
+        query = f"{self.QUERY_LINHAS_FILTRO_AVANCADO} WHERE 1=1{filtros} ORDER BY p.cod_policial"
+        lotes = self.stream_query_async(query, tuple(params))
         try:
-            print(f"=== DEBUG FILTRO AVANÇADO ===")
-            print(f"Parâmetros recebidos: sexo={sexo}, situacao={situacao}, tipo={tipo}, comando_regional={comando_regional}, unidade={unidade}, posto_grad={posto_grad}")
-            print(f"Query final: {query}")
-            print(f"Parâmetros SQL: {params}")
-            
-            results = self.execute_query(query, tuple(params))
-            quantidade = results[0][0] if results else 0
-            print(f"Resultado: {quantidade} policiais encontrados")
-            print(f"=== FIM DEBUG ===")
-            
-            return {
-                "quantidade": quantidade,
-                "dados": []  # Por enquanto retorna apenas a quantidade
-            }
-        except Exception as e:
-            print(f"Erro na query de filtro avançado: {str(e)}")
-            print(f"Query: {query}")
-            print(f"Params: {params}")
-            return {
-                "quantidade": 0,
-                "dados": []
-            }
-    
+            async for lote in lotes:
+                yield [self._linha_filtro_avancado(row) for row in lote]
+        finally:
+            # Fecha o cursor já, mesmo quando o cliente desiste no meio da exportação
+            await lotes.aclose()
+
 
-    def get_policiais_por_posto_grad_sexo(self, sexo: str = None, situacao: str = None, tipo: str = None) -> Dict:
+    @cache_resultado("dados_posto_grad", ttl=300)
+    async def get_policiais_por_posto_grad_sexo(self, sexo: str = None, situacao: str = None, tipo: str = None) -> Dict:
         """Retorna os dados de policiais por posto/graduação e sexo, incluindo totais."""
-        query = """
+        fonte, contagem = self._fonte_contagem()
+        query = f"""
         WITH dados_posto_grad AS (
             SELECT 
                 pg.posto_grad,
                 p.sexo,
-                COUNT(*) as quantidade,
+                {contagem} as quantidade,
                 pg.ordem
-            FROM sgpm.policial p
+            FROM {fonte} p
             JOIN sgpm.posto_grad pg ON pg.cod_posto_grad = p.cod_posto_grad
             JOIN sgpm.policial_situacao ps ON ps.cod_policial_situacao = p.cod_policial_situacao
             JOIN sgpm.policial_tipo pt ON pt.cod_policial_tipo = p.cod_policial_tipo
@@ -336,7 +371,7 @@ class SgpmModel(BaseModel):
         ORDER BY ordem;
         """
         
-        results = self.execute_query(query, tuple(params))
+        results = await self.execute_query_async(query, tuple(params))
         if not results:
             return {"feminino": [], "masculino": []}
 
@@ -358,34 +393,110 @@ class SgpmModel(BaseModel):
 
         return dados_formatados
 
-    def get_policiais_por_cr(self) -> Dict[str, int]:
-        query = """
+    @cache_resultado("resumo_sgpm", ttl=300)
+    async def get_resumo_sgpm(self) -> Dict:
+        """
+        Retorna, em uma única varredura do sgpm.policial, as agregações usadas pela
+        página do SGPM: sexo, tipo, situação, posto/graduação por sexo e totais por CR.
+        Cada agregação é um GROUPING SET e segue a mesma regra do endpoint individual.
+        """
+        fonte, contagem = self._fonte_contagem()
+        query = f"""
+        SELECT
+            GROUPING(p.cod_policial_tipo) AS g_sexo,
+            GROUPING(pt.policial_tipo) AS g_tipo,
+            GROUPING(ps.situacao) AS g_situacao,
+            GROUPING(pg.posto_grad) AS g_posto_grad,
+            GROUPING(cr.opm) AS g_cr,
+            p.sexo,
+            p.cod_policial_tipo,
+            pt.policial_tipo,
+            ps.situacao,
+            pg.posto_grad,
+            pg.ordem,
+            (ps.cod_policial_situacao IS NOT NULL AND pt.cod_policial_tipo IS NOT NULL) AS completo,
+            cr.opm AS cr,
+            {contagem}
+        FROM {fonte} p
+        LEFT JOIN sgpm.policial_tipo pt ON pt.cod_policial_tipo = p.cod_policial_tipo
+        LEFT JOIN sgpm.policial_situacao ps ON ps.cod_policial_situacao = p.cod_policial_situacao
+        LEFT JOIN sgpm.posto_grad pg ON pg.cod_posto_grad = p.cod_posto_grad
+        LEFT JOIN sgpm.opm cr ON cr.cod_opm = p.cod_opm_lotacao AND cr.grande_comando = 'S'
+        GROUP BY GROUPING SETS (
+            (p.sexo, p.cod_policial_tipo),
+            (pt.policial_tipo),
+            (ps.situacao),
+            (pg.posto_grad, pg.ordem, p.sexo,
+             (ps.cod_policial_situacao IS NOT NULL AND pt.cod_policial_tipo IS NOT NULL)),
+            (cr.opm)
+        );
+        """
+        results = await self.execute_query_async(query)
+        if not results:
+            return {}
+
+        sexo: Dict[str, int] = {}
+        tipo = []
+        situacao = []
+        postos: Dict[str, list] = {}
+        totais_por_cr: Dict[str, int] = {}
+        for (g_sexo, g_tipo, g_situacao, g_posto_grad, g_cr,
+             sexo_row, cod_tipo, tipo_row, situacao_row, posto_grad, ordem, completo, cr,
+             quantidade) in results:
+            if g_sexo == 0:
+                # /policiais_sexo conta apenas o tipo 1
+                if cod_tipo == 1:
+                    sexo[sexo_row] = sexo.get(sexo_row, 0) + quantidade
+            elif g_tipo == 0:
+                if tipo_row is not None:
+                    tipo.append({"tipo": tipo_row, "quantidade": quantidade})
+            elif g_situacao == 0:
+                if situacao_row is not None:
+                    situacao.append({"situacao": situacao_row, "quantidade": quantidade})
+            elif g_posto_grad == 0:
+                # /dados_posto_grad usa INNER JOIN com posto, situação e tipo
+                if posto_grad is not None and completo:
+                    item = postos.setdefault(posto_grad, [ordem, 0, 0])
+                    if sexo_row == 'F':
+                        item[1] += quantidade
+                    elif sexo_row == 'M':
+                        item[2] += quantidade
+            elif g_cr == 0:
+                if cr is not None:
+                    totais_por_cr[cr] = quantidade
+
+        postos_ordenados = sorted(postos.items(), key=lambda item: (item[1][0] is None, item[1][0]))
+        return {
+            "sexo": [{"sexo": chave, "quantidade": valor} for chave, valor in sexo.items()],
+            "tipo": tipo,
+            "situacao": situacao,
+            "posto_grad": {
+                "feminino": [{"posto_grad": posto, "quantidade": item[1]} for posto, item in postos_ordenados],
+                "masculino": [{"posto_grad": posto, "quantidade": item[2]} for posto, item in postos_ordenados]
+            },
+            "totais_por_cr": dict(sorted(totais_por_cr.items()))
+        }
+
+    async def get_policiais_por_cr(self) -> Dict[str, int]:
+        fonte, contagem = self._fonte_contagem()
+        query = f"""
         SELECT  
             op.opm AS cr, 
-            SUM(1) AS total
-        FROM sgpm.policial p
+            {contagem} AS total
+        FROM {fonte} p
         INNER JOIN sgpm.opm op ON op.cod_opm = p.cod_opm_lotacao
         WHERE op.grande_comando = 'S'
         GROUP BY op.opm
         ORDER BY op.opm;
         """
-        results = self.execute_query(query)
+        results = await self.execute_query_async(query)
         if not results:
             return {}
         return {row[0]: row[1] for row in results}
 
-    def get_policiais_por_unidade(self, cidade: str) -> List[Dict]:
+    async def get_policiais_por_unidade(self, cidade: str) -> List[Dict]:
         """Retorna a contagem de policiais por sexo e unidade em uma cidade específica."""
-        print(f"Buscando dados por unidade para cidade: {cidade}")
-        
-        # Primeiro, vamos verificar se a cidade existe
-        query_cidade = """
-        SELECT nome_cidade FROM sgpm.cidade WHERE UPPER(nome_cidade) = %s
-        """
-        cidade_existe = self.execute_query(query_cidade, (cidade.upper(),))
-        print(f"Cidade existe na tabela: {cidade_existe}")
-        
-        # Query alternativa mais robusta - busca todas as unidades da cidade
+        # A cidade é resolvida pelo índice em memória; a query busca todas as unidades dela
         query = """
         SELECT  
             op.opm,
@@ -395,31 +506,31 @@ class SgpmModel(BaseModel):
         FROM sgpm.opm op
         INNER JOIN sgpm.cidade c ON c.cod_cidade = op.cod_cidade
         LEFT JOIN sgpm.policial p ON op.cod_opm = p.cod_opm_lotacao AND p.cod_policial_tipo = 1
-        WHERE UPPER(c.nome_cidade) = %s
+        WHERE c.cod_cidade = ANY(%s)
         GROUP BY op.opm, c.nome_cidade
         ORDER BY op.opm;
         """
-        
-        print(f"Query SQL: {query}")
-        print(f"Parâmetro cidade: {cidade.upper()}")
-        
-        results = self.execute_query(query, (cidade.upper(),))
-        print(f"Resultados da query: {results}")
-        
+
+        await cidades_sgpm.garantir_carregado()
+        codigos = list(cidades_sgpm.resolver(cidade))
+        if not codigos:
+            logger.debug("Cidade não encontrada no índice: %s", cidade)
+            return []
+
+        results = await self.execute_query_async(query, (codigos,))
         if not results:
-            print(f"Nenhum resultado para cidade: {cidade}")
+            logger.debug("Nenhuma unidade com policiais na cidade %s", cidade)
             return []
 
         resultado = []
         for opm, nome_cidade, masculino, feminino in results:
-            print(f"Processando unidade: opm={opm}, masculino={masculino}, feminino={feminino}")
             resultado.append({
                 "unidade": opm,
                 "Masculino": masculino,
                 "Feminino": feminino
             })
-        
-        print(f"Resultado final por unidade: {resultado}")
+
+        logger.debug("Cidade %s: %d unidades", cidade, len(resultado))
         return resultado
 
     def normalizar_nome_cidade(self, cidade: str) -> str:
@@ -460,66 +571,122 @@ class SgpmModel(BaseModel):
         
         return cidade_upper
 
-    def get_dados_por_cidade(self, cidade: str) -> Dict:
+    async def get_dados_por_cidade(self, cidade: str) -> Dict:
         """Retorna os dados de policiais por sexo para uma cidade específica."""
-        print(f"Buscando dados para cidade original: {cidade}")
-        
-        # Gerar padrões de busca usando a nova função
-        padroes_busca = gerar_padroes_busca_cidade(cidade)
-        print(f"Padrões de busca gerados: {padroes_busca}")
-        
-        # Tentar cada padrão até encontrar resultados
-        todos_resultados = []
-        
-        for padrao in padroes_busca:
-            print(f"Tentando padrão: {padrao}")
-            
+        resultados = await self.get_dados_por_cidades([cidade])
+        return resultados[0]
+
+    async def get_dados_por_cidades(self, cidades: List[str]) -> List[Dict]:
+        """
+        Retorna os dados de policiais por sexo para várias cidades.
+        Os nomes são resolvidos pelo índice de cidades em memória e a contagem é
+        feita em uma única query filtrando por cod_cidade. Somente nomes ausentes
+        do índice recorrem à busca por padrões (ILIKE).
+        """
+        if not cidades:
+            return []
+
+        await cidades_sgpm.garantir_carregado()
+        codigos_por_idx = {idx: cidades_sgpm.resolver(cidade) for idx, cidade in enumerate(cidades)}
+        codigos = sorted({cod for cods in codigos_por_idx.values() for cod in cods})
+
+        contagens = {}
+        if codigos:
             query = """
             SELECT
-                c.nome_cidade AS nome_cidade,
+                c.cod_cidade,
+                c.nome_cidade,
                 SUM(CASE WHEN p.sexo = 'M' THEN 1 ELSE 0 END) AS qtd_sexoM,
                 SUM(CASE WHEN p.sexo = 'F' THEN 1 ELSE 0 END) AS qtd_sexoF
             FROM sgpm.cidade c
             LEFT JOIN sgpm.opm o ON c.cod_cidade = o.cod_cidade
             LEFT JOIN sgpm.policial p ON o.cod_opm = p.cod_opm_destino AND p.cod_policial_tipo = 1
-            WHERE UPPER(c.nome_cidade) ILIKE %s
-            GROUP BY c.nome_cidade;
+            WHERE c.cod_cidade = ANY(%s)
+            GROUP BY c.cod_cidade, c.nome_cidade;
             """
-            
-            results = self.execute_query(query, (padrao,))
-            print(f"Resultados para padrão '{padrao}': {results}")
-            
-            if results:
-                for row in results:
-                    resultado = {
-                        "nome_cidade": row[0],
-                        "qtd_sexoM": row[1] or 0,
-                        "qtd_sexoF": row[2] or 0,
-                        "total": (row[1] or 0) + (row[2] or 0)
-                    }
-                    todos_resultados.append(resultado)
-        
-        # Se encontrou resultados, retorna o que tem mais policiais
-        if todos_resultados:
-            # Ordena por total de policiais (decrescente) e depois por nome da cidade
-            todos_resultados.sort(key=lambda x: (x['total'], x['nome_cidade']), reverse=True)
-            melhor_resultado = todos_resultados[0]
-            print(f"Melhor resultado encontrado: {melhor_resultado}")
-            return {
-                "nome_cidade": melhor_resultado["nome_cidade"],
-                "qtd_sexoM": melhor_resultado["qtd_sexoM"],
-                "qtd_sexoF": melhor_resultado["qtd_sexoF"]
-            }
-        
-        # Se nenhum padrão funcionou, retornar dados zerados
-        print(f"Nenhum resultado encontrado para nenhum padrão, retornando dados zerados")
-        return {
-            "nome_cidade": cidade,
-            "qtd_sexoM": 0,
-            "qtd_sexoF": 0
-        }
+            results = await self.execute_query_async(query, (codigos,))
+            for cod_cidade, nome_cidade, qtd_m, qtd_f in results or []:
+                contagens[cod_cidade] = (nome_cidade, qtd_m or 0, qtd_f or 0)
+
+        encontrados = {}
+        for idx, cods in codigos_por_idx.items():
+            candidatos = [contagens[cod] for cod in cods if cod in contagens]
+            if candidatos:
+                # Mesmo critério da busca por padrões: mais policiais, depois o nome
+                encontrados[idx] = max(candidatos, key=lambda c: (c[1] + c[2], c[0]))
+
+        pendentes = [idx for idx in range(len(cidades)) if idx not in encontrados and not codigos_por_idx[idx]]
+        if pendentes:
+            por_padrao = await self._get_dados_por_padroes([cidades[idx] for idx in pendentes])
+            for posicao, idx in enumerate(pendentes):
+                if posicao in por_padrao:
+                    encontrados[idx] = por_padrao[posicao]
+
+        resultado = []
+        for idx, cidade in enumerate(cidades):
+            dados = encontrados.get(idx)
+            if dados:
+                resultado.append({
+                    "nome_cidade": dados[0],
+                    "qtd_sexoM": dados[1],
+                    "qtd_sexoF": dados[2]
+                })
+            else:
+                # Cidade sem correspondência: retorna dados zerados
+                resultado.append({
+                    "nome_cidade": cidade,
+                    "qtd_sexoM": 0,
+                    "qtd_sexoF": 0
+                })
+        return resultado
+
+    async def _get_dados_por_padroes(self, cidades: List[str]) -> Dict[int, tuple]:
+        """
+        Busca por padrões ILIKE (gerar_padroes_busca_cidade) para os nomes que o
+        índice não resolveu, todos em uma única query. Retorna, por posição da
+        cidade na lista, a tupla (nome_cidade, qtd_sexoM, qtd_sexoF) da melhor
+        correspondência.
+        """
+        indices = []
+        padroes = []
+        for idx, cidade in enumerate(cidades):
+            for padrao in gerar_padroes_busca_cidade(cidade):
+                indices.append(idx)
+                padroes.append(padrao)
 
-    def filtrar_policiais(
+        query = """
+        WITH padroes AS (
+            SELECT * FROM unnest(%s::int[], %s::text[]) AS t(idx, padrao)
+        ),
+        candidatas AS (
+            SELECT DISTINCT pd.idx, c.nome_cidade
+            FROM padroes pd
+            JOIN sgpm.cidade c ON UPPER(c.nome_cidade) ILIKE pd.padrao
+        ),
+        contagem AS (
+            SELECT
+                c.nome_cidade AS nome_cidade,
+                SUM(CASE WHEN p.sexo = 'M' THEN 1 ELSE 0 END) AS qtd_sexoM,
+                SUM(CASE WHEN p.sexo = 'F' THEN 1 ELSE 0 END) AS qtd_sexoF
+            FROM sgpm.cidade c
+            LEFT JOIN sgpm.opm o ON c.cod_cidade = o.cod_cidade
+            LEFT JOIN sgpm.policial p ON o.cod_opm = p.cod_opm_destino AND p.cod_policial_tipo = 1
+            WHERE c.nome_cidade IN (SELECT nome_cidade FROM candidatas)
+            GROUP BY c.nome_cidade
+        )
+        SELECT DISTINCT ON (ca.idx)
+            ca.idx,
+            ct.nome_cidade,
+            COALESCE(ct.qtd_sexoM, 0) AS qtd_sexoM,
+            COALESCE(ct.qtd_sexoF, 0) AS qtd_sexoF
+        FROM candidatas ca
+        JOIN contagem ct ON ct.nome_cidade = ca.nome_cidade
+        ORDER BY ca.idx, COALESCE(ct.qtd_sexoM, 0) + COALESCE(ct.qtd_sexoF, 0) DESC, ct.nome_cidade DESC;
+        """
+        results = await self.execute_query_async(query, (indices, padroes))
+        return {row[0]: (row[1], row[2], row[3]) for row in results} if results else {}
+
+    async def filtrar_policiais(
             self,
             sexo: str = None,
             situacao: str = None,
@@ -571,42 +738,29 @@ class SgpmModel(BaseModel):
             params.extend(lista)
 
         if comando_regional:
-            lista = comando_regional.split(",")
-            placeholders = ",".join(["%s"] * len(lista))
-            query += f"""
-            AND (
-                op.cod_opm IN (
-                    WITH RECURSIVE t AS (
-                        SELECT cod_opm, subordinacao
-                        FROM sgpm.opm
-                        WHERE cod_opm IN ({placeholders})
-                        UNION
-                        SELECT o.cod_opm, o.subordinacao
-                        FROM sgpm.opm o
-                        JOIN t ON o.subordinacao = t.cod_opm
-                    )
-                    SELECT cod_opm FROM t
-                )
-            )
-            """
-            params.extend(lista)
+            await opm_arvore.garantir_carregado()
+            comandos = [int(cod) for cod in comando_regional.split(",") if cod.strip()]
+            query += " AND op.cod_opm = ANY(%s)"
+            params.append(opm_arvore.descendentes_de_varios(comandos))
 
-        results = self.execute_query(query, tuple(params))
+        results = await self.execute_query_async(query, tuple(params))
         return {"quantidade": results[0][0] if results else 0}
 
-    def get_totais_por_cr(self) -> Dict[str, int]:
+    @cache_resultado("totais_por_cr", ttl=600)
+    async def get_totais_por_cr(self) -> Dict[str, int]:
         """Retorna o total de policiais por CR."""
-        query = """
+        fonte, contagem = self._fonte_contagem()
+        query = f"""
         SELECT  
             op.opm AS cr, 
-            SUM(1) AS total
-        FROM sgpm.policial p
+            {contagem} AS total
+        FROM {fonte} p
         INNER JOIN sgpm.opm op ON op.cod_opm = p.cod_opm_lotacao
         WHERE op.grande_comando = 'S'
         GROUP BY op.opm
         ORDER BY op.opm;
         """
-        results = self.execute_query(query)
+        results = await self.execute_query_async(query)
         if not results:
             return {}
         return {row[0]: row[1] for row in results} 
\ No newline at end of file
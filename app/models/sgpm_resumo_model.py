@@ -0,0 +1,129 @@
+import asyncio
+import logging
+import os
+from typing import Optional
+from .base_model import BaseModel
+from .invalidacao_cache import invalidacao_cache
+from .lider_tarefas import lider_tarefas
+from ..utils.cache import cache_resultados
+
+logger = logging.getLogger(__name__)
+
+class SgpmResumoModel(BaseModel):
+    """
+    Resumo materializado das contagens de policiais, agrupado pelas dimensões
+    usadas no dashboard. As consultas do SgpmModel passam a somar a coluna
+    quantidade do resumo em vez de contar as linhas do sgpm.policial.
+    """
+
+    VIEW = "sgpm.mv_policial_resumo"
+
+    # Endpoints do cache de resultados cujas contagens vêm do resumo
+    CACHES_DERIVADOS = (
+        "policiais_sexo",
+        "policiais_tipo",
+        "policiais_situacao",
+        "dados_posto_grad",
+        "resumo_sgpm",
+        "totais_por_cr",
+    )
+
+    QUERY_CRIAR = """
+    CREATE MATERIALIZED VIEW IF NOT EXISTS sgpm.mv_policial_resumo AS
+    SELECT
+        p.cod_opm_lotacao,
+        p.sexo,
+        p.cod_policial_situacao,
+        p.cod_policial_tipo,
+        p.cod_posto_grad,
+        COUNT(*)::bigint AS quantidade
+    FROM sgpm.policial p
+    GROUP BY
+        p.cod_opm_lotacao,
+        p.sexo,
+        p.cod_policial_situacao,
+        p.cod_policial_tipo,
+        p.cod_posto_grad;
+
+    -- Índice único exigido pelo REFRESH ... CONCURRENTLY
+    CREATE UNIQUE INDEX IF NOT EXISTS mv_policial_resumo_dimensoes
+        ON sgpm.mv_policial_resumo
+        (cod_opm_lotacao, sexo, cod_policial_situacao, cod_policial_tipo, cod_posto_grad);
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.ativo = os.getenv("SGPM_USAR_RESUMO", "false").lower() == "true"
+        self.criar_automaticamente = os.getenv("SGPM_RESUMO_CRIAR", "false").lower() == "true"
+        self.intervalo_refresh = float(os.getenv("SGPM_RESUMO_REFRESH_SEGUNDOS", "600"))
+        self.existe = False
+        # Um único REFRESH por vez neste worker, seja do agendador ou do endpoint de administração
+        self._lock: Optional[asyncio.Lock] = None
+
+    @property
+    def atualizando(self) -> bool:
+        return self._lock is not None and self._lock.locked()
+
+    @property
+    def disponivel(self) -> bool:
+        """Indica se as consultas devem ser respondidas pelo resumo."""
+        return self.ativo and self.existe
+
+    async def verificar(self) -> bool:
+        """Verifica se o resumo existe no banco, criando-o se configurado para isso."""
+        if not self.ativo:
+            return False
+        if self.criar_automaticamente:
+            await self.execute_command_async(self.QUERY_CRIAR)
+        resultado = await self.execute_query_single_async(
+            "SELECT to_regclass(%s) IS NOT NULL", (self.VIEW,)
+        )
+        self.existe = bool(resultado and resultado[0])
+        if not self.existe:
+            logger.info("Resumo %s não encontrado; consultas seguem no sgpm.policial", self.VIEW)
+        return self.existe
+
+    async def atualizar(self) -> Optional[bool]:
+        """
+        Atualiza o resumo sem bloquear leituras (REFRESH ... CONCURRENTLY) e
+        invalida os caches derivados dele, neste e nos demais workers.
+        Se já houver uma atualização em andamento, neste ou em outro worker,
+        não inicia outra e retorna None; em caso de erro retorna False.
+        """
+        if not self.disponivel:
+            return False
+        if self.atualizando:
+            return None
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            sucesso = await self.run_async(self._refresh)
+        if sucesso:
+            for nome in self.CACHES_DERIVADOS:
+                cache_resultados.invalidar(nome)
+                await invalidacao_cache.publicar(nome)
+        return sucesso
+
+    async def atualizar_agendado(self) -> None:
+        """Tarefa periódica: com vários workers, só o líder atualiza o resumo."""
+        if lider_tarefas.eh_lider:
+            await self.atualizar()
+
+    def _refresh(self) -> Optional[bool]:
+        # O advisory lock da transação impede dois REFRESH simultâneos entre workers
+        try:
+            with self.db_config.connection() as conn:
+                with conn.cursor() as cursor:
+                    cursor.execute("SELECT pg_try_advisory_xact_lock(hashtext(%s))", (self.VIEW,))
+                    if not cursor.fetchone()[0]:
+                        logger.info("Resumo %s já está sendo atualizado por outro worker", self.VIEW)
+                        return None
+                    cursor.execute(f"REFRESH MATERIALIZED VIEW CONCURRENTLY {self.VIEW}")
+            return True
+        except Exception as e:
+            logger.error("Erro ao atualizar o resumo %s: %s", self.VIEW, e)
+            return False
+
+
+# Instância compartilhada, verificada na inicialização da aplicação
+sgpm_resumo = SgpmResumoModel()
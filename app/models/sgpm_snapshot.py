@@ -0,0 +1,151 @@
+import logging
+import os
+from typing import Dict, NamedTuple, Optional, Sequence
+from .base_model import BaseModel
+
+logger = logging.getLogger(__name__)
+
+try:
+    import numpy as np
+except ImportError:  # numpy é opcional: sem ele o snapshot fica desativado
+    np = None
+
+class _Colunas(NamedTuple):
+    sexo: "np.ndarray"
+    situacao: "np.ndarray"
+    tipo: "np.ndarray"
+    posto_grad: "np.ndarray"
+    lotacao: "np.ndarray"
+    codigos_sexo: Dict[str, int]
+    codigos_situacao: Dict[str, "np.ndarray"]
+    codigos_tipo: Dict[str, "np.ndarray"]
+
+class PolicialSnapshot(BaseModel):
+    """
+    Cópia colunar em memória das colunas de filtro do sgpm.policial (sexo,
+    situação, tipo, posto/graduação e lotação), em arrays NumPy de inteiros.
+    Qualquer combinação de filtros do filtro avançado vira um AND de máscaras
+    booleanas, respondido sem ir ao banco.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.ativo = os.getenv("SGPM_SNAPSHOT_ATIVO", "false").lower() == "true"
+        self.intervalo_refresh = float(os.getenv("SGPM_SNAPSHOT_REFRESH_SEGUNDOS", "300"))
+        self._colunas: Optional[_Colunas] = None
+        if self.ativo and np is None:
+            logger.warning("SGPM_SNAPSHOT_ATIVO requer numpy; snapshot de policiais desativado")
+            self.ativo = False
+
+    @property
+    def disponivel(self) -> bool:
+        return self.ativo and self._colunas is not None
+
+    @property
+    def total(self) -> int:
+        return len(self._colunas.sexo) if self._colunas is not None else 0
+
+    async def carregar(self) -> bool:
+        """Recarrega as colunas do sgpm.policial. Retorna False em caso de falha."""
+        if not self.ativo:
+            return False
+
+        # Mesmo JOIN do filtro avançado: só conta policiais com lotação existente
+        query = """
+        SELECT p.sexo, p.cod_policial_situacao, p.cod_policial_tipo, p.cod_posto_grad, p.cod_opm_lotacao
+        FROM sgpm.policial p
+        JOIN sgpm.opm o ON p.cod_opm_lotacao = o.cod_opm;
+        """
+        linhas = await self.execute_query_async(query)
+        situacoes = await self.execute_query_async(
+            "SELECT cod_policial_situacao, situacao FROM sgpm.policial_situacao;"
+        )
+        tipos = await self.execute_query_async(
+            "SELECT cod_policial_tipo, policial_tipo FROM sgpm.policial_tipo;"
+        )
+        if linhas is None or situacoes is None or tipos is None:
+            return False
+
+        # A montagem dos arrays é CPU pura; roda fora do event loop
+        colunas = await self.run_async(self._montar_colunas, linhas, situacoes, tipos)
+        self._colunas = colunas
+        logger.info("Snapshot de policiais carregado: %d registros", len(colunas.sexo))
+        return True
+
+    @staticmethod
+    def _montar_colunas(linhas: list, situacoes: list, tipos: list) -> _Colunas:
+        def inteiros(indice: int) -> "np.ndarray":
+            return np.fromiter(
+                (-1 if linha[indice] is None else linha[indice] for linha in linhas),
+                dtype=np.int32, count=len(linhas)
+            )
+
+        codigos_sexo: Dict[str, int] = {}
+        sexo = np.fromiter(
+            (-1 if linha[0] is None else codigos_sexo.setdefault(linha[0], len(codigos_sexo))
+             for linha in linhas),
+            dtype=np.int8, count=len(linhas)
+        )
+
+        def agrupar_codigos(dimensao: list) -> Dict[str, "np.ndarray"]:
+            grupos: Dict[str, list] = {}
+            for codigo, descricao in dimensao:
+                grupos.setdefault(descricao, []).append(codigo)
+            return {descricao: np.array(codigos, dtype=np.int32) for descricao, codigos in grupos.items()}
+
+        return _Colunas(
+            sexo=sexo,
+            situacao=inteiros(1),
+            tipo=inteiros(2),
+            posto_grad=inteiros(3),
+            lotacao=inteiros(4),
+            codigos_sexo=codigos_sexo,
+            codigos_situacao=agrupar_codigos(situacoes),
+            codigos_tipo=agrupar_codigos(tipos),
+        )
+
+    def contar(
+        self,
+        sexo: str = None,
+        situacao: str = None,
+        tipo: str = None,
+        posto_grad: int = None,
+        unidade: int = None,
+        unidades_comando: Optional[Sequence[int]] = None
+    ) -> int:
+        """Conta os policiais que atendem a todos os filtros informados."""
+        colunas = self._colunas
+        mascara = np.ones(len(colunas.sexo), dtype=bool)
+
+        if sexo:
+            codigo = colunas.codigos_sexo.get(sexo)
+            if codigo is None:
+                return 0
+            mascara &= colunas.sexo == codigo
+
+        if situacao:
+            codigos = colunas.codigos_situacao.get(situacao)
+            if codigos is None:
+                return 0
+            mascara &= np.isin(colunas.situacao, codigos)
+
+        if tipo:
+            codigos = colunas.codigos_tipo.get(tipo)
+            if codigos is None:
+                return 0
+            mascara &= np.isin(colunas.tipo, codigos)
+
+        if posto_grad:
+            mascara &= colunas.posto_grad == posto_grad
+
+        if unidade:
+            mascara &= colunas.lotacao == unidade
+
+        if unidades_comando is not None:
+            mascara &= np.isin(colunas.lotacao, np.asarray(unidades_comando, dtype=np.int32))
+
+        return int(np.count_nonzero(mascara))
+
+
+# Instância compartilhada, carregada na inicialização quando SGPM_SNAPSHOT_ATIVO=true
+policial_snapshot = PolicialSnapshot()
@@ -0,0 +1,115 @@
+import asyncio
+import logging
+from typing import Dict, NamedTuple, Optional, Tuple
+from .base_model import BaseModel
+
+logger = logging.getLogger(__name__)
+
+class _Snapshot(NamedTuple):
+    postos_graduacao: Tuple[Dict, ...]
+    unidades: Tuple[Dict, ...]
+    comandos_regionais: Tuple[Dict, ...]
+    tipos_equipamento: Tuple[Dict, ...]
+
+class TabelasReferencia(BaseModel):
+    """
+    Cópia em memória das tabelas de referência usadas nos filtros do dashboard
+    (postos/graduações, unidades, comandos regionais e tipos de equipamento).
+    São tabelas pequenas que quase não mudam: carregadas na inicialização e
+    recarregadas periodicamente, as rotas de lista respondem sem ir ao banco.
+    Cada recarga monta um snapshot novo e o troca inteiro; ele nunca é alterado.
+    """
+
+    QUERY_POSTOS_GRADUACAO = """
+    SELECT cod_posto_grad, posto_grad, posto_grad_abrev
+    FROM sgpm.posto_grad
+    WHERE cod_posto_grad > 0
+    ORDER BY cod_posto_grad
+    LIMIT 50;
+    """
+
+    QUERY_UNIDADES = """
+    SELECT cod_opm, opm
+    FROM sgpm.opm
+    WHERE cod_opm > 0
+    ORDER BY opm
+    LIMIT 200;
+    """
+
+    QUERY_COMANDOS_REGIONAIS = """
+    SELECT op.cod_opm, op.opm
+    FROM sgpm.opm op
+    WHERE op.grande_comando = 'S'
+    ORDER BY op.cod_opm;
+    """
+
+    QUERY_TIPOS_EQUIPAMENTO = """
+    SELECT id, nome
+    FROM coneq.tipo_equipamento;
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._snapshot: Optional[_Snapshot] = None
+        self._lock: Optional[asyncio.Lock] = None
+
+    @property
+    def carregado(self) -> bool:
+        return self._snapshot is not None
+
+    async def carregar(self) -> bool:
+        """Lê as tabelas e troca o snapshot. Em caso de falha mantém o anterior e retorna False."""
+        postos, unidades, comandos, tipos = await asyncio.gather(
+            self.execute_query_async(self.QUERY_POSTOS_GRADUACAO),
+            self.execute_query_async(self.QUERY_UNIDADES),
+            self.execute_query_async(self.QUERY_COMANDOS_REGIONAIS),
+            self.execute_query_async(self.QUERY_TIPOS_EQUIPAMENTO),
+        )
+        if postos is None or unidades is None or comandos is None or tipos is None:
+            return False
+
+        self._snapshot = _Snapshot(
+            postos_graduacao=tuple(
+                {"cod_posto_grad": row[0], "posto_grad": row[1], "posto_grad_abrev": row[2]}
+                for row in postos
+            ),
+            unidades=tuple({"cod_opm": row[0], "opm": row[1]} for row in unidades),
+            comandos_regionais=tuple({"cod_opm": row[0], "opm": row[1]} for row in comandos),
+            tipos_equipamento=tuple({"id": row[0], "nome": row[1]} for row in tipos),
+        )
+        logger.info(
+            "Tabelas de referência carregadas: %d postos/graduações, %d unidades, %d comandos, %d tipos de equipamento",
+            len(postos), len(unidades), len(comandos), len(tipos)
+        )
+        return True
+
+    async def garantir_carregado(self) -> bool:
+        """Carrega as tabelas na primeira utilização, caso ainda não tenham sido carregadas."""
+        if self._snapshot is not None:
+            return True
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            if self._snapshot is None:
+                await self.carregar()
+        return self._snapshot is not None
+
+    @property
+    def postos_graduacao(self) -> Tuple[Dict, ...]:
+        return self._snapshot.postos_graduacao if self._snapshot is not None else ()
+
+    @property
+    def unidades(self) -> Tuple[Dict, ...]:
+        return self._snapshot.unidades if self._snapshot is not None else ()
+
+    @property
+    def comandos_regionais(self) -> Tuple[Dict, ...]:
+        return self._snapshot.comandos_regionais if self._snapshot is not None else ()
+
+    @property
+    def tipos_equipamento(self) -> Tuple[Dict, ...]:
+        return self._snapshot.tipos_equipamento if self._snapshot is not None else ()
+
+
+# Instância compartilhada, carregada na inicialização da aplicação
+tabelas_referencia = TabelasReferencia()
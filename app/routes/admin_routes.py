@@ -0,0 +1,80 @@
+import hmac
+import os
+from fastapi import APIRouter, Header, HTTPException, Query
+from starlette.concurrency import run_in_threadpool
+from typing import Dict, Optional
+from app.models.invalidacao_cache import invalidacao_cache
+from app.models.lider_tarefas import lider_tarefas
+from app.models.sgpm_resumo_model import sgpm_resumo
+from app.utils.cache import cache_resultados
+from app.utils.metricas import metricas_queries
+
+router = APIRouter(prefix="/api/admin", tags=["Admin"])
+
+def verificar_token(token: Optional[str]) -> None:
+    """
+    Exige o cabeçalho X-Admin-Token igual ao ADMIN_TOKEN. Sem ADMIN_TOKEN
+    configurado os endpoints de administração ficam fechados.
+    """
+    esperado = os.getenv("ADMIN_TOKEN")
+    if not esperado:
+        raise HTTPException(status_code=403, detail="Endpoints de administração desativados (ADMIN_TOKEN não configurado)")
+    if not hmac.compare_digest((token or "").encode(), esperado.encode()):
+        raise HTTPException(status_code=403, detail="Token de administração inválido")
+
+@router.get("/cache")
+async def obter_estatisticas_cache(x_admin_token: str = Header(None)) -> Dict:
+    """Endpoint para retornar as estatísticas do cache de resultados do worker que atendeu."""
+    verificar_token(x_admin_token)
+    return {**cache_resultados.estatisticas(), "pid": os.getpid()}
+
+@router.post("/cache/invalidar")
+async def invalidar_cache(
+    endpoint: str = Query(None, description="Nome do endpoint em cache; vazio invalida tudo"),
+    x_admin_token: str = Header(None)
+) -> Dict:
+    """
+    Endpoint para invalidar o cache de resultados. O worker que atendeu
+    invalida o seu cache e avisa os demais pelo canal de invalidação;
+    "removidos" conta apenas os itens deste worker.
+    """
+    verificar_token(x_admin_token)
+    removidos = cache_resultados.invalidar(endpoint)
+    return {
+        "removidos": removidos,
+        "pid": os.getpid(),
+        "propagado": await invalidacao_cache.publicar(endpoint)
+    }
+
+@router.get("/queries")
+async def obter_metricas_queries(x_admin_token: str = Header(None)) -> Dict:
+    """Endpoint para retornar os percentis (ms) das queries por método e fase."""
+    verificar_token(x_admin_token)
+    return await run_in_threadpool(metricas_queries.resumo)
+
+@router.get("/resumo_sgpm")
+async def obter_estado_resumo(x_admin_token: str = Header(None)) -> Dict:
+    """Endpoint para retornar o estado do resumo materializado do SGPM."""
+    verificar_token(x_admin_token)
+    return {
+        "ativo": sgpm_resumo.ativo,
+        "existe": sgpm_resumo.existe,
+        "atualizando": sgpm_resumo.atualizando,
+        # O REFRESH periódico roda só no worker líder
+        "lider": lider_tarefas.eh_lider,
+        "pid": os.getpid(),
+        "view": sgpm_resumo.VIEW
+    }
+
+@router.post("/resumo_sgpm/atualizar")
+async def atualizar_resumo(x_admin_token: str = Header(None)) -> Dict:
+    """Endpoint para disparar a atualização do resumo materializado do SGPM."""
+    verificar_token(x_admin_token)
+    if not sgpm_resumo.disponivel:
+        raise HTTPException(status_code=409, detail="Resumo do SGPM não está ativo")
+    resultado = await sgpm_resumo.atualizar()
+    if resultado is None:
+        raise HTTPException(status_code=409, detail="Atualização do resumo do SGPM já em andamento")
+    if not resultado:
+        raise HTTPException(status_code=500, detail="Erro ao atualizar o resumo do SGPM")
+    return {"atualizado": True}
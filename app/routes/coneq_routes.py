@@ -1,47 +1,93 @@
-from fastapi import APIRouter, Query
+from fastapi import APIRouter, Query, Request
+from fastapi.responses import StreamingResponse
 from typing import List, Dict
 from app.controllers.coneq_controller import ConeqController
-from app.models.schemas import Equipamento, EstoqueResponse, TipoEquipamentoResponse, CautelaResponse
+from app.middleware.etag import cache_http
+from app.middleware.orcamento_queries import orcamento_queries
+from app.utils.respostas import RespostaJSONRapida
+from app.models.schemas import Equipamento, EstoqueResponse, TipoEquipamentoResponse, CautelaResponse, CautelaEntregaCidade, EstoqueResumoResponse, ResumoTiposEquipamentoResponse
 
 router = APIRouter(prefix="/api", tags=["CONEQ"])
 controller = ConeqController()
 
 @router.get("/estoque", response_model=List[Equipamento])
+@orcamento_queries(1)
 async def obter_estoque():
     """Endpoint para retornar os dados de estoque."""
-    return controller.get_estoque()
+    return await controller.get_estoque()
+
+@router.get("/estoque/eventos")
+async def estoque_eventos(request: Request):
+    """Endpoint Server-Sent Events com as mudanças de estoque em tempo real."""
+    return StreamingResponse(
+        controller.eventos_estoque(request),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 @router.get("/estoque_geral", response_model=EstoqueResponse)
+@cache_http(max_age=30, cache="resumo_estoque")
+@orcamento_queries(1)
 async def get_estoque_geral():
     """Endpoint para retornar os dados gerais de estoque."""
-    return controller.get_estoque_geral()
+    return await controller.get_estoque_geral()
 
 @router.get("/estoqueDado/{tipo_equipamento_id}", response_model=EstoqueResponse)
+@cache_http(max_age=30, cache="resumo_estoque")
+@orcamento_queries(1)
 async def get_estoque_dado(tipo_equipamento_id: int):
     """Endpoint para retornar os dados de estoque com status."""
-    return controller.get_estoque_por_tipo(tipo_equipamento_id)
+    return await controller.get_estoque_por_tipo(tipo_equipamento_id)
+
+@router.get("/estoque_resumo", response_model=EstoqueResumoResponse)
+@cache_http(max_age=30, cache="resumo_estoque")
+@orcamento_queries(1)
+async def get_estoque_resumo():
+    """Endpoint para retornar o estoque geral e o de todos os tipos de equipamento."""
+    return await controller.get_resumo_estoque()
+
+@router.get("/resumo_tipos_equipamento", response_model=ResumoTiposEquipamentoResponse)
+@cache_http(max_age=30, cache=("resumo_estoque", "resumo_cautelas"))
+@orcamento_queries(2)
+async def get_resumo_tipos_equipamento():
+    """Endpoint para retornar estoque e cautelas por status de todos os tipos de equipamento."""
+    return await controller.get_resumo_tipos_equipamento()
 
 @router.get("/status_counts/{tipo_equipamento_id}", response_model=CautelaResponse)
+@cache_http(max_age=30, cache="resumo_cautelas")
+@orcamento_queries(1)
 async def get_cautela_dado(tipo_equipamento_id: int, status: str = "todos"):
     """Endpoint para retornar os dados de cautela por tipo de equipamento."""
-    return controller.get_cautela_por_tipo(tipo_equipamento_id, status)
+    return await controller.get_cautela_por_tipo(tipo_equipamento_id, status)
 
 @router.get("/cautela_geral", response_model=CautelaResponse)
+@cache_http(max_age=30, cache="resumo_cautelas")
+@orcamento_queries(1)
 async def get_cautela_geral():
     """Endpoint para retornar os dados gerais de cautela."""
-    return controller.get_cautela_por_tipo(0, "todos")  # 0 como ID indica todos os tipos
+    return await controller.get_cautela_por_tipo(0, "todos")  # 0 como ID indica todos os tipos
 
 @router.get("/TipoEquipamentos", response_model=List[TipoEquipamentoResponse])
+@cache_http(max_age=300)
+@orcamento_queries(0)
 async def tipo_equipamentos():
     """Endpoint para retornar os tipos de equipamentos."""
-    return controller.get_tipos_equipamento()
+    return await controller.get_tipos_equipamento()
+
+@router.get("/cautelas_entregas_por_cidade", response_model=List[CautelaEntregaCidade], response_class=RespostaJSONRapida)
+@orcamento_queries(1)
+async def get_cautelas_entregas_por_cidade(cidades: str = Query(...)):
+    """Endpoint para retornar cautelas e entregas por cidade em uma única consulta."""
+    return RespostaJSONRapida(await controller.get_cautelas_entregas_por_cidade(cidades))
 
-@router.get("/quantitativoPorCidade")
+@router.get("/quantitativoPorCidade", response_class=RespostaJSONRapida)
+@orcamento_queries(1)
 async def get_quantitativo_por_cidade(cidades: str = Query(...)):
     """Endpoint para retornar o quantitativo por cidade."""
-    return controller.get_cautelas_por_cidade(cidades)
+    return RespostaJSONRapida(await controller.get_cautelas_por_cidade(cidades))
 
-@router.get("/contar_entregas_por_cidade")
+@router.get("/contar_entregas_por_cidade", response_class=RespostaJSONRapida)
+@orcamento_queries(1)
 async def get_entregas_por_cidade(cidades: str = Query(...)):
     """Endpoint para retornar o número de entregas por cidade."""
-    return controller.get_entregas_por_cidade(cidades) 
\ No newline at end of file
+    return RespostaJSONRapida(await controller.get_entregas_por_cidade(cidades))
@@ -0,0 +1,24 @@
+from fastapi import APIRouter, Query, Request
+from app.controllers.geo_controller import GeoController
+from app.middleware.orcamento_queries import orcamento_queries
+
+router = APIRouter(prefix="/api/geo", tags=["Geo"])
+controller = GeoController()
+
+@router.get("/municipios")
+@orcamento_queries(3)
+async def obter_municipios(
+    request: Request,
+    zoom: int = Query(None, ge=0, le=22),
+    contagens: str = Query(None)
+):
+    """
+    Endpoint para retornar a malha municipal de MT simplificada para o zoom do mapa.
+    contagens=sgpm,coneq inclui nas propriedades de cada município as contagens por cidade.
+    """
+    return await controller.get_municipios(
+        zoom,
+        contagens,
+        request.headers.get("accept-encoding", ""),
+        request.headers.get("if-none-match", "")
+    )
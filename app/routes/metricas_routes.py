@@ -0,0 +1,17 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+from starlette.concurrency import run_in_threadpool
+from app.utils.metricas import metricas_queries
+
+router = APIRouter(tags=["Métricas"])
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def exportar_metricas() -> PlainTextResponse:
+    """
+    Endpoint para o Prometheus: tempos das queries por método, erros e queries
+    lentas. No gunicorn, qualquer worker responde com a soma de todos.
+    """
+    return PlainTextResponse(
+        await run_in_threadpool(metricas_queries.exportar_prometheus),
+        media_type="text/plain; version=0.0.4"
+    )
@@ -0,0 +1,18 @@
+from fastapi import APIRouter
+from fastapi.responses import JSONResponse
+from app.models.aquecimento import estado_aquecimento
+
+router = APIRouter(tags=["Saúde"])
+
+@router.get("/ready")
+async def verificar_prontidao() -> JSONResponse:
+    """
+    Endpoint de prontidão para o balanceador/orquestrador: 200 somente depois
+    que índices, tabelas de referência e snapshots estiverem em memória; 503 antes.
+    """
+    componentes = estado_aquecimento()
+    pronto = all(componentes.values())
+    return JSONResponse(
+        {"pronto": pronto, "componentes": componentes},
+        status_code=200 if pronto else 503
+    )
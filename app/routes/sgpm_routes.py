@@ -1,6 +1,9 @@
 from fastapi import APIRouter, Query
 from typing import List, Dict
 from app.controllers.sgpm_controller import SgpmController
+from app.middleware.etag import cache_http
+from app.middleware.orcamento_queries import orcamento_queries
+from app.utils.respostas import RespostaJSONRapida, RespostaNDJSON
 from app.models.schemas import (
     SexoContagem, 
     TipoContagem, 
@@ -10,67 +13,94 @@ from app.models.schemas import (
     PostoGraduacaoInfo,
     ComandoRegional,
     Unidade,
-    FiltroAvancadoResponse
+    FiltroAvancadoResponse,
+    PaginaPoliciaisResponse,
+    ResumoSgpmResponse
 )
 
 router = APIRouter(prefix="/api", tags=["SGPM"])
 controller = SgpmController()
 
 @router.get("/policiais_sexo", response_model=List[SexoContagem])
+@cache_http(max_age=300, cache="policiais_sexo")
+@orcamento_queries(1)
 async def obter_sexo_policiais():
     """Endpoint para retornar os dados de sexo dos policiais."""
-    return controller.get_policiais_por_sexo()
+    return await controller.get_policiais_por_sexo()
 
 @router.get("/policiais_tipo", response_model=List[TipoContagem])
+@cache_http(max_age=300, cache="policiais_tipo")
+@orcamento_queries(1)
 async def obter_tipo_policiais():
     """Endpoint para retornar os dados de tipo dos policiais."""
-    return controller.get_policiais_por_tipo()
+    return await controller.get_policiais_por_tipo()
 
 @router.get("/policiais_situacao", response_model=List[SituacaoContagem])
+@cache_http(max_age=300, cache="policiais_situacao")
+@orcamento_queries(1)
 async def obter_situacao_policiais():
     """Endpoint para retornar os dados de situação dos policiais."""
-    return controller.get_policiais_por_situacao()
+    return await controller.get_policiais_por_situacao()
 
 @router.get("/dados_posto_grad", response_model=PostoGradResponse)
+@cache_http(max_age=300, cache="dados_posto_grad")
+@orcamento_queries(1)
 async def dados_posto_grad(
     sexo: str = Query(None),
     situacao: str = Query(None),
     tipo: str = Query(None)
 ):
     """Endpoint para retornar os dados de posto/graduação com filtros opcionais."""
-    return controller.get_policiais_por_posto_grad_sexo(sexo, situacao, tipo)
+    return await controller.get_policiais_por_posto_grad_sexo(sexo, situacao, tipo)
+
+@router.get("/resumo_sgpm", response_model=ResumoSgpmResponse)
+@cache_http(max_age=300, cache="resumo_sgpm")
+@orcamento_queries(1)
+async def obter_resumo_sgpm():
+    """Endpoint para retornar sexo, situação, tipo, posto/graduação e totais por CR em uma única chamada."""
+    return await controller.get_resumo_sgpm()
 
 @router.get("/policiais_filtro")
+@orcamento_queries(1)
 async def filtrar_policiais(
     sexo: str = Query(None), 
     situacao: str = Query(None), 
     tipo: str = Query(None)
 ):
     """Filtra policiais com base em sexo, situação e tipo"""
-    return controller.filtrar_policiais(sexo, situacao, tipo)
+    return await controller.filtrar_policiais(sexo, situacao, tipo)
 
 # Novos endpoints para os filtros
 @router.get("/postos_graduacao_sgpm", response_model=List[PostoGraduacaoInfo])
+@cache_http(max_age=300)
+@orcamento_queries(0)
 async def obter_postos_graduacao():
     """Endpoint para retornar todos os postos/graduações disponíveis."""
-    return controller.get_postos_graduacao()
+    return await controller.get_postos_graduacao()
 
-@router.get("/unidades_sgpm", response_model=List[Unidade])
+@router.get("/unidades_sgpm", response_model=List[Unidade], response_class=RespostaJSONRapida)
+@cache_http(max_age=300)
+@orcamento_queries(0)
 async def obter_unidades():
     """Endpoint para retornar todas as unidades disponíveis."""
-    return controller.get_unidades()
+    return RespostaJSONRapida(await controller.get_unidades())
 
 @router.get("/comandos_regionais", response_model=List[ComandoRegional])
+@cache_http(max_age=300)
+@orcamento_queries(0)
 async def obter_comandos_regionais():
     """Endpoint para retornar todos os comandos regionais disponíveis."""
-    return controller.get_comandos_regionais()
+    return await controller.get_comandos_regionais()
 
-@router.get("/unidades_por_comando", response_model=List[Unidade])
+@router.get("/unidades_por_comando", response_model=List[Unidade], response_class=RespostaJSONRapida)
+@cache_http(max_age=300)
+@orcamento_queries(0)
 async def obter_unidades_por_comando(comando_id: int = Query(...)):
     """Endpoint para retornar todas as unidades subordinadas a um comando regional."""
-    return controller.get_unidades_por_comando(comando_id)
+    return RespostaJSONRapida(await controller.get_unidades_por_comando(comando_id))
 
 @router.get("/policiais_filtro_avancado", response_model=FiltroAvancadoResponse)
+@orcamento_queries(1)
 async def filtrar_policiais_avancado(
     sexo: str = Query(None),
     situacao: str = Query(None),
@@ -80,28 +110,85 @@ async def filtrar_policiais_avancado(
     posto_grad: int = Query(None)
 ):
     """Filtra policiais com base em todos os filtros disponíveis."""
-    return controller.filtrar_policiais_avancado(
+    return await controller.filtrar_policiais_avancado(
+        sexo=sexo,
+        situacao=situacao,
+        tipo=tipo,
+        comando_regional=comando_regional,
+        unidade=unidade,
+        posto_grad=posto_grad
+    )
+
+@router.get("/policiais_filtro_avancado/dados", response_model=PaginaPoliciaisResponse, response_class=RespostaJSONRapida)
+@orcamento_queries(1)
+async def listar_policiais_avancado(
+    sexo: str = Query(None),
+    situacao: str = Query(None),
+    tipo: str = Query(None),
+    comando_regional: int = Query(None),
+    unidade: int = Query(None),
+    posto_grad: int = Query(None),
+    limite: int = Query(100, ge=1, le=1000),
+    apos: int = Query(None, description="Valor de \"proximo\" da página anterior")
+):
+    """
+    Endpoint para retornar uma página dos policiais que atendem ao filtro avançado.
+    A página é devolvida como RespostaJSONRapida, sem validação pelo
+    PaginaPoliciaisResponse, que apenas documenta o formato; a correspondência
+    entre os dois é coberta em tests/test_paginacao_policiais.py.
+    """
+    return RespostaJSONRapida(await controller.listar_policiais_avancado(
+        limite=limite,
+        apos=apos,
         sexo=sexo,
         situacao=situacao,
         tipo=tipo,
         comando_regional=comando_regional,
         unidade=unidade,
         posto_grad=posto_grad
+    ))
+
+@router.get("/policiais_filtro_avancado/exportar")
+@orcamento_queries(1)
+async def exportar_policiais_avancado(
+    sexo: str = Query(None),
+    situacao: str = Query(None),
+    tipo: str = Query(None),
+    comando_regional: int = Query(None),
+    unidade: int = Query(None),
+    posto_grad: int = Query(None)
+):
+    """Endpoint para exportar todos os policiais do filtro avançado em NDJSON, sem montar a lista em memória."""
+    lotes = await controller.exportar_policiais_avancado(
+        sexo=sexo,
+        situacao=situacao,
+        tipo=tipo,
+        comando_regional=comando_regional,
+        unidade=unidade,
+        posto_grad=posto_grad
+    )
+    return RespostaNDJSON(
+        lotes,
+        headers={"Content-Disposition": 'attachment; filename="policiais.ndjson"'},
     )
 
 @router.get("/totais-por-cr")
+@cache_http(max_age=600, cache="totais_por_cr")
+@orcamento_queries(1)
 async def get_totais_por_cr():
     """Endpoint para retornar o total de policiais por CR."""
-    return controller.get_totais_por_cr()
+    return await controller.get_totais_por_cr()
 
-@router.get("/contar_sexo_por_cidade")
+@router.get("/contar_sexo_por_cidade", response_class=RespostaJSONRapida)
+@orcamento_queries(2)
 async def contar_sexo_por_cidade(cidades: str = Query(...)):
     """Endpoint para retornar a contagem de policiais por sexo e cidade."""
     # Fazer o parsing da string de cidades para uma lista
     cidades_lista = [cidade.strip() for cidade in cidades.split(',')]
-    return controller.get_policiais_por_cidade(cidades_lista)
+    return RespostaJSONRapida(await controller.get_policiais_por_cidade(cidades_lista))
 
-@router.get("/contar_sexo_por_unidade")
+@router.get("/contar_sexo_por_unidade", response_class=RespostaJSONRapida)
+@orcamento_queries(1)
 async def contar_sexo_por_unidade(cidade: str = Query(...)):
     """Endpoint para retornar a contagem de policiais por sexo e unidade."""
-    return controller.get_policiais_por_unidade(cidade) 
+    return RespostaJSONRapida(await controller.get_policiais_por_unidade(cidade))
@@ -0,0 +1,62 @@
+import asyncio
+import logging
+from typing import Awaitable, Callable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class TarefaPeriodica:
+    """Executa uma corrotina em intervalo fixo no event loop da aplicação."""
+
+    def __init__(self, nome: str, intervalo: float, funcao: Callable[[], Awaitable], imediato: bool = False):
+        self.nome = nome
+        self.intervalo = intervalo
+        self.funcao = funcao
+        # imediato: a primeira execução acontece logo ao iniciar, sem esperar o intervalo
+        self.imediato = imediato
+        self._task: Optional[asyncio.Task] = None
+
+    async def _executar(self) -> None:
+        primeira = True
+        while True:
+            if not (primeira and self.imediato):
+                await asyncio.sleep(self.intervalo)
+            primeira = False
+            try:
+                await self.funcao()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Erro na tarefa periódica %s", self.nome)
+
+    def iniciar(self) -> None:
+        if self.intervalo > 0 and self._task is None:
+            self._task = asyncio.create_task(self._executar(), name=self.nome)
+
+    async def parar(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+class Agendador:
+    """Conjunto de tarefas periódicas iniciadas e paradas junto com a aplicação."""
+
+    def __init__(self):
+        self.tarefas: List[TarefaPeriodica] = []
+
+    def agendar(self, nome: str, intervalo: float, funcao: Callable[[], Awaitable],
+                imediato: bool = False) -> TarefaPeriodica:
+        tarefa = TarefaPeriodica(nome, intervalo, funcao, imediato)
+        self.tarefas.append(tarefa)
+        tarefa.iniciar()
+        return tarefa
+
+    async def parar_todas(self) -> None:
+        for tarefa in self.tarefas:
+            await tarefa.parar()
+        self.tarefas.clear()
@@ -0,0 +1,123 @@
+import contextvars
+import functools
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+
+
+class CacheTTL:
+    """Cache em memória com expiração por item (TTL) e descarte LRU ao atingir o limite."""
+
+    def __init__(self, max_itens: int = 256):
+        self.max_itens = max_itens
+        self._itens: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.acertos = 0
+        self.falhas = 0
+
+    def obter(self, chave: Hashable) -> Tuple[bool, Any]:
+        """Retorna (True, valor) se a chave estiver no cache e não tiver expirado."""
+        encontrado, valor, _ = self.obter_com_expiracao(chave)
+        return encontrado, valor
+
+    def obter_com_expiracao(self, chave: Hashable) -> Tuple[bool, Any, float]:
+        """Como obter, acrescentando o instante (time.monotonic) em que o item expira."""
+        with self._lock:
+            item = self._itens.get(chave)
+            if item is None:
+                self.falhas += 1
+                return False, None, 0.0
+            expira_em, valor = item
+            if expira_em <= time.monotonic():
+                del self._itens[chave]
+                self.falhas += 1
+                return False, None, 0.0
+            self._itens.move_to_end(chave)
+            self.acertos += 1
+            return True, valor, expira_em
+
+    def definir(self, chave: Hashable, valor: Any, ttl: float) -> float:
+        """
+        Armazena o valor por ttl segundos, descartando o item menos usado se
+        necessário. Retorna o instante (time.monotonic) em que o item expira.
+        """
+        with self._lock:
+            expira_em = time.monotonic() + ttl
+            self._itens[chave] = (expira_em, valor)
+            self._itens.move_to_end(chave)
+            while len(self._itens) > self.max_itens:
+                self._itens.popitem(last=False)
+            return expira_em
+
+    def invalidar(self, prefixo: Optional[str] = None) -> int:
+        """Remove todos os itens, ou apenas os do endpoint informado. Retorna quantos saíram."""
+        with self._lock:
+            if prefixo is None:
+                removidos = len(self._itens)
+                self._itens.clear()
+                return removidos
+            chaves = [chave for chave in self._itens if chave[0] == prefixo]
+            for chave in chaves:
+                del self._itens[chave]
+            return len(chaves)
+
+    def estatisticas(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "itens": len(self._itens),
+                "max_itens": self.max_itens,
+                "acertos": self.acertos,
+                "falhas": self.falhas,
+            }
+
+
+cache_resultados = CacheTTL(int(os.getenv("CACHE_MAX_ITENS", "256")))
+CACHE_ATIVO = os.getenv("CACHE_ATIVO", "true").lower() == "true"
+
+# Expirações dos itens de cache_resultado lidos ou gravados na requisição em
+# andamento, preenchidas para o ETagMiddleware
+expiracoes_requisicao: contextvars.ContextVar[Optional[List[float]]] = contextvars.ContextVar(
+    "expiracoes_requisicao", default=None
+)
+
+
+def _vazio(valor: Any) -> bool:
+    if isinstance(valor, dict):
+        return not valor or all(not v for v in valor.values())
+    return not valor
+
+
+def cache_resultado(nome: str, ttl: float) -> Callable:
+    """
+    Decorador para métodos assíncronos de modelo: guarda o resultado em
+    cache_resultados por ttl segundos. A chave inclui o nome do endpoint e os
+    parâmetros de filtro. Resultados vazios não são guardados, para que uma falha
+    no banco não fique em cache. A expiração do item usado é anotada em
+    expiracoes_requisicao, quando a requisição a acompanha.
+    """
+    def decorador(metodo: Callable) -> Callable:
+        @functools.wraps(metodo)
+        async def envoltorio(self, *args, **kwargs):
+            if not CACHE_ATIVO:
+                return await metodo(self, *args, **kwargs)
+
+            chave = (nome, args, tuple(sorted(kwargs.items())))
+            expiracoes = expiracoes_requisicao.get()
+            encontrado, valor, expira_em = cache_resultados.obter_com_expiracao(chave)
+            if encontrado:
+                if expiracoes is not None:
+                    expiracoes.append(expira_em)
+                return valor
+
+            valor = await metodo(self, *args, **kwargs)
+            if not _vazio(valor):
+                expira_em = cache_resultados.definir(chave, valor, ttl)
+                if expiracoes is not None:
+                    expiracoes.append(expira_em)
+            return valor
+
+        return envoltorio
+
+    return decorador
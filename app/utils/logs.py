@@ -0,0 +1,82 @@
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+from typing import List, Optional
+
+# Atributos padrão de LogRecord; o restante vem do extra= e entra no JSON
+_ATRIBUTOS_PADRAO = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime"}
+
+_listener: Optional[logging.handlers.QueueListener] = None
+# Processo dono da thread do listener; depois de um fork (workers do gunicorn) ela não existe mais
+_pid_listener: Optional[int] = None
+
+
+class FormatadorJson(logging.Formatter):
+    """Uma linha JSON por registro, com os campos passados em extra=."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        registro = {
+            "ts": self.formatTime(record, "%Y-%m-%dT%H:%M:%S"),
+            "nivel": record.levelname,
+            "logger": record.name,
+            "mensagem": record.getMessage(),
+        }
+        for chave, valor in vars(record).items():
+            if chave not in _ATRIBUTOS_PADRAO and not chave.startswith("_"):
+                registro[chave] = valor
+        if record.exc_info:
+            registro["excecao"] = self.formatException(record.exc_info)
+        return json.dumps(registro, ensure_ascii=False, default=str)
+
+
+def configurar_logs() -> None:
+    """
+    Configura os loggers da aplicação (pacote "app") a partir do ambiente:
+    LOG_LEVEL (padrão INFO), LOG_FORMATO ("texto" ou "json"), LOG_FILE (cópia
+    em arquivo, opcional) e LOG_ASSINCRONO. Com LOG_ASSINCRONO=true os registros
+    vão para uma fila e são escritos por uma thread própria, fora do caminho das
+    requisições.
+    """
+    global _listener, _pid_listener
+    if _listener is not None and _pid_listener == os.getpid():
+        return
+    _listener = None
+
+    if os.getenv("LOG_FORMATO", "texto").lower() == "json":
+        formatador: logging.Formatter = FormatadorJson()
+    else:
+        formatador = logging.Formatter("%(asctime)s %(levelname)s [%(name)s] %(message)s")
+
+    saidas: List[logging.Handler] = [logging.StreamHandler(sys.stdout)]
+    if os.getenv("LOG_FILE"):
+        saidas.append(logging.handlers.WatchedFileHandler(os.environ["LOG_FILE"], encoding="utf-8"))
+    for saida in saidas:
+        saida.setFormatter(formatador)
+
+    logger_app = logging.getLogger("app")
+    logger_app.setLevel(os.getenv("LOG_LEVEL", "INFO").upper())
+    logger_app.propagate = False
+    for handler in list(logger_app.handlers):
+        logger_app.removeHandler(handler)
+        handler.close()
+
+    if os.getenv("LOG_ASSINCRONO", "false").lower() == "true":
+        fila: "queue.Queue[logging.LogRecord]" = queue.Queue(-1)
+        logger_app.addHandler(logging.handlers.QueueHandler(fila))
+        _listener = logging.handlers.QueueListener(fila, *saidas, respect_handler_level=True)
+        _listener.start()
+        _pid_listener = os.getpid()
+    else:
+        for saida in saidas:
+            logger_app.addHandler(saida)
+
+
+def encerrar_logs() -> None:
+    """Esvazia a fila do handler assíncrono (usado no encerramento da aplicação)."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
@@ -0,0 +1,281 @@
+import bisect
+import contextvars
+import glob
+import json
+import os
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict, Iterable, List, Optional, Tuple
+
+# Limites (em segundos) dos buckets cumulativos exportados no formato Prometheus
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUANTIS = (0.5, 0.95, 0.99)
+FASES = ("espera_pool", "execucao", "leitura")
+
+
+class Histograma:
+    """
+    Distribuição de durações: buckets cumulativos (desde a inicialização) e uma
+    janela com as últimas amostras, usada para os percentis p50/p95/p99.
+    """
+
+    def __init__(self, janela: int):
+        self.contagens = [0] * (len(BUCKETS) + 1)
+        self.soma = 0.0
+        self.total = 0
+        self.amostras: Deque[float] = deque(maxlen=janela)
+
+    def observar(self, valor: float) -> None:
+        self.contagens[bisect.bisect_left(BUCKETS, valor)] += 1
+        self.soma += valor
+        self.total += 1
+        self.amostras.append(valor)
+
+    def quantis(self) -> Dict[float, float]:
+        return _quantis(self.amostras)
+
+
+def _quantis(amostras: Iterable[float]) -> Dict[float, float]:
+    ordenadas = sorted(amostras)
+    if not ordenadas:
+        return {}
+    return {q: ordenadas[min(len(ordenadas) - 1, int(q * len(ordenadas)))] for q in QUANTIS}
+
+
+class MetricasQueries:
+    """
+    Tempos das queries por método do model e por fase (espera por conexão do
+    pool, execução e leitura das linhas), além de erros e queries lentas.
+    Com METRICAS_DIR (perfil gunicorn), cada worker grava o seu estado nesse
+    diretório e a exportação soma os de todos, inclusive os dos workers já
+    encerrados: os contadores não voltam a zero a cada worker que atende o scrape.
+    """
+
+    def __init__(self):
+        self.ativo = os.getenv("DB_METRICAS_ATIVAS", "true").lower() == "true"
+        self.janela = int(os.getenv("DB_METRICAS_JANELA", "1024"))
+        # Execução + leitura acima disso (ms) conta como lenta e vai para o log; 0 desativa
+        self.limite_lenta = float(os.getenv("DB_QUERY_LENTA_MS", "500")) / 1000
+        # Intervalo mínimo entre dois EXPLAIN do mesmo método no log de queries lentas
+        self.intervalo_explain = float(os.getenv("DB_QUERY_LENTA_EXPLAIN_SEGUNDOS", "60"))
+        self.diretorio = os.getenv("METRICAS_DIR") or None
+        self.intervalo_gravacao = float(os.getenv("METRICAS_GRAVAR_SEGUNDOS", "15"))
+        self._histogramas: Dict[Tuple[str, str], Histograma] = {}
+        self._erros: Dict[str, int] = {}
+        self._lentas: Dict[str, int] = {}
+        self._ultimo_explain: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def registrar(self, metodo: str, espera: float, execucao: float, leitura: float = 0.0) -> bool:
+        """Registra uma execução; retorna True se ela passou do limite de query lenta."""
+        lenta = 0 < self.limite_lenta <= execucao + leitura
+        with self._lock:
+            for fase, valor in zip(FASES, (espera, execucao, leitura)):
+                histograma = self._histogramas.get((metodo, fase))
+                if histograma is None:
+                    histograma = self._histogramas[(metodo, fase)] = Histograma(self.janela)
+                histograma.observar(valor)
+            if lenta:
+                self._lentas[metodo] = self._lentas.get(metodo, 0) + 1
+        return lenta
+
+    def reiniciar(self) -> None:
+        """Zera as métricas (worker recém-criado pelo fork, que herdaria as do mestre)."""
+        with self._lock:
+            self._histogramas.clear()
+            self._erros.clear()
+            self._lentas.clear()
+
+    def registrar_erro(self, metodo: str) -> None:
+        with self._lock:
+            self._erros[metodo] = self._erros.get(metodo, 0) + 1
+
+    def deve_explicar(self, metodo: str) -> bool:
+        """Limita o EXPLAIN das queries lentas a um por método a cada intervalo."""
+        agora = time.monotonic()
+        with self._lock:
+            if agora - self._ultimo_explain.get(metodo, float("-inf")) < self.intervalo_explain:
+                return False
+            self._ultimo_explain[metodo] = agora
+            return True
+
+    def total_execucoes(self) -> int:
+        """Idas ao banco registradas até agora (com sucesso ou com erro)."""
+        with self._lock:
+            sucesso = sum(h.total for (_, fase), h in self._histogramas.items() if fase == "execucao")
+            return sucesso + sum(self._erros.values())
+
+    def _estado(self) -> Dict[str, Any]:
+        """Cópia serializável (JSON) dos histogramas e contadores deste processo."""
+        with self._lock:
+            return {
+                "histogramas": [
+                    [metodo, fase, list(h.contagens), h.soma, h.total, [round(v, 6) for v in h.amostras]]
+                    for (metodo, fase), h in self._histogramas.items()
+                ],
+                "erros": dict(self._erros),
+                "lentas": dict(self._lentas),
+            }
+
+    def _arquivo(self, nome: str) -> str:
+        return os.path.join(self.diretorio, f"{nome}.json")
+
+    def gravar(self) -> None:
+        """Grava o estado deste processo em METRICAS_DIR (troca atômica do arquivo do pid)."""
+        if not self.diretorio:
+            return
+        os.makedirs(self.diretorio, exist_ok=True)
+        _gravar_json(self._arquivo(str(os.getpid())), self._estado())
+
+    def consolidar_encerrado(self, pid: int) -> None:
+        """
+        Soma o estado de um worker encerrado ao acumulado dos encerrados e apaga
+        o arquivo dele. Chamado pelo mestre do gunicorn (child_exit); as amostras
+        dos percentis são descartadas, os contadores continuam na soma.
+        """
+        if not self.diretorio:
+            return
+        arquivo = self._arquivo(str(pid))
+        estado = _ler_json(arquivo)
+        if estado is None:
+            return
+        encerrados = self._arquivo("encerrados")
+        anteriores = [_ler_json(encerrados) or _somar([])]
+        _gravar_json(encerrados, _somar(anteriores + [estado], amostras=False))
+        os.remove(arquivo)
+
+    def _agregado(self) -> Dict[str, Any]:
+        """Estado deste processo ou, com METRICAS_DIR, a soma do estado de todos os workers."""
+        if not self.diretorio:
+            return self._estado()
+        # O próprio worker grava antes, para o scrape refletir as suas últimas queries
+        self.gravar()
+        estados = (_ler_json(arquivo) for arquivo in sorted(glob.glob(os.path.join(self.diretorio, "*.json"))))
+        return _somar(estado for estado in estados if estado is not None)
+
+    def resumo(self) -> Dict[str, Dict]:
+        """Percentis (em ms) e contagens por método, para consulta administrativa."""
+        estado = self._agregado()
+        metodos: Dict[str, Dict] = {}
+        for metodo, fase, _, _, total, amostras in estado["histogramas"]:
+            item = metodos.setdefault(metodo, {"total": total, "erros": 0, "lentas": 0})
+            item[fase] = {f"p{int(q * 100)}": round(v * 1000, 3) for q, v in _quantis(amostras).items()}
+        for metodo, erros in estado["erros"].items():
+            metodos.setdefault(metodo, {"total": 0, "erros": 0, "lentas": 0})["erros"] = erros
+        for metodo, lentas in estado["lentas"].items():
+            metodos.setdefault(metodo, {"total": 0, "erros": 0, "lentas": 0})["lentas"] = lentas
+        return metodos
+
+    def exportar_prometheus(self) -> str:
+        """Texto no formato de exposição do Prometheus (versão 0.0.4)."""
+        estado = self._agregado()
+        histogramas = sorted(estado["histogramas"], key=lambda item: (item[0], item[1]))
+        erros = sorted(estado["erros"].items())
+        lentas = sorted(estado["lentas"].items())
+
+        linhas: List[str] = [
+            "# HELP pmmt_db_query_segundos Duração das queries por método do model e fase.",
+            "# TYPE pmmt_db_query_segundos histogram",
+        ]
+        for metodo, fase, contagens, soma, total, _ in histogramas:
+            rotulos = f'metodo="{_escapar(metodo)}",fase="{fase}"'
+            acumulado = 0
+            for limite, contagem in zip(BUCKETS, contagens):
+                acumulado += contagem
+                linhas.append(f'pmmt_db_query_segundos_bucket{{{rotulos},le="{limite}"}} {acumulado}')
+            linhas.append(f'pmmt_db_query_segundos_bucket{{{rotulos},le="+Inf"}} {total}')
+            linhas.append(f"pmmt_db_query_segundos_sum{{{rotulos}}} {soma:.6f}")
+            linhas.append(f"pmmt_db_query_segundos_count{{{rotulos}}} {total}")
+
+        linhas += [
+            "# HELP pmmt_db_query_quantil_segundos Percentis das últimas execuções (janela deslizante).",
+            "# TYPE pmmt_db_query_quantil_segundos gauge",
+        ]
+        for metodo, fase, _, _, _, amostras in histogramas:
+            for quantil, valor in _quantis(amostras).items():
+                linhas.append(
+                    f'pmmt_db_query_quantil_segundos{{metodo="{_escapar(metodo)}",fase="{fase}",'
+                    f'quantil="{quantil}"}} {valor:.6f}'
+                )
+
+        linhas += [
+            "# HELP pmmt_db_query_erros_total Queries que terminaram em erro.",
+            "# TYPE pmmt_db_query_erros_total counter",
+        ]
+        linhas += [f'pmmt_db_query_erros_total{{metodo="{_escapar(m)}"}} {n}' for m, n in erros]
+        linhas += [
+            "# HELP pmmt_db_query_lentas_total Queries acima de DB_QUERY_LENTA_MS.",
+            "# TYPE pmmt_db_query_lentas_total counter",
+        ]
+        linhas += [f'pmmt_db_query_lentas_total{{metodo="{_escapar(m)}"}} {n}' for m, n in lentas]
+        return "\n".join(linhas) + "\n"
+
+
+def _somar(estados: Iterable[Dict[str, Any]], amostras: bool = True) -> Dict[str, Any]:
+    """Soma estados de MetricasQueries; com vários workers as janelas de amostras são concatenadas."""
+    histogramas: Dict[Tuple[str, str], list] = {}
+    erros: Dict[str, int] = {}
+    lentas: Dict[str, int] = {}
+    for estado in estados:
+        for metodo, fase, contagens, soma, total, valores in estado["histogramas"]:
+            item = histogramas.get((metodo, fase))
+            if item is None:
+                histogramas[(metodo, fase)] = [metodo, fase, list(contagens), soma, total,
+                                               list(valores) if amostras else []]
+                continue
+            item[2] = [a + b for a, b in zip(item[2], contagens)]
+            item[3] += soma
+            item[4] += total
+            if amostras:
+                item[5].extend(valores)
+        for metodo, n in estado["erros"].items():
+            erros[metodo] = erros.get(metodo, 0) + n
+        for metodo, n in estado["lentas"].items():
+            lentas[metodo] = lentas.get(metodo, 0) + n
+    return {"histogramas": list(histogramas.values()), "erros": erros, "lentas": lentas}
+
+
+def _gravar_json(caminho: str, dados: Any) -> None:
+    # Temporário por thread: a gravação periódica e a do scrape podem coincidir
+    temporario = f"{caminho}.{threading.get_ident()}.tmp"
+    with open(temporario, "w", encoding="utf-8") as arquivo:
+        json.dump(dados, arquivo)
+    os.replace(temporario, caminho)
+
+
+def _ler_json(caminho: str) -> Optional[Any]:
+    # O arquivo pode sumir entre o glob e a leitura (worker consolidado pelo mestre)
+    try:
+        with open(caminho, encoding="utf-8") as arquivo:
+            return json.load(arquivo)
+    except (OSError, ValueError):
+        return None
+
+
+class ContagemQueries:
+    """Idas ao banco feitas durante uma requisição HTTP, por método do model."""
+
+    def __init__(self):
+        self.total = 0
+        self.por_metodo: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def incrementar(self, metodo: str) -> None:
+        # As queries de uma requisição podem rodar em paralelo nas threads do banco
+        with self._lock:
+            self.total += 1
+            self.por_metodo[metodo] = self.por_metodo.get(metodo, 0) + 1
+
+
+def _escapar(valor: str) -> str:
+    return valor.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+# Instância compartilhada por todos os models
+metricas_queries = MetricasQueries()
+
+# Contagem da requisição em andamento, preenchida pelo ContagemQueriesMiddleware
+contagem_queries: contextvars.ContextVar[Optional[ContagemQueries]] = contextvars.ContextVar(
+    "contagem_queries", default=None
+)
@@ -0,0 +1,65 @@
+import json
+from decimal import Decimal
+from typing import Any, AsyncIterator, Dict, List
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, StreamingResponse
+from starlette.types import Receive, Scope, Send
+
+try:
+    import orjson
+except ImportError:  # orjson é opcional: sem ele a serialização padrão é usada
+    orjson = None
+
+
+def _padrao(valor: Any) -> Any:
+    """Converte os tipos que o orjson não serializa nativamente."""
+    if isinstance(valor, Decimal):
+        return int(valor) if valor == valor.to_integral_value() else float(valor)
+    if hasattr(valor, "dict"):
+        return valor.dict()
+    raise TypeError(f"Tipo não serializável: {type(valor).__name__}")
+
+
+class RespostaJSONRapida(JSONResponse):
+    """
+    Resposta JSON serializada com orjson, para as rotas de payload grande.
+    As rotas retornam a instância diretamente, o que dispensa a validação do
+    response_model pelo Pydantic (o modelo continua documentando a rota).
+    """
+
+    def render(self, content: Any) -> bytes:
+        if orjson is None:
+            return super().render(jsonable_encoder(content))
+        return orjson.dumps(content, default=_padrao, option=orjson.OPT_NON_STR_KEYS)
+
+
+async def linhas_ndjson(lotes: AsyncIterator[List[Dict]]) -> AsyncIterator[bytes]:
+    """Converte lotes de linhas em NDJSON (um objeto JSON por linha), um bloco por lote."""
+    try:
+        async for lote in lotes:
+            if orjson is not None:
+                yield b"".join(orjson.dumps(linha, default=_padrao) + b"\n" for linha in lote)
+            else:
+                yield "".join(json.dumps(jsonable_encoder(linha), ensure_ascii=False) + "\n" for linha in lote).encode()
+    finally:
+        await lotes.aclose()
+
+
+class RespostaNDJSON(StreamingResponse):
+    """
+    Exportação em NDJSON a partir de lotes de linhas. Ao terminar, inclusive
+    quando o cliente desconecta no meio, fecha a origem dos lotes, para que
+    o cursor no banco e a conexão do pool sejam liberados na hora.
+    """
+
+    media_type = "application/x-ndjson"
+
+    def __init__(self, lotes: AsyncIterator[List[Dict]], **kwargs: Any):
+        super().__init__(linhas_ndjson(lotes), **kwargs)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            await self.body_iterator.aclose()
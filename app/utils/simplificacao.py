@@ -0,0 +1,99 @@
+from typing import Dict, FrozenSet, List, Sequence, Tuple
+
+Ponto = Tuple[float, float]
+
+
+def douglas_peucker(pontos: Sequence[Ponto], tolerancia: float) -> List[Ponto]:
+    """Simplifica uma linha mantendo as extremidades (Douglas-Peucker iterativo)."""
+    if len(pontos) <= 2 or tolerancia <= 0:
+        return list(pontos)
+
+    tolerancia2 = tolerancia * tolerancia
+    manter = [False] * len(pontos)
+    manter[0] = manter[-1] = True
+    pilha = [(0, len(pontos) - 1)]
+    while pilha:
+        inicio, fim = pilha.pop()
+        (x1, y1), (x2, y2) = pontos[inicio], pontos[fim]
+        dx, dy = x2 - x1, y2 - y1
+        comprimento2 = dx * dx + dy * dy
+        maior, indice = -1.0, -1
+        for i in range(inicio + 1, fim):
+            px, py = pontos[i]
+            if comprimento2 == 0:
+                d2 = (px - x1) ** 2 + (py - y1) ** 2
+            else:
+                t = max(0.0, min(1.0, ((px - x1) * dx + (py - y1) * dy) / comprimento2))
+                d2 = (px - x1 - t * dx) ** 2 + (py - y1 - t * dy) ** 2
+            if d2 > maior:
+                maior, indice = d2, i
+        if indice != -1 and maior > tolerancia2:
+            manter[indice] = True
+            pilha.append((inicio, indice))
+            pilha.append((indice, fim))
+    return [ponto for ponto, fica in zip(pontos, manter) if fica]
+
+
+class SimplificadorTopologico:
+    """
+    Simplifica os polígonos de uma coleção preservando a topologia: cada anel é
+    dividido em arcos nos pontos onde muda o conjunto de feições vizinhas, e um
+    arco compartilhado por dois municípios é simplificado uma única vez. Assim
+    as divisas continuam idênticas dos dois lados, sem buracos nem sobreposições.
+    """
+
+    def __init__(self, poligonos: List[List[List[Ponto]]]):
+        # poligonos[i] = anéis da feição i (sem o ponto de fechamento repetido)
+        self.poligonos = poligonos
+        donos: Dict[Ponto, set] = {}
+        for indice, aneis in enumerate(poligonos):
+            for anel in aneis:
+                for ponto in anel:
+                    donos.setdefault(ponto, set()).add(indice)
+        self.donos: Dict[Ponto, FrozenSet[int]] = {ponto: frozenset(f) for ponto, f in donos.items()}
+
+    def _juncoes(self, anel: List[Ponto]) -> List[int]:
+        n = len(anel)
+        juncoes = [
+            i for i in range(n)
+            if self.donos[anel[i]] != self.donos[anel[i - 1]]
+            or self.donos[anel[i]] != self.donos[anel[(i + 1) % n]]
+        ]
+        # Anel sem junções (ilha ou enclave): o menor ponto é o mesmo para os dois lados
+        return juncoes or [min(range(n), key=lambda i: anel[i])]
+
+    def _simplificar_anel(self, anel: List[Ponto], tolerancia: float, arcos: Dict) -> List[Ponto]:
+        juncoes = self._juncoes(anel)
+        n = len(anel)
+        resultado: List[Ponto] = []
+        for posicao, inicio in enumerate(juncoes):
+            fim = juncoes[(posicao + 1) % len(juncoes)]
+            comprimento = (fim - inicio) % n or n
+            arco = tuple(anel[(inicio + k) % n] for k in range(comprimento + 1))
+            chave = min(arco, arco[::-1])
+            if chave not in arcos:
+                arcos[chave] = douglas_peucker(chave, tolerancia)
+            simplificado = arcos[chave] if chave == arco else arcos[chave][::-1]
+            resultado.extend(simplificado[:-1])
+        return resultado
+
+    def simplificar(self, tolerancia: float, casas: int = 6) -> List[List[List[List[float]]]]:
+        """Retorna os anéis simplificados (fechados) de cada feição, com coordenadas arredondadas."""
+        arcos: Dict[tuple, List[Ponto]] = {}
+        saida = []
+        for aneis in self.poligonos:
+            aneis_saida = []
+            for anel in aneis:
+                simplificado = self._simplificar_anel(anel, tolerancia, arcos)
+                if len(simplificado) < 3:
+                    # Anel pequeno demais para a tolerância: mantém o original
+                    simplificado = anel
+                coordenadas: List[List[float]] = []
+                for x, y in simplificado:
+                    ponto = [round(x, casas), round(y, casas)]
+                    if not coordenadas or coordenadas[-1] != ponto:
+                        coordenadas.append(ponto)
+                coordenadas.append(coordenadas[0])
+                aneis_saida.append(coordenadas)
+            saida.append(aneis_saida)
+        return saida
@@ -0,0 +1,47 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+
+
+def chave_hashable(valor: Any) -> Optional[Hashable]:
+    """Converte listas/tuplas de parâmetros em uma chave hashable, ou None se não for possível."""
+    if isinstance(valor, (list, tuple)):
+        itens = []
+        for item in valor:
+            chave = chave_hashable(item)
+            if chave is None and item is not None:
+                return None
+            itens.append(chave)
+        return tuple(itens)
+    try:
+        hash(valor)
+    except TypeError:
+        return None
+    return valor
+
+
+class SingleFlight:
+    """
+    Agrupa chamadas concorrentes idênticas: enquanto uma execução para a chave
+    estiver em andamento, as demais aguardam e recebem o mesmo resultado.
+    """
+
+    def __init__(self):
+        self._em_andamento: Dict[Hashable, asyncio.Future] = {}
+        self.compartilhadas = 0
+
+    async def executar(self, chave: Hashable, funcao: Callable[[], Awaitable[Any]]) -> Any:
+        futuro = self._em_andamento.get(chave)
+        if futuro is not None:
+            self.compartilhadas += 1
+            # shield: o cancelamento de um cliente não cancela a execução dos demais
+            return await asyncio.shield(futuro)
+
+        futuro = asyncio.ensure_future(funcao())
+        self._em_andamento[chave] = futuro
+
+        def remover(_):
+            if self._em_andamento.get(chave) is futuro:
+                del self._em_andamento[chave]
+
+        futuro.add_done_callback(remover)
+        return await asyncio.shield(futuro)
@@ -196,4 +196,29 @@ def gerar_padroes_busca_cidade(cidade: str) -> list:
         if padrao not in padroes_unicos:
             padroes_unicos.append(padrao)
     
-    return padroes_unicos 
\ No newline at end of file
+    return padroes_unicos 
+
+def gerar_chave_cidade(cidade: str) -> str:
+    """
+    Gera a chave canônica de uma cidade para o índice de resolução de nomes.
+    Remove acentos e pontuação e unifica as variações D'OESTE/DO OESTE/D OESTE,
+    DA PRAIA/D PRAIA e DE GOIAS/D GOIAS, de modo que todas as grafias de uma
+    mesma cidade produzam a mesma chave.
+    """
+    if not cidade:
+        return ""
+
+    cidade = remover_caracteres_especiais(cidade).upper().strip()
+
+    # Apóstrofos somem (D'OESTE -> DOESTE); demais pontuações viram espaço
+    cidade = re.sub(r"['`´’]", "", cidade)
+    cidade = re.sub(r'[^\w\s]', ' ', cidade)
+    cidade = re.sub(r'\s+', ' ', cidade).strip()
+
+    # DO OESTE, D OESTE e DOESTE -> DOESTE (idem para PRAIA e GOIAS)
+    cidade = re.sub(r'\bD[AEO]? ?(OESTE|PRAIA|GOIAS)\b', r'D\1', cidade)
+
+    # Grafias alternativas conhecidas
+    cidade = re.sub(r'\bPOXOREU\b', 'POXOREO', cidade)
+
+    return cidade
@@ -0,0 +1,115 @@
+"""
+Benchmark das contagens por cidade do CONEQ: compara a query montada por
+string (formato antigo: uma query para cautelas e outra para entregas, com
+texto diferente a cada lista de cidades) com o prepared statement de formato
+fixo usado pelo ConeqModel.
+
+Ao final, lê pg_prepared_statements para confirmar que o plano foi
+reaproveitado (generic_plans cresce a cada EXECUTE; requer PostgreSQL 14+).
+
+Uso (a partir da raiz do projeto, com as variáveis DB_* configuradas):
+    python -m benchmarks.bench_coneq_prepared --iteracoes 200 --cidades 20
+"""
+import argparse
+import asyncio
+import random
+import statistics
+import time
+
+from app.config.database import DatabaseConfig
+from app.models.base_model import BaseModel
+from app.models.coneq_model import ConeqModel
+from app.models.cidade_index import cidades_geral
+
+QUERY_ANTIGA = """
+    SELECT 
+        UPPER(c.cidade) AS nome_cidade, 
+        COUNT(DISTINCT e.id) AS qtd_cautelas
+    FROM coneq.equipamento e
+    JOIN coneq.termo_cautela tc ON tc.cod_cautela = e.termo_cautela_cod_cautela
+    JOIN geral.tb_policial p ON p.cod_policial = tc.recebedor
+    JOIN geral.tb_upm up ON up.cod_upm = p.cod_upm
+    JOIN geral.tb_cidade c ON c.cod_cidade = up.cod_cidade
+    WHERE UPPER(c.cidade) IN ({filtro})
+    AND tc.status_id IN (6, 7){extra}
+    GROUP BY UPPER(c.cidade)
+"""
+
+
+async def medir(funcao, iteracoes: int) -> list:
+    tempos = []
+    for _ in range(iteracoes):
+        inicio = time.perf_counter()
+        await funcao()
+        tempos.append((time.perf_counter() - inicio) * 1000)
+    return tempos
+
+
+def resumo(nome: str, tempos: list) -> None:
+    ordenados = sorted(tempos)
+    p95 = ordenados[int(len(ordenados) * 0.95) - 1]
+    print(f"{nome:<12} média={statistics.mean(tempos):8.2f}ms  p50={statistics.median(tempos):8.2f}ms  p95={p95:8.2f}ms")
+
+
+async def executar(iteracoes: int, quantidade: int) -> bool:
+    modelo = ConeqModel()
+    if not await cidades_geral.carregar():
+        print("Não foi possível carregar geral.tb_cidade")
+        return False
+    nomes = list(cidades_geral._nomes.values())
+    quantidade = min(quantidade, len(nomes))
+
+    async def antiga():
+        sorteio = random.sample(nomes, quantidade)
+        filtro = ",".join("'{}'".format(nome.upper().replace("'", "''")) for nome in sorteio)
+        await modelo.execute_query_async(QUERY_ANTIGA.format(filtro=filtro, extra=""))
+        await modelo.execute_query_async(QUERY_ANTIGA.format(filtro=filtro, extra=" AND e.status = 'ENTREGUE'"))
+
+    async def preparada():
+        await modelo.get_cautelas_entregas_por_cidade(random.sample(nomes, quantidade))
+
+    resumo("ad-hoc", await medir(antiga, iteracoes))
+    resumo("preparada", await medir(preparada, iteracoes))
+    return True
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iteracoes", type=int, default=200)
+    parser.add_argument("--cidades", type=int, default=20, help="cidades sorteadas por chamada")
+    args = parser.parse_args()
+
+    if not DatabaseConfig().init_pool():
+        return
+    if not asyncio.run(executar(args.iteracoes, args.cidades)):
+        return
+
+    # Os prepared statements são por sessão: soma o uso de planos de todas as conexões do pool
+    planos = {"generic_plans": 0, "custom_plans": 0, "conexoes": 0}
+    pool_conexoes = DatabaseConfig().get_pool()
+    for conn in list(pool_conexoes._pool):
+        if "coneq_cautelas_entregas_por_cidade" not in getattr(conn, "preparadas", ()):
+            continue
+        with conn.cursor() as cursor:
+            cursor.execute(
+                "SELECT generic_plans, custom_plans FROM pg_prepared_statements WHERE name = %s",
+                ("coneq_cautelas_entregas_por_cidade",),
+            )
+            linha = cursor.fetchone()
+        conn.rollback()
+        if linha:
+            planos["generic_plans"] += linha[0]
+            planos["custom_plans"] += linha[1]
+            planos["conexoes"] += 1
+    print(
+        f"coneq_cautelas_entregas_por_cidade: preparado em {planos['conexoes']} conexão(ões), "
+        f"{planos['generic_plans']} execuções com plano genérico (reaproveitado), "
+        f"{planos['custom_plans']} com plano customizado"
+    )
+
+    BaseModel.shutdown_executor()
+    DatabaseConfig.close_pool()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,332 @@
+"""
+Benchmark da API com o mix de requisições do dashboard: carrega app.main:app
+no próprio processo (com o lifespan, como no uvicorn), repete as chamadas que
+as páginas SGPM, CONEQ e o mapa fazem e informa vazão, latência p50/p99 e
+quantidade de queries por requisição.
+
+Duas fases:
+  1. perfil: cada rota uma vez com o cache de resultados vazio (frio) e outra
+     logo em seguida (quente), contando as idas ao banco de cada requisição;
+  2. carga: --concorrencia clientes sorteando rotas pelo peso do mix até
+     completar --requisicoes.
+
+Com --salvar o resultado vai para um JSON; com --comparar, o resultado atual é
+comparado a um JSON salvo antes e o processo termina com código 1 se p50, p99,
+vazão ou queries por requisição piorarem além de --tolerancia. Rotas que, com o
+cache frio, passam do orçamento declarado com @orcamento_queries também
+terminam o processo com código 1.
+
+Uso (a partir da raiz do projeto, com DB_* apontando para o banco sintético
+gerado por benchmarks.dados_sinteticos):
+    python -m benchmarks.bench_dashboard --requisicoes 2000 --concorrencia 16
+    python -m benchmarks.bench_dashboard --salvar base.json
+    python -m benchmarks.bench_dashboard --comparar base.json --tolerancia 0.2
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+from collections import defaultdict
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple
+from urllib.parse import quote, urlsplit
+
+from benchmarks.dados_sinteticos import nomes_cidades
+from app.utils.cache import cache_resultados
+from app.utils.metricas import metricas_queries
+
+# Cabeçalhos enviados pelo navegador em todas as chamadas do dashboard
+CABECALHOS = [(b"accept", b"application/json"), (b"accept-encoding", b"gzip, deflate, br")]
+
+
+class Rota(NamedTuple):
+    nome: str
+    peso: int
+    caminho: Callable[[random.Random], str]
+
+
+class ClienteASGI:
+    """Cliente HTTP mínimo que chama a aplicação ASGI diretamente, sem socket."""
+
+    def __init__(self, app):
+        self.app = app
+        self._lifespan: Optional[asyncio.Task] = None
+        self._entrada: asyncio.Queue = asyncio.Queue()
+        self._saida: asyncio.Queue = asyncio.Queue()
+
+    async def iniciar(self) -> None:
+        scope = {"type": "lifespan", "asgi": {"version": "3.0"}, "state": {}}
+        self._lifespan = asyncio.create_task(self.app(scope, self._entrada.get, self._saida.put))
+        await self._entrada.put({"type": "lifespan.startup"})
+        mensagem = await self._saida.get()
+        if mensagem["type"] != "lifespan.startup.complete":
+            raise RuntimeError(f"Falha na inicialização da aplicação: {mensagem.get('message')}")
+
+    async def encerrar(self) -> None:
+        await self._entrada.put({"type": "lifespan.shutdown"})
+        await self._saida.get()
+        await self._lifespan
+
+    async def get(self, caminho: str, comprimir: bool = True) -> Tuple[int, Dict[str, str], bytes]:
+        partes = urlsplit(caminho)
+        scope = {
+            "type": "http",
+            "asgi": {"version": "3.0"},
+            "http_version": "1.1",
+            "method": "GET",
+            "scheme": "http",
+            "path": partes.path,
+            "raw_path": partes.path.encode(),
+            "query_string": partes.query.encode(),
+            "headers": list(CABECALHOS) if comprimir else CABECALHOS[:1],
+            "client": ("127.0.0.1", 50000),
+            "server": ("127.0.0.1", 8000),
+        }
+        corpo = bytearray()
+        status = 0
+        cabecalhos: Dict[str, str] = {}
+        enviado = False
+
+        async def receive():
+            nonlocal enviado
+            if not enviado:
+                enviado = True
+                return {"type": "http.request", "body": b"", "more_body": False}
+            await asyncio.Event().wait()
+
+        async def send(mensagem):
+            nonlocal status
+            if mensagem["type"] == "http.response.start":
+                status = mensagem["status"]
+                cabecalhos.update((k.decode("latin-1"), v.decode("latin-1")) for k, v in mensagem["headers"])
+            elif mensagem["type"] == "http.response.body":
+                corpo.extend(mensagem.get("body", b""))
+
+        await self.app(scope, receive, send)
+        return status, cabecalhos, bytes(corpo)
+
+
+async def montar_mix(cliente: ClienteASGI) -> List[Rota]:
+    """
+    Rotas chamadas pelo dashboard, com pesos aproximados da frequência de uso:
+    a carga das páginas (referências, resumos, mapa) e as interações de filtro.
+    Os valores dos filtros vêm da própria API, como no frontend.
+    """
+    async def listar(caminho: str, campo: str) -> list:
+        status, _, corpo = await cliente.get(caminho, comprimir=False)
+        return [item[campo] for item in json.loads(corpo)] if status == 200 else []
+
+    comandos = await listar("/api/comandos_regionais", "cod_opm") or [0]
+    unidades = await listar("/api/unidades_sgpm", "cod_opm") or [0]
+    situacoes = await listar("/api/policiais_situacao", "situacao") or ["ATIVO"]
+    tipos = await listar("/api/policiais_tipo", "tipo") or ["POLICIAL MILITAR"]
+    cidades = [nome for _, nome in nomes_cidades()]
+    todas_cidades = quote(", ".join(cidades))
+
+    def filtros_avancados(rng: random.Random) -> str:
+        filtros = {
+            "sexo": rng.choice(["M", "F"]),
+            "situacao": rng.choice(situacoes),
+            "tipo": rng.choice(tipos),
+            "comando_regional": rng.choice(comandos),
+            "unidade": rng.choice(unidades),
+        }
+        escolhidos = rng.sample(list(filtros), rng.randint(1, 3))
+        return "&".join(f"{k}={quote(str(filtros[k]))}" for k in escolhidos)
+
+    return [
+        # Página SGPM
+        Rota("resumo_sgpm", 10, lambda rng: "/api/resumo_sgpm"),
+        Rota("comandos_regionais", 6, lambda rng: "/api/comandos_regionais"),
+        Rota("unidades_sgpm", 6, lambda rng: "/api/unidades_sgpm"),
+        Rota("postos_graduacao_sgpm", 6, lambda rng: "/api/postos_graduacao_sgpm"),
+        Rota("totais-por-cr", 4, lambda rng: "/api/totais-por-cr"),
+        Rota("contar_sexo_por_cidade", 6, lambda rng: f"/api/contar_sexo_por_cidade?cidades={todas_cidades}"),
+        Rota("policiais_filtro_avancado", 14, lambda rng: f"/api/policiais_filtro_avancado?{filtros_avancados(rng)}"),
+        # Páginas da lista do filtro avançado, a partir de um ponto qualquer (keyset)
+        Rota("policiais_filtro_avancado/dados", 4, lambda rng: f"/api/policiais_filtro_avancado/dados?"
+                                                               f"{filtros_avancados(rng)}&apos={rng.randint(0, 10000)}"),
+        Rota("dados_posto_grad", 6, lambda rng: f"/api/dados_posto_grad?sexo={rng.choice(['M', 'F'])}"
+                                                f"&situacao={quote(rng.choice(situacoes))}"),
+        Rota("unidades_por_comando", 5, lambda rng: f"/api/unidades_por_comando?comando_id={rng.choice(comandos)}"),
+        Rota("contar_sexo_por_unidade", 5, lambda rng: f"/api/contar_sexo_por_unidade?cidade={quote(rng.choice(cidades))}"),
+        # Página CONEQ
+        Rota("resumo_tipos_equipamento", 8, lambda rng: "/api/resumo_tipos_equipamento"),
+        Rota("estoque", 6, lambda rng: "/api/estoque"),
+        Rota("estoque_geral", 6, lambda rng: "/api/estoque_geral"),
+        Rota("cautelas_entregas_por_cidade", 6,
+             lambda rng: f"/api/cautelas_entregas_por_cidade?cidades={todas_cidades}"),
+        Rota("TipoEquipamentos", 2, lambda rng: "/api/TipoEquipamentos"),
+        # Mapa
+        Rota("geo_municipios", 4, lambda rng: f"/api/geo/municipios?zoom={rng.choice([5, 6, 7, 8, 9])}"),
+    ]
+
+
+async def perfilar(cliente: ClienteASGI, mix: List[Rota], rng: random.Random) -> Dict[str, Dict]:
+    """
+    Queries por requisição de cada rota, com o cache de resultados frio e
+    quente, e o orçamento declarado com @orcamento_queries (se houver).
+    """
+    perfil = {}
+    for rota in mix:
+        cache_resultados.invalidar()
+        caminho = rota.caminho(rng)
+        status, cabecalhos, _ = await cliente.get(caminho)
+        frio = int(cabecalhos.get("x-db-queries", 0))
+        _, cabecalhos, _ = await cliente.get(caminho)
+        quente = int(cabecalhos.get("x-db-queries", 0))
+        orcamento = cabecalhos.get("x-db-queries-orcamento")
+        perfil[rota.nome] = {
+            "status": status,
+            "queries_frio": frio,
+            "queries_quente": quente,
+            "orcamento": int(orcamento) if orcamento is not None else None,
+        }
+    return perfil
+
+
+def orcamentos_excedidos(perfil: Dict[str, Dict]) -> List[str]:
+    return [
+        f"{nome}: {dados['queries_frio']} queries (orçamento {dados['orcamento']})"
+        for nome, dados in perfil.items()
+        if dados["orcamento"] is not None and dados["queries_frio"] > dados["orcamento"]
+    ]
+
+
+async def carregar(cliente: ClienteASGI, mix: List[Rota], requisicoes: int,
+                   concorrencia: int, rng: random.Random) -> Dict:
+    """Dispara o mix com `concorrencia` clientes e devolve latências e vazão."""
+    pesos = [rota.peso for rota in mix]
+    sorteio = rng.choices(mix, weights=pesos, k=requisicoes)
+    caminhos = [(rota.nome, rota.caminho(rng)) for rota in sorteio]
+    latencias: Dict[str, List[float]] = defaultdict(list)
+    erros: Dict[str, int] = defaultdict(int)
+    proxima = 0
+
+    async def trabalhador() -> None:
+        nonlocal proxima
+        while proxima < len(caminhos):
+            nome, caminho = caminhos[proxima]
+            proxima += 1
+            inicio = time.perf_counter()
+            status, _, _ = await cliente.get(caminho)
+            latencias[nome].append((time.perf_counter() - inicio) * 1000)
+            if status >= 400:
+                erros[nome] += 1
+
+    antes = metricas_queries.total_execucoes()
+    inicio = time.perf_counter()
+    await asyncio.gather(*(trabalhador() for _ in range(concorrencia)))
+    duracao = time.perf_counter() - inicio
+    queries = metricas_queries.total_execucoes() - antes
+
+    todas = [valor for valores in latencias.values() for valor in valores]
+    return {
+        "requisicoes": len(todas),
+        "duracao_s": round(duracao, 3),
+        "vazao_rps": round(len(todas) / duracao, 1),
+        "p50_ms": round(percentil(todas, 0.50), 2),
+        "p99_ms": round(percentil(todas, 0.99), 2),
+        "queries_por_requisicao": round(queries / max(len(todas), 1), 3),
+        "rotas": {
+            nome: {
+                "n": len(valores),
+                "erros": erros[nome],
+                "p50_ms": round(percentil(valores, 0.50), 2),
+                "p99_ms": round(percentil(valores, 0.99), 2),
+            }
+            for nome, valores in sorted(latencias.items())
+        },
+    }
+
+
+def percentil(valores: List[float], q: float) -> float:
+    if not valores:
+        return 0.0
+    ordenados = sorted(valores)
+    return ordenados[min(len(ordenados) - 1, int(q * len(ordenados)))]
+
+
+def imprimir(perfil: Dict, carga: Dict) -> None:
+    print(f"\n{'rota':<30} {'n':>6} {'erros':>6} {'p50 ms':>9} {'p99 ms':>9} {'q frio':>7} {'q quente':>9} {'orçam.':>7}")
+    for nome, dados in carga["rotas"].items():
+        p = perfil.get(nome, {})
+        orcamento = "-" if p.get("orcamento") is None else p["orcamento"]
+        print(f"{nome:<30} {dados['n']:>6} {dados['erros']:>6} {dados['p50_ms']:>9.2f} {dados['p99_ms']:>9.2f} "
+              f"{p.get('queries_frio', 0):>7} {p.get('queries_quente', 0):>9} {orcamento:>7}")
+    print(f"\n{carga['requisicoes']} requisições em {carga['duracao_s']}s: {carga['vazao_rps']} req/s  "
+          f"p50={carga['p50_ms']}ms  p99={carga['p99_ms']}ms  "
+          f"queries/requisição={carga['queries_por_requisicao']}")
+
+
+def comparar(base: Dict, atual: Dict, tolerancia: float) -> List[str]:
+    """Lista as métricas que pioraram além da tolerância em relação à base."""
+    regressoes = []
+    for chave in ("p50_ms", "p99_ms", "queries_por_requisicao"):
+        if base[chave] and atual[chave] > base[chave] * (1 + tolerancia):
+            regressoes.append(f"{chave}: {base[chave]} -> {atual[chave]}")
+    if atual["vazao_rps"] < base["vazao_rps"] * (1 - tolerancia):
+        regressoes.append(f"vazao_rps: {base['vazao_rps']} -> {atual['vazao_rps']}")
+    for nome, dados in atual.get("perfil", {}).items():
+        anterior = base.get("perfil", {}).get(nome)
+        if anterior and dados["queries_frio"] > anterior["queries_frio"]:
+            regressoes.append(f"{nome} queries_frio: {anterior['queries_frio']} -> {dados['queries_frio']}")
+    return regressoes
+
+
+async def executar(args) -> int:
+    # Contagem de queries por requisição (cabeçalho X-DB-Queries) e orçamentos por rota
+    os.environ.setdefault("DB_CONTAR_QUERIES", "true")
+    from app.main import app
+
+    rng = random.Random(args.semente)
+    cliente = ClienteASGI(app)
+    await cliente.iniciar()
+    try:
+        mix = await montar_mix(cliente)
+        perfil = await perfilar(cliente, mix, rng)
+        # Aquecimento: popula caches e estabiliza o pool antes da medição
+        await carregar(cliente, mix, min(args.requisicoes, 200), args.concorrencia, rng)
+        carga = await carregar(cliente, mix, args.requisicoes, args.concorrencia, rng)
+    finally:
+        await cliente.encerrar()
+
+    imprimir(perfil, carga)
+    resultado = dict(carga, perfil=perfil, concorrencia=args.concorrencia)
+    codigo = 0
+    excedidos = orcamentos_excedidos(perfil)
+    if excedidos:
+        print("\nRotas acima do orçamento de queries:")
+        for excedido in excedidos:
+            print("  -", excedido)
+        codigo = 1
+    if args.salvar:
+        with open(args.salvar, "w", encoding="utf-8") as arquivo:
+            json.dump(resultado, arquivo, ensure_ascii=False, indent=2)
+    if args.comparar:
+        with open(args.comparar, encoding="utf-8") as arquivo:
+            regressoes = comparar(json.load(arquivo), resultado, args.tolerancia)
+        if regressoes:
+            print("\nRegressões em relação a", args.comparar)
+            for regressao in regressoes:
+                print("  -", regressao)
+            return 1
+        print(f"\nSem regressões em relação a {args.comparar} (tolerância {args.tolerancia:.0%})")
+    return codigo
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requisicoes", type=int, default=2000)
+    parser.add_argument("--concorrencia", type=int, default=16)
+    parser.add_argument("--semente", type=int, default=42)
+    parser.add_argument("--salvar", help="grava o resultado em JSON")
+    parser.add_argument("--comparar", help="JSON de uma execução anterior usado como base")
+    parser.add_argument("--tolerancia", type=float, default=0.2, help="piora aceita (0.2 = 20%%)")
+    sys.exit(asyncio.run(executar(parser.parse_args())))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+Benchmark da serialização e compressão das respostas grandes.
+
+Compara, com payloads sintéticos no formato de /api/unidades_sgpm e das rotas
+de lote por cidade:
+  - antes: validação do response_model (Pydantic v1) + jsonable_encoder + JSONResponse
+  - depois: RespostaJSONRapida (orjson), sem validação
+e os bytes trafegados sem compressão, com gzip e com brotli (se instalado).
+
+Não precisa de banco. Uso (a partir da raiz do projeto):
+    python -m benchmarks.bench_serializacao --unidades 3000 --cidades 141
+"""
+import argparse
+import statistics
+import time
+from typing import Callable, List
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from pydantic import parse_obj_as
+
+from app.middleware.compressao import CompressaoMiddleware, brotli
+from app.models.schemas import CautelaEntregaCidade, Unidade
+from app.utils.respostas import RespostaJSONRapida
+
+
+def medir(funcao: Callable[[], bytes], repeticoes: int) -> float:
+    """Mediana, em milissegundos, do tempo de serialização."""
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        funcao()
+        tempos.append((time.perf_counter() - inicio) * 1000)
+    return statistics.median(tempos)
+
+
+def comparar(nome: str, dados: list, modelo, repeticoes: int) -> None:
+    def antes() -> bytes:
+        validado = parse_obj_as(List[modelo], dados)
+        return JSONResponse(jsonable_encoder(validado)).body
+
+    def depois() -> bytes:
+        return RespostaJSONRapida(dados).body
+
+    assert antes() == depois(), f"{nome}: corpos diferentes entre as serializações"
+    corpo = depois()
+
+    print(f"\n{nome} ({len(dados)} itens)")
+    print(f"  serialização  antes={medir(antes, repeticoes):8.2f}ms  depois={medir(depois, repeticoes):8.2f}ms")
+
+    compressao = CompressaoMiddleware(None, minimo=0)
+    tamanhos = [f"identidade={len(corpo)}B", f"gzip={len(compressao.comprimir(corpo, 'gzip'))}B"]
+    if brotli is not None:
+        tamanhos.append(f"br={len(compressao.comprimir(corpo, 'br'))}B")
+    print("  bytes         " + "  ".join(tamanhos))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--unidades", type=int, default=3000)
+    parser.add_argument("--cidades", type=int, default=141)
+    parser.add_argument("--repeticoes", type=int, default=50)
+    args = parser.parse_args()
+
+    unidades = [
+        {"cod_opm": cod, "opm": f"{cod}º BATALHÃO DE POLÍCIA MILITAR - CIA {cod % 7}"}
+        for cod in range(1, args.unidades + 1)
+    ]
+    cidades = [
+        {"nome_cidade": f"MUNICIPIO {indice}", "qtd_cautelas": indice * 3, "qtd_entregas": indice * 2}
+        for indice in range(args.cidades)
+    ]
+
+    comparar("/api/unidades_sgpm", unidades, Unidade, args.repeticoes)
+    comparar("/api/cautelas_entregas_por_cidade", cidades, CautelaEntregaCidade, args.repeticoes)
+
+
+if __name__ == "__main__":
+    main()
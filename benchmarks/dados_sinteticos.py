@@ -0,0 +1,311 @@
+"""
+Gerador de um banco PMMT sintético para os benchmarks: cria os schemas sgpm,
+geral e coneq com as tabelas e colunas consultadas pelos models e os popula
+com volumes próximos aos de produção (10k+ policiais, hierarquia de OPMs com
+5 níveis, as 141 cidades de MT e dezenas de milhares de equipamentos e
+termos de cautela). Os dados são determinísticos para uma mesma --semente.
+
+Use um PostgreSQL local e descartável: o gerador apaga e recria os schemas.
+Por segurança, o nome do banco configurado em DB_NAME precisa ser repetido em
+--banco, e o banco padrão de produção (PMMT) é recusado.
+
+Uso (a partir da raiz do projeto):
+    createdb pmmt_bench
+    DB_HOST=localhost DB_NAME=pmmt_bench DB_USER=postgres DB_PASSWORD=... \\
+        python -m benchmarks.dados_sinteticos --banco pmmt_bench
+"""
+import argparse
+import io
+import json
+import random
+import sys
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, Sequence, Tuple
+
+from app.config.database import DatabaseConfig
+
+ARQUIVO_GEO = Path(__file__).resolve().parents[1] / "src" / "data" / "geo-MT.json"
+
+DDL = """
+DROP SCHEMA IF EXISTS sgpm CASCADE;
+DROP SCHEMA IF EXISTS geral CASCADE;
+DROP SCHEMA IF EXISTS coneq CASCADE;
+CREATE SCHEMA sgpm;
+CREATE SCHEMA geral;
+CREATE SCHEMA coneq;
+
+CREATE TABLE sgpm.cidade (
+    cod_cidade integer PRIMARY KEY,
+    nome_cidade varchar(100) NOT NULL
+);
+CREATE TABLE sgpm.posto_grad (
+    cod_posto_grad integer PRIMARY KEY,
+    posto_grad varchar(60) NOT NULL,
+    posto_grad_abrev varchar(20) NOT NULL,
+    ordem integer NOT NULL
+);
+CREATE TABLE sgpm.policial_situacao (
+    cod_policial_situacao integer PRIMARY KEY,
+    situacao varchar(60) NOT NULL
+);
+CREATE TABLE sgpm.policial_tipo (
+    cod_policial_tipo integer PRIMARY KEY,
+    policial_tipo varchar(60) NOT NULL
+);
+CREATE TABLE sgpm.opm (
+    cod_opm integer PRIMARY KEY,
+    opm varchar(120) NOT NULL,
+    subordinacao integer,
+    grande_comando char(1) NOT NULL DEFAULT 'N',
+    cod_cidade integer REFERENCES sgpm.cidade (cod_cidade)
+);
+CREATE TABLE sgpm.policial (
+    cod_policial integer PRIMARY KEY,
+    sexo char(1) NOT NULL,
+    cod_policial_situacao integer REFERENCES sgpm.policial_situacao (cod_policial_situacao),
+    cod_policial_tipo integer REFERENCES sgpm.policial_tipo (cod_policial_tipo),
+    cod_posto_grad integer REFERENCES sgpm.posto_grad (cod_posto_grad),
+    cod_opm_lotacao integer REFERENCES sgpm.opm (cod_opm),
+    cod_opm integer REFERENCES sgpm.opm (cod_opm),
+    cod_opm_destino integer REFERENCES sgpm.opm (cod_opm)
+);
+
+CREATE TABLE geral.tb_cidade (
+    cod_cidade integer PRIMARY KEY,
+    cidade varchar(100) NOT NULL
+);
+CREATE TABLE geral.tb_upm (
+    cod_upm integer PRIMARY KEY,
+    cod_cidade integer REFERENCES geral.tb_cidade (cod_cidade)
+);
+CREATE TABLE geral.tb_policial (
+    cod_policial integer PRIMARY KEY,
+    cod_upm integer REFERENCES geral.tb_upm (cod_upm)
+);
+
+CREATE TABLE coneq.tipo_equipamento (
+    id integer PRIMARY KEY,
+    nome varchar(80) NOT NULL
+);
+CREATE TABLE coneq.termo_cautela (
+    cod_cautela integer PRIMARY KEY,
+    status_id integer NOT NULL,
+    recebedor integer REFERENCES geral.tb_policial (cod_policial)
+);
+CREATE TABLE coneq.termo_descautela (
+    cod_descautela integer PRIMARY KEY,
+    cod_cautela integer REFERENCES coneq.termo_cautela (cod_cautela)
+);
+CREATE TABLE coneq.equipamento (
+    id integer PRIMARY KEY,
+    tipo_equipamento_id integer REFERENCES coneq.tipo_equipamento (id),
+    status varchar(40) NOT NULL,
+    termo_cautela_cod_cautela integer REFERENCES coneq.termo_cautela (cod_cautela)
+);
+"""
+
+# Índices das colunas usadas em JOIN/WHERE pelos models (criados após a carga)
+INDICES = """
+CREATE INDEX ON sgpm.opm (subordinacao);
+CREATE INDEX ON sgpm.opm (cod_cidade);
+CREATE INDEX ON sgpm.policial (cod_opm_lotacao);
+CREATE INDEX ON sgpm.policial (cod_opm);
+CREATE INDEX ON sgpm.policial (cod_opm_destino);
+CREATE INDEX ON geral.tb_upm (cod_cidade);
+CREATE INDEX ON geral.tb_policial (cod_upm);
+CREATE INDEX ON coneq.termo_cautela (recebedor);
+CREATE INDEX ON coneq.equipamento (tipo_equipamento_id);
+CREATE INDEX ON coneq.equipamento (termo_cautela_cod_cautela);
+"""
+
+# (posto/graduação, abreviação, peso no efetivo)
+POSTOS = [
+    ("CORONEL PM", "CEL PM", 1),
+    ("TENENTE CORONEL PM", "TEN CEL PM", 2),
+    ("MAJOR PM", "MAJ PM", 4),
+    ("CAPITÃO PM", "CAP PM", 8),
+    ("1º TENENTE PM", "1º TEN PM", 10),
+    ("2º TENENTE PM", "2º TEN PM", 10),
+    ("ASPIRANTE A OFICIAL PM", "ASP OF PM", 2),
+    ("SUBTENENTE PM", "ST PM", 15),
+    ("1º SARGENTO PM", "1º SGT PM", 30),
+    ("2º SARGENTO PM", "2º SGT PM", 45),
+    ("3º SARGENTO PM", "3º SGT PM", 80),
+    ("CABO PM", "CB PM", 180),
+    ("SOLDADO PM", "SD PM", 420),
+]
+SITUACOES = [("ATIVO", 84), ("FÉRIAS", 6), ("LICENÇA", 3), ("AGREGADO", 2), ("RESERVA REMUNERADA", 4), ("REFORMADO", 1)]
+TIPOS_POLICIAL = [("POLICIAL MILITAR", 93), ("SERVIDOR CIVIL", 4), ("ALUNO", 3)]
+TIPOS_EQUIPAMENTO = [
+    "PISTOLA .40", "FUZIL 5.56", "CARABINA .40", "ESPINGARDA CAL 12", "COLETE BALÍSTICO",
+    "ALGEMA", "RÁDIO HT", "ARMA DE INCAPACITAÇÃO NEUROMUSCULAR", "CAPACETE", "ESCUDO",
+]
+STATUS_EQUIPAMENTO = [("EM ESTOQUE", 22), ("SEPARADO PARA ENTREGA", 6), ("ENTREGUE", 58), ("EM MANUTENÇÃO", 9), ("BAIXADO", 5)]
+# Status de termo de cautela: 6-9 são os consultados pelo dashboard
+STATUS_CAUTELA = [(1, 3), (5, 4), (6, 10), (7, 55), (8, 18), (9, 6), (10, 4)]
+# Filhos por nível abaixo de cada comando regional: batalhões, companhias, pelotões, destacamentos
+RAMIFICACAO = [(3, 6), (2, 4), (1, 3), (0, 2)]
+NIVEIS = ["BPM", "CIA", "PEL", "DESTACAMENTO"]
+
+
+def _sortear(rng: random.Random, opcoes: Sequence[Tuple], k: int) -> List:
+    valores, pesos = zip(*opcoes)
+    return rng.choices(valores, weights=pesos, k=k)
+
+
+def _copiar(cursor, tabela: str, colunas: Sequence[str], linhas: Iterable[Sequence]) -> int:
+    """Carrega as linhas com COPY ... FROM STDIN (muito mais rápido que INSERTs)."""
+    buffer = io.StringIO()
+    total = 0
+    for linha in linhas:
+        buffer.write("\t".join(r"\N" if valor is None else str(valor) for valor in linha))
+        buffer.write("\n")
+        total += 1
+    buffer.seek(0)
+    cursor.copy_expert(f"COPY {tabela} ({', '.join(colunas)}) FROM STDIN", buffer)
+    return total
+
+
+def nomes_cidades() -> List[Tuple[int, str]]:
+    """Código IBGE e nome das 141 cidades da malha municipal de MT."""
+    with open(ARQUIVO_GEO, encoding="utf-8") as arquivo:
+        features = json.load(arquivo)["features"]
+    return [(int(f["properties"]["id"]), f["properties"]["name"]) for f in features]
+
+
+def gerar_opms(rng: random.Random, cidades: List[int], comandos: int) -> List[Tuple]:
+    """Hierarquia PMMT > comandos regionais > BPM > CIA > PEL > destacamentos."""
+    opms = [(1, "COMANDO GERAL PMMT", None, "N", cidades[0])]
+    proximo = 2
+    for numero_cr in range(1, comandos + 1):
+        cidade_cr = rng.choice(cidades)
+        cod_cr = proximo
+        proximo += 1
+        opms.append((cod_cr, f"CR {numero_cr}", 1, "S", cidade_cr))
+        nivel_atual = [(cod_cr, cidade_cr, f"CR {numero_cr}")]
+        for profundidade, (minimo, maximo) in enumerate(RAMIFICACAO):
+            proximo_nivel = []
+            for pai, cidade_pai, nome_pai in nivel_atual:
+                for ordem in range(1, rng.randint(minimo, maximo) + 1):
+                    # Unidades mais baixas tendem a ficar em outras cidades da região
+                    cidade = cidade_pai if rng.random() < 0.4 else rng.choice(cidades)
+                    nome = f"{ordem}º {NIVEIS[profundidade]} - {nome_pai}"
+                    opms.append((proximo, nome[:120], pai, "N", cidade))
+                    proximo_nivel.append((proximo, cidade, f"{ordem}º {NIVEIS[profundidade]}"))
+                    proximo += 1
+            nivel_atual = proximo_nivel
+    return opms
+
+
+def popular(conn, semente: int, policiais: int, equipamentos: int, cautelas: int, comandos: int) -> Dict[str, int]:
+    rng = random.Random(semente)
+    contagens: Dict[str, int] = {}
+    cidades = nomes_cidades()
+    codigos_cidade = [cod for cod, _ in cidades]
+
+    with conn.cursor() as cursor:
+        cursor.execute(DDL)
+
+        # sgpm: nomes em maiúsculas; geral: grafia original da malha
+        contagens["sgpm.cidade"] = _copiar(cursor, "sgpm.cidade", ["cod_cidade", "nome_cidade"],
+                                           ((cod, nome.upper()) for cod, nome in cidades))
+        contagens["geral.tb_cidade"] = _copiar(cursor, "geral.tb_cidade", ["cod_cidade", "cidade"], cidades)
+        _copiar(cursor, "sgpm.posto_grad", ["cod_posto_grad", "posto_grad", "posto_grad_abrev", "ordem"],
+                ((i, nome, abrev, i) for i, (nome, abrev, _) in enumerate(POSTOS, start=1)))
+        _copiar(cursor, "sgpm.policial_situacao", ["cod_policial_situacao", "situacao"],
+                ((i, nome) for i, (nome, _) in enumerate(SITUACOES, start=1)))
+        _copiar(cursor, "sgpm.policial_tipo", ["cod_policial_tipo", "policial_tipo"],
+                ((i, nome) for i, (nome, _) in enumerate(TIPOS_POLICIAL, start=1)))
+
+        opms = gerar_opms(rng, codigos_cidade, comandos)
+        contagens["sgpm.opm"] = _copiar(cursor, "sgpm.opm",
+                                        ["cod_opm", "opm", "subordinacao", "grande_comando", "cod_cidade"], opms)
+
+        # Efetivo concentrado nas unidades operacionais (níveis mais baixos)
+        cod_opms = [opm[0] for opm in opms if opm[3] == "N" and opm[2] is not None]
+        cidade_opm = {opm[0]: opm[4] for opm in opms}
+        postos = _sortear(rng, [(i, peso) for i, (_, _, peso) in enumerate(POSTOS, start=1)], policiais)
+        situacoes = _sortear(rng, [(i, peso) for i, (_, peso) in enumerate(SITUACOES, start=1)], policiais)
+        tipos = _sortear(rng, [(i, peso) for i, (_, peso) in enumerate(TIPOS_POLICIAL, start=1)], policiais)
+        lotacoes = [rng.choice(cod_opms) for _ in range(policiais)]
+        linhas_policial = []
+        for i in range(policiais):
+            lotacao = lotacoes[i]
+            destino = lotacao if rng.random() < 0.9 else rng.choice(cod_opms)
+            linhas_policial.append((
+                i + 1, "F" if rng.random() < 0.14 else "M", situacoes[i], tipos[i], postos[i],
+                lotacao, lotacao, destino
+            ))
+        contagens["sgpm.policial"] = _copiar(
+            cursor, "sgpm.policial",
+            ["cod_policial", "sexo", "cod_policial_situacao", "cod_policial_tipo", "cod_posto_grad",
+             "cod_opm_lotacao", "cod_opm", "cod_opm_destino"],
+            linhas_policial
+        )
+
+        # geral: uma UPM por OPM, na mesma cidade; o mesmo efetivo do sgpm
+        contagens["geral.tb_upm"] = _copiar(cursor, "geral.tb_upm", ["cod_upm", "cod_cidade"],
+                                            ((cod, cidade_opm[cod]) for cod, *_ in opms))
+        _copiar(cursor, "geral.tb_policial", ["cod_policial", "cod_upm"],
+                ((i + 1, lotacoes[i]) for i in range(policiais)))
+
+        _copiar(cursor, "coneq.tipo_equipamento", ["id", "nome"], enumerate(TIPOS_EQUIPAMENTO, start=1))
+        status_cautela = _sortear(rng, STATUS_CAUTELA, cautelas)
+        contagens["coneq.termo_cautela"] = _copiar(
+            cursor, "coneq.termo_cautela", ["cod_cautela", "status_id", "recebedor"],
+            ((i + 1, status_cautela[i], rng.randint(1, policiais)) for i in range(cautelas))
+        )
+        descautelas = rng.sample(range(1, cautelas + 1), cautelas // 4)
+        contagens["coneq.termo_descautela"] = _copiar(
+            cursor, "coneq.termo_descautela", ["cod_descautela", "cod_cautela"],
+            ((i + 1, cod) for i, cod in enumerate(descautelas))
+        )
+        status_equipamento = _sortear(rng, STATUS_EQUIPAMENTO, equipamentos)
+        pesos_tipo = [rng.randint(1, 10) for _ in TIPOS_EQUIPAMENTO]
+        tipos_equipamento = rng.choices(range(1, len(TIPOS_EQUIPAMENTO) + 1), weights=pesos_tipo, k=equipamentos)
+        contagens["coneq.equipamento"] = _copiar(
+            cursor, "coneq.equipamento", ["id", "tipo_equipamento_id", "status", "termo_cautela_cod_cautela"],
+            (
+                (i + 1, tipos_equipamento[i], status_equipamento[i],
+                 rng.randint(1, cautelas) if status_equipamento[i] in ("ENTREGUE", "SEPARADO PARA ENTREGA") else None)
+                for i in range(equipamentos)
+            )
+        )
+
+        cursor.execute(INDICES)
+        cursor.execute("ANALYZE")
+    conn.commit()
+    return contagens
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--banco", required=True, help="nome do banco de destino (deve coincidir com DB_NAME)")
+    parser.add_argument("--semente", type=int, default=42)
+    parser.add_argument("--policiais", type=int, default=12000)
+    parser.add_argument("--equipamentos", type=int, default=40000)
+    parser.add_argument("--cautelas", type=int, default=25000)
+    parser.add_argument("--comandos", type=int, default=15, help="comandos regionais (grande_comando = 'S')")
+    args = parser.parse_args()
+
+    config = DatabaseConfig()
+    if args.banco != config.database or config.database.upper() == "PMMT":
+        print(f"Banco configurado em DB_NAME ({config.database}) não confere com --banco ou é o de produção")
+        sys.exit(1)
+
+    conn = config.get_connection()
+    if conn is None:
+        sys.exit(1)
+    inicio = time.perf_counter()
+    try:
+        contagens = popular(conn, args.semente, args.policiais, args.equipamentos, args.cautelas, args.comandos)
+    finally:
+        conn.close()
+    for tabela, total in contagens.items():
+        print(f"{tabela:<24} {total:>8}")
+    print(f"Banco sintético gerado em {time.perf_counter() - inicio:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+# ===========================================
+# Dashboard PMMT - Perfil de produção (gunicorn + workers uvicorn)
+# ===========================================
+# Uso: gunicorn -c gunicorn.conf.py app.main:app
+
+import glob
+import multiprocessing
+import os
+import tempfile
+
+bind = f"{os.getenv('API_HOST', '0.0.0.0')}:{os.getenv('API_PORT', '8000')}"
+
+workers = int(os.getenv("API_WORKERS") or multiprocessing.cpu_count())
+# Lido pelo DatabaseConfig para dividir DB_CONEXOES_MAX entre os workers
+os.environ["API_WORKERS"] = str(workers)
+worker_class = "uvicorn.workers.UvicornWorker"
+
+# Cada worker grava as métricas das queries aqui; o GET /metrics de qualquer um deles soma todas
+os.environ.setdefault("METRICAS_DIR", os.path.join(tempfile.gettempdir(), "pmmt_metricas"))
+
+# Importa a aplicação no mestre: os workers nascem com os módulos e os índices já carregados
+preload_app = True
+
+# Reciclagem gradual dos workers; o jitter evita que todos reiniciem ao mesmo tempo
+max_requests = int(os.getenv("API_MAX_REQUESTS", "5000"))
+max_requests_jitter = int(os.getenv("API_MAX_REQUESTS_JITTER", "500"))
+graceful_timeout = int(os.getenv("API_GRACEFUL_TIMEOUT", "30"))
+timeout = 60
+keepalive = 5
+
+loglevel = os.getenv("API_LOG_LEVEL", "info")
+accesslog = "-"
+
+
+def on_starting(server):
+    # Arquivos de uma execução anterior (pids reaproveitados) não podem entrar na soma
+    diretorio = os.environ["METRICAS_DIR"]
+    os.makedirs(diretorio, exist_ok=True)
+    for arquivo in glob.glob(os.path.join(diretorio, "*.json*")):
+        os.remove(arquivo)
+
+
+def when_ready(server):
+    # Carrega índices e snapshots uma vez no mestre, antes do fork dos workers
+    from app.main import aquecer_antes_do_fork
+
+    aquecer_antes_do_fork()
+
+
+def post_fork(server, worker):
+    # A thread de escrita dos logs (LOG_ASSINCRONO) não sobrevive ao fork
+    from app.utils.logs import configurar_logs
+    from app.utils.metricas import metricas_queries
+
+    configurar_logs()
+    # As queries do aquecimento no mestre não entram nas métricas de cada worker
+    metricas_queries.reiniciar()
+
+
+def child_exit(server, worker):
+    # Os contadores do worker encerrado continuam na soma exportada pelo /metrics
+    from app.utils.metricas import metricas_queries
+
+    metricas_queries.consolidar_encerrado(worker.pid)
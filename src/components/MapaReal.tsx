@@ -1,13 +1,16 @@
-import React, { useState } from 'react';
+import React, { useEffect, useState } from 'react';
 import { MapContainer, TileLayer, GeoJSON, Marker, Tooltip } from 'react-leaflet';
 import { Icon, Layer } from 'leaflet';
 import 'leaflet/dist/leaflet.css';
 import gruposDeMunicipios from '../data/grupodeMunicipios';
 import icone from '../assets/policial-icon.svg';
-import geoDataMT from '../data/geo-MT.json';
 import { MapComponentProps, GeoFeature, GeoData, GruposDeMunicipios, Cidade } from '../types/map';
 import { normalizarString } from '../utils/stringUtils';
 
+// Malha municipal simplificada e pré-comprimida pelo backend
+const GEO_URL = 'http://172.16.10.54:8000/api/geo/municipios';
+const colecaoVazia: GeoData = { type: 'FeatureCollection', features: [] };
+
 const pinIcon = new Icon({
   iconUrl: icone,
   iconSize: [60, 60],
@@ -65,7 +68,30 @@ const MapComponent: React.FC<MapComponentProps> = ({
   onGroupChange, 
   cidades = [] 
 }) => {
-  const [geoData] = useState<GeoData>(geoDataMT);
+  const [geoData, setGeoData] = useState<GeoData>(colecaoVazia);
+  // Zoom da malha carregada (null enquanto nenhuma chegou); é a key do GeoJSON
+  const [zoomCarregado, setZoomCarregado] = useState<number | null>(null);
+
+  useEffect(() => {
+    const controller = new AbortController();
+    fetch(`${GEO_URL}?zoom=${zoom}`, { signal: controller.signal })
+      .then(response => {
+        if (!response.ok) {
+          throw new Error(`HTTP error! status: ${response.status}`);
+        }
+        return response.json();
+      })
+      .then((data: GeoData) => {
+        setGeoData(data);
+        setZoomCarregado(zoom);
+      })
+      .catch(error => {
+        if (error.name !== 'AbortError') {
+          console.error('Erro ao carregar a malha municipal:', error);
+        }
+      });
+    return () => controller.abort();
+  }, [zoom]);
 
   const style = (feature: GeoFeature) => {
     const municipioNome = feature.properties.name;
@@ -142,7 +168,9 @@ const MapComponent: React.FC<MapComponentProps> = ({
           url="https://{s}.tile.openstreetmap.org/{z}/{x}/{y}.png"
         />
         
+        {/* O GeoJSON do react-leaflet não reage a novos dados; a key força a remontagem */}
         <GeoJSON
+          key={zoomCarregado ?? 'vazio'}
           data={geoData}
           style={style}
           onEachFeature={onEachFeature}
@@ -6,7 +6,9 @@ import {
   EstoqueResponse, 
   CautelaResponse,
   EntregaData,
-  CautelaData
+  CautelaData,
+  CautelaEntregaData,
+  ResumoTiposEquipamento
 } from '../types/coneq';
 import { normalizarNomeCidade, compararNomesCidades, encontrarCidade } from '../utils/stringUtils';
 
@@ -23,6 +25,7 @@ export const useCONEQ = (gruposDeMunicipios: Record<string, string[]>) => {
   const [cidadeDataEquipamentos, setCidadeDataEquipamentos] = useState<DadosCombinados[]>([]);
   const [activeButton, setActiveButton] = useState<string>("estoque");
   const [selectedCR, setSelectedCR] = useState<string[]>([]);
+  const [resumoTipos, setResumoTipos] = useState<ResumoTiposEquipamento | null>(null);
 
   // Interface para a resposta da API
   interface EstoqueResponseData {
@@ -33,6 +36,18 @@ export const useCONEQ = (gruposDeMunicipios: Record<string, string[]>) => {
     cautelas: number;
   }
 
+  // Seleciona no resumo carregado os dados do tipo escolhido ("" = todos os tipos)
+  const aplicarResumo = (resumo: ResumoTiposEquipamento | null, tipoId: string) => {
+    if (!resumo) {
+      setEquipamentos([]);
+      setCautelas([]);
+      return;
+    }
+    const dados = tipoId === "" ? resumo.geral : resumo.por_tipo[tipoId];
+    setEquipamentos(transformEstoqueData(dados ?? { estoque: [], cautelas: 0 }));
+    setCautelas(transformCautelasData({ cautela: dados?.cautela ?? [] }));
+  };
+
   // Função genérica para buscar dados
   const fetchData = async <T,>(endpoint: string, setter: (data: T) => void, transformData?: (data: any) => T, cidades?: string[]) => {
     try {
@@ -152,15 +167,6 @@ export const useCONEQ = (gruposDeMunicipios: Record<string, string[]>) => {
   const handleSelectChange = (event: React.ChangeEvent<HTMLSelectElement>) => {
     const tipoId = event.target.value;
     setSelectedTipo(tipoId);
-
-    if (tipoId === "") {
-      // Buscar todos os equipamentos agrupados por status
-      fetchData('/estoque_geral', setEquipamentos, transformEstoqueData);
-      fetchData('/cautela_geral', setCautelas, transformCautelasData);
-    } else {
-      fetchData(`/estoqueDado/${tipoId}`, setEquipamentos, transformEstoqueData);
-      fetchData(`/status_counts/${tipoId}`, setCautelas, transformCautelasData);
-    }
   };
 
   const handleGroupClick = async (crSelecionado: string[]) => {
@@ -190,21 +196,16 @@ export const useCONEQ = (gruposDeMunicipios: Record<string, string[]>) => {
 
       const cidadesQuery = cidadesNormalizadas.join(',');
 
-      const [cautelasResponse, entregasResponse] = await Promise.all([
-        fetch(`${API_CONFIG.BASE_URL}/quantitativoPorCidade?cidades=${cidadesQuery}`),
-        fetch(`${API_CONFIG.BASE_URL}/contar_entregas_por_cidade?cidades=${cidadesQuery}`)
-      ]);
+      // Cautelas e entregas vêm da mesma consulta no backend
+      const response = await fetch(`${API_CONFIG.BASE_URL}/cautelas_entregas_por_cidade?cidades=${cidadesQuery}`);
 
-      if (!cautelasResponse.ok || !entregasResponse.ok) {
+      if (!response.ok) {
         throw new Error('Erro ao buscar dados');
       }
 
-      const [cautelasData, entregasData] = await Promise.all([
-        cautelasResponse.json(),
-        entregasResponse.json()
-      ]);
+      const dadosCidades: CautelaEntregaData[] = await response.json();
 
-      const combinedData = combineCautelasAndEntregas(cautelasData, entregasData, cidadesNormalizadas);
+      const combinedData = combineCautelasAndEntregas(dadosCidades, dadosCidades, cidadesNormalizadas);
       setCidadeDataEquipamentos(combinedData);
     } catch (error) {
       console.error('Erro ao buscar dados das cidades:', error);
@@ -218,19 +219,15 @@ export const useCONEQ = (gruposDeMunicipios: Record<string, string[]>) => {
 
   useEffect(() => {
     if (tiposEquipamentos.length > 0) {
-      // Iniciar com "Todos os tipos"
+      // Iniciar com "Todos os tipos"; estoque e cautelas de todos os tipos vêm em uma única chamada
       setSelectedTipo("");
-      fetchData('/estoque_geral', setEquipamentos, transformEstoqueData);
-      fetchData('/cautela_geral', setCautelas, transformCautelasData);
+      fetchData<ResumoTiposEquipamento | null>('/resumo_tipos_equipamento', setResumoTipos, data => data?.geral ? data : null);
     }
   }, [tiposEquipamentos]);
 
   useEffect(() => {
-    if (selectedTipo && selectedTipo !== "") {
-      fetchData(`/estoqueDado/${selectedTipo}`, setEquipamentos, transformEstoqueData);
-      fetchData(`/status_counts/${selectedTipo}`, setCautelas, transformCautelasData);
-    }
-  }, [selectedTipo]);
+    aplicarResumo(resumoTipos, selectedTipo);
+  }, [resumoTipos, selectedTipo]);
 
   return {
     equipamentos,
@@ -1,5 +1,7 @@
 import { useState, useEffect } from 'react';
-import { BarChartData, DoughnutChartData, EstoqueItem, EstoqueStatusData } from '../types/coneq';
+import { BarChartData, DoughnutChartData, EstoqueEvento, EstoqueItem, EstoqueStatusData } from '../types/coneq';
+
+const API_URL = "http://172.16.10.54:8000/api";
 
 export const useEstoque = () => {
   const [activeButton, setActiveButton] = useState("estoque");
@@ -30,67 +32,73 @@ export const useEstoque = () => {
     ],
   });
 
+  const aplicarEstoque = (data: EstoqueItem[]) => {
+    if (Array.isArray(data)) {
+      const labels = data.map(item => item.equipamento_nome);
+      const quantidadeEstoque = data.map(item => item.quantidade_em_estoque);
+
+      setBarData({
+        labels,
+        datasets: [
+          {
+            label: "Quantidade em Estoque",
+            data: quantidadeEstoque,
+            backgroundColor: "#1D4ED8",
+            borderRadius: 5,
+          },
+        ],
+      });
+    } else {
+      throw new Error("Formato de dados inválido");
+    }
+  };
+
   const fetchData = async () => {
     try {
       setError(null);
-      const response = await fetch("http://172.16.10.54:8000/api/estoque");
+      const response = await fetch(`${API_URL}/estoque`);
       if (!response.ok) {
         throw new Error(`Erro ao carregar dados do estoque: ${response.statusText}`);
       }
 
-      const data = await response.json() as EstoqueItem[];
-      if (Array.isArray(data)) {
-        const labels = data.map(item => item.equipamento_nome);
-        const quantidadeEstoque = data.map(item => item.quantidade_em_estoque);
-
-        setBarData({
-          labels,
-          datasets: [
-            {
-              label: "Quantidade em Estoque",
-              data: quantidadeEstoque,
-              backgroundColor: "#1D4ED8",
-              borderRadius: 5,
-            },
-          ],
-        });
-      } else {
-        throw new Error("Formato de dados inválido");
-      }
+      aplicarEstoque(await response.json() as EstoqueItem[]);
     } catch (error) {
       setError(error instanceof Error ? error.message : "Erro ao buscar dados da API");
       console.error("Erro ao buscar dados da API:", error);
     }
   };
 
+  const aplicarEstoqueGeral = (data: EstoqueStatusData) => {
+    if (data.estoque && Array.isArray(data.estoque)) {
+      const labels = data.estoque.map(item => item.status);
+      const quantidadeStatus = data.estoque.map(item => item.quantidade);
+      quantidadeStatus.push(data.cautelas);
+
+      setDoughnutData({
+        labels: [...labels, "CAUTELADOS"],
+        datasets: [
+          {
+            data: quantidadeStatus,
+            backgroundColor: ["#4CAF50", "#FF9800", "#F44336", "#2196F3"],
+            borderColor: "#ffffff",
+            borderWidth: 1,
+          },
+        ],
+      });
+    } else {
+      throw new Error("Formato de dados inválido");
+    }
+  };
+
   const fetchDoughnutData = async () => {
     try {
       setError(null);
-      const response = await fetch("http://172.16.10.54:8000/api/estoque_geral");
+      const response = await fetch(`${API_URL}/estoque_geral`);
       if (!response.ok) {
         throw new Error(`Erro ao carregar dados do status: ${response.statusText}`);
       }
 
-      const data = await response.json() as EstoqueStatusData;
-      if (data.estoque && Array.isArray(data.estoque)) {
-        const labels = data.estoque.map(item => item.status);
-        const quantidadeStatus = data.estoque.map(item => item.quantidade);
-        quantidadeStatus.push(data.cautelas);
-
-        setDoughnutData({
-          labels: [...labels, "CAUTELADOS"],
-          datasets: [
-            {
-              data: quantidadeStatus,
-              backgroundColor: ["#4CAF50", "#FF9800", "#F44336", "#2196F3"],
-              borderColor: "#ffffff",
-              borderWidth: 1,
-            },
-          ],
-        });
-      } else {
-        throw new Error("Formato de dados inválido");
-      }
+      aplicarEstoqueGeral(await response.json() as EstoqueStatusData);
     } catch (error) {
       setError(error instanceof Error ? error.message : "Erro ao buscar dados do status");
       console.error("Erro ao buscar dados do gráfico de Doughnut:", error);
@@ -104,12 +112,36 @@ export const useEstoque = () => {
     await Promise.all([fetchData(), fetchDoughnutData()]);
   };
 
+  // Aplica um evento do servidor: "snapshot" traz o estado completo, "diff" só o que mudou
+  const aplicarEvento = (event: MessageEvent) => {
+    try {
+      setError(null);
+      const dados = JSON.parse(event.data) as EstoqueEvento;
+      if (dados.estoque) aplicarEstoque(dados.estoque);
+      if (dados.estoque_geral) aplicarEstoqueGeral(dados.estoque_geral);
+    } catch (error) {
+      setError(error instanceof Error ? error.message : "Erro ao processar atualização do estoque");
+      console.error("Erro ao processar evento de estoque:", error);
+    } finally {
+      setIsLoading(false);
+    }
+  };
+
   useEffect(() => {
-    refreshData();
+    // Sem suporte a SSE no navegador, volta a consultar a cada 30 segundos
+    if (typeof EventSource === "undefined") {
+      refreshData();
+      const intervalId = setInterval(refreshData, 30000);
+      return () => clearInterval(intervalId);
+    }
 
-    const intervalId = setInterval(refreshData, 30000); // Atualiza a cada 30 segundos
+    // O servidor envia o estado ao conectar e as mudanças em seguida; o EventSource reconecta sozinho
+    const eventos = new EventSource(`${API_URL}/estoque/eventos`);
+    eventos.addEventListener("snapshot", aplicarEvento as EventListener);
+    eventos.addEventListener("diff", aplicarEvento as EventListener);
+    eventos.onerror = () => console.warn("Conexão de eventos do estoque interrompida; reconectando...");
 
-    return () => clearInterval(intervalId);
+    return () => eventos.close();
   }, []);
 
   return {
@@ -49,17 +49,13 @@ const SgpmPage: React.FC = () => {
   useEffect(() => {
     const carregarDadosOriginais = async () => {
       try {
-        const [sexoRes, situacaoRes, tipoRes, postoGradRes] = await Promise.all([
-          SGPMService.getPoliciaisPorSexo(),
-          SGPMService.getPoliciaisPorSituacao(),
-          SGPMService.getPoliciaisPorTipo(),
-          SGPMService.getPoliciaisPorPostoGradSexo()
-        ]);
+        // Uma única chamada traz sexo, situação, tipo e posto/graduação
+        const resumo = await SGPMService.getResumo();
 
-        setDados(sexoRes || []);
-        setDadosSituacao(situacaoRes || []);
-        setDadosTipo(tipoRes || []);
-        setDadosPostoGraduacao(postoGradRes || { feminino: [], masculino: [] });
+        setDados(resumo?.sexo || []);
+        setDadosSituacao(resumo?.situacao || []);
+        setDadosTipo(resumo?.tipo || []);
+        setDadosPostoGraduacao(resumo?.posto_grad || { feminino: [], masculino: [] });
       } catch (error) {
         console.error('Erro ao carregar dados originais:', error);
       }
@@ -10,7 +10,8 @@ import {
   fetchComandosRegionais,
   fetchUnidades,
   fetchUnidadesPorComando,
-  fetchPostosGraduacao
+  fetchPostosGraduacao,
+  fetchResumoSGPM
 } from '../api';
 import { normalizarNomeCidadeParaAPI } from '../../utils/stringUtils';
 
@@ -33,6 +34,7 @@ export const SGPMService = {
   filtrarPoliciais: (sexo?: string, situacao?: string, tipo?: string) => 
     fetchPoliciaisFiltradosAvancado(sexo, situacao, tipo),
   getTotaisPorCR: () => fetchTotaisPorCR(),
+  getResumo: () => fetchResumoSGPM(),
   getPoliciaisPorCidade: (cidades: string[]) => 
     fetchPoliciaisPorCidade(cidades),
   getPoliciaisPorUnidade: (cidade: string) => {
@@ -8,7 +8,8 @@ import {
   DadosPorUnidade,
   ComandoRegional,     
   Unidade,            
-  PostoGraduacaoInfo
+  PostoGraduacaoInfo,
+  ResumoSGPM
 } from '../types/sgpm';
 import { normalizarNomeCidadeParaAPI } from '../utils/stringUtils';
 
@@ -109,6 +110,16 @@ export const fetchPoliciaisPorPostoGradSexo = async (
   }
 };
 
+export const fetchResumoSGPM = async (): Promise<ResumoSGPM | null> => {
+  try {
+    const response = await api.get('/resumo_sgpm');
+    return response.data;
+  } catch (error) {
+    console.error('Erro ao buscar resumo do SGPM:', error);
+    return null;
+  }
+};
+
 export const fetchPoliciaisFiltradosAvancado = async (
   sexo?: string,
   situacao?: string,
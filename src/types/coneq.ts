@@ -37,6 +37,17 @@ export interface CautelaData {
   qtd_cautelas: number;
 }
 
+export interface ResumoTipoEquipamento extends EstoqueResponse, CautelaResponse {
+  cautelas: number;
+}
+
+export interface ResumoTiposEquipamento {
+  geral: ResumoTipoEquipamento;
+  por_tipo: Record<string, ResumoTipoEquipamento>;
+}
+
+export interface CautelaEntregaData extends CautelaData, EntregaData {}
+
 export interface DadosCombinados {
   nome_cidade: string;
   Cautelas: number;
@@ -56,6 +67,11 @@ export interface EstoqueItem {
   quantidade_em_estoque: number;
 }
 
+export interface EstoqueEvento {
+  estoque?: EstoqueItem[];
+  estoque_geral?: EstoqueStatusData;
+}
+
 export interface CidadeData {
   nome_cidade: string;
   qtd_cautelas: number;
@@ -64,6 +64,23 @@ export interface DadosEfetivo {
   [key: string]: number;
 }
 
+// --- RESUMO (uma única consulta para a página do SGPM) ---
+export interface PostoGradContagem {
+  posto_grad: string;
+  quantidade: number;
+}
+
+export interface ResumoSGPM {
+  sexo: DadosSexo[];
+  tipo: DadosTipo[];
+  situacao: DadosSituacao[];
+  posto_grad: {
+    feminino: PostoGradContagem[];
+    masculino: PostoGradContagem[];
+  };
+  totais_por_cr: DadosEfetivo;
+}
+
 // --- AUXILIARES ---
 export interface GruposDeMunicipios {
   [cr: string]: string[];
@@ -9,6 +9,8 @@ BACKEND_DIR="$PROJECT_DIR/app"
 FRONTEND_DIR="$PROJECT_DIR"
 VENV_PATH="$PROJECT_DIR/venv/bin/activate"
 LOG_DIR="$PROJECT_DIR/logs"
+# producao: gunicorn com varios workers (gunicorn.conf.py); desenvolvimento: uvicorn --reload
+API_MODO="${API_MODO:-producao}"
 
 mkdir -p $LOG_DIR
 
@@ -23,9 +25,9 @@ is_running() {
 stop_existing_processes() {
     log "Verificando processos existentes..."
 
-    if is_running "uvicorn.*app.main:app"; then
+    if is_running "(uvicorn|gunicorn).*app.main:app"; then
         log "Parando backend existente..."
-        pkill -f "uvicorn.*app.main:app"
+        pkill -f "(uvicorn|gunicorn).*app.main:app"
         sleep 2
     fi
 
@@ -76,11 +78,15 @@ start_backend() {
     cd $PROJECT_DIR
     source $VENV_PATH
 
-    nohup uvicorn app.main:app --host 172.16.10.54 --port 8000 --reload > $LOG_DIR/backend.log 2>&1 &
+    if [ "$API_MODO" = "desenvolvimento" ]; then
+        nohup uvicorn app.main:app --host 172.16.10.54 --port 8000 --reload > $LOG_DIR/backend.log 2>&1 &
+    else
+        API_HOST=172.16.10.54 API_PORT=8000 nohup gunicorn -c gunicorn.conf.py app.main:app > $LOG_DIR/backend.log 2>&1 &
+    fi
     BACKEND_PID=$!
     sleep 3
 
-    if is_running "uvicorn.*app.main:app"; then
+    if is_running "(uvicorn|gunicorn).*app.main:app"; then
         log "Backend iniciado (PID: $BACKEND_PID) - http://172.16.10.54:8000"
     else
         log "ERRO: Falha ao iniciar o backend"
@@ -121,7 +127,7 @@ start_frontend() {
 
 show_status() {
     log "=== STATUS DOS SERVIOS ==="
-    if is_running "uvicorn.*app.main:app"; then
+    if is_running "(uvicorn|gunicorn).*app.main:app"; then
         log "? Backend rodando - http://172.16.10.54:8000"
     else
         log "? Backend parado"
@@ -140,8 +146,8 @@ show_status() {
 
 stop_all() {
     log "Parando todos os servios..."
-    if is_running "uvicorn.*app.main:app"; then
-        pkill -f "uvicorn.*app.main:app"
+    if is_running "(uvicorn|gunicorn).*app.main:app"; then
+        pkill -f "(uvicorn|gunicorn).*app.main:app"
         log "Backend parado"
     fi
     if is_running "serve.*build"; then
@@ -0,0 +1,150 @@
+"""
+Orçamento de queries por rota (@orcamento_queries), verificado sem banco: as
+idas ao banco do BaseModel são substituídas por respostas fixas que passam
+pela mesma contagem do ContagemQueriesMiddleware.
+"""
+import asyncio
+import os
+from urllib.parse import quote
+
+import pytest
+
+os.environ["DB_CONTAR_QUERIES"] = "true"
+os.environ["DB_ORCAMENTO_ESTRITO"] = "false"
+
+from app.main import app  # noqa: E402
+from app.models.aquecimento import aquecer  # noqa: E402
+from app.models.base_model import BaseModel  # noqa: E402
+from app.models.cidade_index import cidades_geral, cidades_sgpm  # noqa: E402
+from app.utils.cache import cache_resultados  # noqa: E402
+
+CIDADES = [(1, "CUIABÁ"), (2, "VÁRZEA GRANDE"), (3, "SINOP")]
+OPMS = [
+    (1, "CR 1", 1, "S", 1),
+    (2, "1º BPM", 1, "N", 1),
+    (3, "CR 2", 3, "S", 2),
+    (4, "2º BPM", 3, "N", 2),
+]
+
+# Parâmetros obrigatórios e variações mais caras de cada rota
+PARAMETROS = {
+    "/api/cautelas_entregas_por_cidade": "cidades=" + quote("CUIABÁ,VÁRZEA GRANDE,SINOP"),
+    "/api/quantitativoPorCidade": "cidades=" + quote("CUIABÁ,VÁRZEA GRANDE,SINOP"),
+    "/api/contar_entregas_por_cidade": "cidades=" + quote("CUIABÁ,VÁRZEA GRANDE,SINOP"),
+    # Cidade fora do índice: cai na busca por padrão, a segunda query do orçamento
+    "/api/contar_sexo_por_cidade": "cidades=" + quote("CUIABÁ,VÁRZEA GRANDE,SÃO JOSÉ DO XINGU"),
+    "/api/contar_sexo_por_unidade": "cidade=" + quote("CUIABÁ"),
+    "/api/unidades_por_comando": "comando_id=1",
+    "/api/dados_posto_grad": "sexo=M,F&situacao=ATIVO&tipo=PM",
+    "/api/policiais_filtro": "sexo=M&situacao=ATIVO&tipo=PM",
+    "/api/policiais_filtro_avancado": "sexo=M&comando_regional=1&unidade=2&posto_grad=3",
+    "/api/policiais_filtro_avancado/dados": "sexo=M&comando_regional=1&limite=10&apos=5",
+    "/api/policiais_filtro_avancado/exportar": "sexo=M&comando_regional=1",
+    "/api/geo/municipios": "zoom=9&contagens=sgpm,coneq",
+}
+
+# Rotas sem acesso direto ao banco ou que não são chamadas pelo dashboard
+SEM_ORCAMENTO = {"/api/estoque/eventos"}
+
+
+def linhas_fixas(query: str) -> list:
+    """Linhas suficientes para os índices em memória; as demais consultas voltam vazias."""
+    if query in (cidades_sgpm.query, cidades_geral.query):
+        return list(CIDADES)
+    if "subordinacao" in query and "FROM sgpm.opm" in query:
+        return list(OPMS)
+    return []
+
+
+def execute_query(self, query, params=None):
+    self._contar(self._origem_chamada())
+    return linhas_fixas(query)
+
+
+def execute_prepared(self, nome, query, params=()):
+    self._contar(self._origem_chamada())
+    return linhas_fixas(query)
+
+
+def execute_command(self, query, params=None):
+    self._contar(self._origem_chamada())
+    return True
+
+
+async def stream_query_async(self, query, params=None, lote=None):
+    self._contar(self._origem_chamada())
+    for linha in linhas_fixas(query):
+        yield [linha]
+
+
+async def requisitar(caminho: str, query: str = "") -> tuple:
+    """Requisição GET direta à aplicação ASGI; retorna status e cabeçalhos."""
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+        "scheme": "http", "path": caminho, "raw_path": caminho.encode(), "query_string": query.encode(),
+        "root_path": "", "headers": [], "client": ("127.0.0.1", 1), "server": ("teste", 80),
+    }
+    mensagens = []
+    enviado = False
+
+    async def receive():
+        nonlocal enviado
+        if not enviado:
+            enviado = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        await asyncio.sleep(3600)
+
+    async def send(mensagem):
+        mensagens.append(mensagem)
+
+    await app(scope, receive, send)
+    inicio = mensagens[0]
+    return inicio["status"], {k.decode(): v.decode() for k, v in inicio["headers"]}
+
+
+@pytest.fixture(scope="module", autouse=True)
+def banco_falso():
+    originais = {
+        nome: getattr(BaseModel, nome)
+        for nome in ("execute_query", "execute_prepared", "execute_command", "stream_query_async")
+    }
+    BaseModel.execute_query = execute_query
+    BaseModel.execute_prepared = execute_prepared
+    BaseModel.execute_command = execute_command
+    BaseModel.stream_query_async = stream_query_async
+    # Os orçamentos valem com os índices e as tabelas de referência já em memória
+    asyncio.run(aquecer())
+    yield
+    for nome, original in originais.items():
+        setattr(BaseModel, nome, original)
+    BaseModel.shutdown_executor()
+
+
+def rotas_com_orcamento():
+    return sorted(
+        (rota.path, rota.endpoint.orcamento_queries)
+        for rota in app.routes
+        if hasattr(getattr(rota, "endpoint", None), "orcamento_queries")
+    )
+
+
+def test_rotas_do_dashboard_declaram_orcamento():
+    sem_orcamento = [
+        rota.path for rota in app.routes
+        if rota.path.startswith("/api/")
+        and not rota.path.startswith("/api/admin")
+        and rota.path not in SEM_ORCAMENTO
+        and not hasattr(getattr(rota, "endpoint", None), "orcamento_queries")
+    ]
+    assert sem_orcamento == []
+
+
+@pytest.mark.parametrize("caminho,orcamento", rotas_com_orcamento())
+def test_rota_dentro_do_orcamento(caminho, orcamento):
+    cache_resultados.invalidar()
+    status, cabecalhos = asyncio.run(
+        requisitar(caminho.replace("{tipo_equipamento_id}", "1"), PARAMETROS.get(caminho, ""))
+    )
+    assert status != 422, f"parâmetros inválidos para {caminho}"
+    assert cabecalhos["x-db-queries-orcamento"] == str(orcamento)
+    assert int(cabecalhos["x-db-queries"]) <= orcamento
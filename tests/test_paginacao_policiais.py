@@ -0,0 +1,39 @@
+"""
+A rota /policiais_filtro_avancado/dados responde com RespostaJSONRapida, sem
+passar pelo response_model: aqui a página montada pelo model é validada
+contra o PaginaPoliciaisResponse.
+"""
+import asyncio
+
+from app.models.schemas import PaginaPoliciaisResponse
+from app.models.sgpm_model import SgpmModel
+
+LINHAS = [
+    (10, "M", "ATIVO", "PM", "SOLDADO", 2, "1º BPM"),
+    (11, "F", "ATIVO", "PM", "CABO", 2, "1º BPM"),
+    (12, None, None, None, None, 4, None),
+]
+
+
+def listar(limite: int, linhas: list) -> dict:
+    model = SgpmModel()
+
+    async def execute_query_async(query, params=None):
+        return linhas
+
+    model.execute_query_async = execute_query_async
+    return asyncio.run(model.listar_policiais_avancado(limite=limite))
+
+
+def test_pagina_com_proxima_segue_o_schema():
+    pagina = listar(2, LINHAS)
+    validada = PaginaPoliciaisResponse(**pagina)
+    assert validada.dict() == pagina
+    assert pagina["proximo"] == 11
+
+
+def test_ultima_pagina_segue_o_schema():
+    pagina = listar(5, LINHAS)
+    validada = PaginaPoliciaisResponse(**pagina)
+    assert validada.dict() == pagina
+    assert pagina["proximo"] is None